@@ -0,0 +1,167 @@
+"""
+LLM 답변 캐시
+같은 시간대에 같은 지역에서 거의 같은 질문("이번주 날씨 어때요?")이 반복되므로
+(정규화한 질문, 참고 정보 해시) 키로 답변을 저장해서 OpenRouter 호출을 줄임
+
+- 질문 정규화 (question_text.py): 공백/문장부호 제거, 소문자, 존댓말 어미("어때요", "인가요", "습니까" 등) 제거
+- 참고 정보(api_context)가 한 글자라도 다르면 다른 키 -> 새 발표분이 반영되면 자동으로 새 답변
+- 날씨가 들어간 답변은 다음 발표(새로고침) 시각에 만료, 그 밖의 답변은 ANSWER_CACHE_TTL 후 만료
+- 개수(LRU)와 저장한 글자 용량 둘 다 상한을 넘으면 가장 오래 안 쓴 답변부터 제거
+- 똑같은 질문이 없으면 비슷한 질문 캐시(semantic_cache.py, 선택)를 한 번 더 확인
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from kma_schedule import get_issuance, next_refresh
+from question_text import normalize_question
+from semantic_cache import SEMANTIC_CACHE
+
+# 답변 최대 개수
+ANSWER_CACHE_MAXSIZE = int(os.getenv("ANSWER_CACHE_MAXSIZE", "1024"))
+
+# 질문+답변 글자 용량 상한 (바이트, UTF-8 기준, 기본 4MB)
+ANSWER_CACHE_MAX_BYTES = int(os.getenv("ANSWER_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
+
+# 날씨와 상관없는 답변의 유지 시간 (초, 기본 1시간, 0이면 캐시 끔)
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "3600"))
+
+
+def context_fingerprint(api_context):
+    return hashlib.blake2b((api_context or "").encode("utf-8"), digest_size=16).hexdigest()
+
+
+def answer_key(question, api_context=""):
+    return (normalize_question(question), context_fingerprint(api_context))
+
+
+# 참고 정보에 들어가는 날씨 상품 (build_context_for_llm 기준)
+WEATHER_PRODUCTS = ("ultra_short_now", "ultra_short_fcst", "short_forecast", "mid_temp", "mid_land")
+
+
+def weather_expiry(now=None):
+    """
+    날씨 상품 중 가장 먼저 새 발표분이 나오는(새로고침되는) 시각 (epoch 초)
+    그 뒤로는 같은 질문이라도 참고 정보가 달라지므로 답변을 버림
+    """
+    return min(
+        next_refresh(product, get_issuance(product, now)[1], now)
+        for product in WEATHER_PRODUCTS
+    ).timestamp()
+
+
+class AnswerCache:
+    """
+    (정규화한 질문, 참고 정보 해시) -> 답변
+    TTL + LRU, 개수와 용량(바이트) 상한
+    """
+
+    def __init__(self, maxsize=ANSWER_CACHE_MAXSIZE, max_bytes=ANSWER_CACHE_MAX_BYTES):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # key -> (expires_at, answer, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _size(key, answer):
+        return len(key[0].encode("utf-8")) + len(key[1]) + len(answer.encode("utf-8"))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, answer, size = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return answer
+
+    def set(self, key, answer, expires_at):
+        size = self._size(key, answer)
+        if size > self.max_bytes or expires_at <= time.time():
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._data[key] = (expires_at, answer, size)
+            self._bytes += size
+            while len(self._data) > self.maxsize or self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._data.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+ANSWER_CACHE = AnswerCache()
+
+
+def cached_answer(question, api_context=""):
+    """
+    저장된 답변과 키 (없으면 (None, key), 캐시를 끄면 (None, None))
+    """
+    if ANSWER_CACHE_TTL <= 0:
+        return None, None
+    key = answer_key(question, api_context)
+    answer = ANSWER_CACHE.get(key)
+    # 똑같은 질문이 없으면 같은 참고 정보로 한 비슷한 질문 (SEMANTIC_CACHE=1)
+    if answer is None and SEMANTIC_CACHE is not None:
+        answer = SEMANTIC_CACHE.get(question, key[1])
+    return answer, key
+
+
+def store_answer(key, answer, weather=False, question=None):
+    """
+    성공한 답변만 저장 (weather=True면 다음 발표 시각에 만료)
+    question: 원래 질문 (비슷한 질문 캐시용, 없으면 정규화한 질문 사용)
+    """
+    if key is None or not answer:
+        return
+    expires_at = time.time() + ANSWER_CACHE_TTL
+    if weather:
+        expires_at = min(expires_at, weather_expiry())
+    ANSWER_CACHE.set(key, answer, expires_at)
+    if SEMANTIC_CACHE is not None:
+        SEMANTIC_CACHE.set(question or key[0], key[1], answer, expires_at)
+
+
+def answer_cache_stats():
+    stats = ANSWER_CACHE.stats()
+    stats["semantic"] = SEMANTIC_CACHE.stats() if SEMANTIC_CACHE is not None else {"enabled": False}
+    return stats
@@ -1,18 +1,36 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, Response, stream_with_context
 from flask_cors import CORS
 import requests
-from datetime import datetime
+import json
 from dotenv import load_dotenv
 load_dotenv()
 import os
 
+# 공용 HTTP 세션 (커넥션 재사용)
+from http_client import http_post, async_http_post
+
 # 기상청 API import
 from weather_api import (
     get_weather_for_context, 
-    get_mid_forecast,
-    get_mid_land_forecast,
-    SHORT_FORECAST_COORDS
+    fetch_weather_products,
+    fetch_weather_batch,
+    PRODUCT_REQUESTS,
+    format_current_context,
+    format_ultra_short_context,
+    format_short_context,
+    format_mid_context,
+    get_cache_stats
 )
+from kma_grid import format_latlon
+from region_registry import REGIONS, resolve_region
+from weather_records import is_error
+from llm_prompt import build_messages, PROMPT_STATS
+from answer_cache import cached_answer, store_answer, answer_cache_stats
+from conversation import CONVERSATIONS
+from context_pipeline import ContextPipeline, ContextProvider, WEATHER_INTENT, horizon_intent
+from keyword_matcher import KeywordMatcher
+from farm_knowledge import get_knowledge, period_of
+from doc_retrieval import retrieve, format_passages, get_index, document_stats
 
 app = Flask(__name__)
 CORS(app)
@@ -42,172 +60,257 @@ print(API_KEY)
 # FARMING KNOWLEDGE BASE
 # ============================================
 
-def get_farming_calendar():
-    """현재 월 기준 농사 정보"""
-    month = datetime.now().month
-    
-    calendar_data = {
-        1: {
-            "tasks": ["수확 마무리", "전정 준비", "동해 방지"],
-            "tips": "동해 방지를 위해 수분 관리가 중요합니다"
-        },
-        2: {
-            "tasks": ["전정 작업", "토양 개량", "유기질 비료 투입"],
-            "tips": "2월 중순까지 전정 완료가 필요합니다"
-        },
-        3: {
-            "tasks": ["봄 거름 주기", "병해충 예방 약제 살포"],
-            "tips": "새순이 나오기 전 방제를 완료하세요"
-        },
-        4: {
-            "tasks": ["개화 관리", "수분 관리", "적화"],
-            "tips": "꽃이 지면서 착과가 시작됩니다"
-        },
-        5: {
-            "tasks": ["적과 1차", "관수 시작", "웃거름"],
-            "tips": "과다 착과 시 적과가 필수입니다"
-        },
-        6: {
-            "tasks": ["적과 2차", "여름 거름", "초생재배 관리"],
-            "tips": "고온기 물 관리가 중요합니다"
-        },
-        7: {
-            "tasks": ["태풍 대비", "병해충 집중 방제", "배수로 점검"],
-            "tips": "태풍 시기, 지주를 점검하세요"
-        },
-        8: {
-            "tasks": ["가뭄 대비 관수", "여름 순 제거"],
-            "tips": "고온 스트레스에 주의하세요"
-        },
-        9: {
-            "tasks": ["가을 거름", "착색 관리 시작", "과실 비대"],
-            "tips": "착색기 질소 과다를 주의하세요"
-        },
-        10: {
-            "tasks": ["수확 준비", "당도 체크", "착색 촉진"],
-            "tips": "극조생종 수확이 시작됩니다"
-        },
-        11: {
-            "tasks": ["본격 수확", "저장고 관리", "선별 작업"],
-            "tips": "조생종 수확 적기입니다"
-        },
-        12: {
-            "tasks": ["수확 지속", "저장 관리", "월동 준비"],
-            "tips": "보통종 수확이 시작됩니다"
-        }
-    }
-    
-    return calendar_data.get(month, {})
+# 작물별 순(旬) 단위 농사 정보는 data/farm_knowledge.json (farm_knowledge 모듈)
+# 파일을 고치면 워커 재시작 없이 반영됨
 
 
-def get_pest_alerts():
-    """계절별 병해충 정보"""
-    month = datetime.now().month
-    
-    if month in [5, 6, 7, 8]:
-        return {
-            "high_risk": ["응애", "깍지벌레", "귤녹응애"],
-            "prevention": "고온다습한 여름철, 병해충 발생이 많습니다. 주 1회 과수원 점검과 예방 방제를 권장합니다."
-        }
-    else:
-        return {
-            "high_risk": ["궤양병"],
-            "prevention": "비교적 병해충 발생이 적은 시기입니다. 정기 점검을 유지하세요."
-        }
+# ============================================
+# CONTEXT BUILDER
+# ============================================
 
+# 질문 키워드 -> 컨텍스트 섹션
+# 날씨는 시기별로 나눠서 필요한 기상 상품만 조회
+#   현재(초단기실황), 6시간(초단기예보), 3일(단기예보), 4-10일(중기기온 + 중기육상)
+WEATHER_NOW = "weather_now"
+WEATHER_6H = "weather_6h"
+WEATHER_3DAY = "weather_3day"
+WEATHER_MID = "weather_mid"
+
+# 시기 말 -> 날씨 섹션 (날씨를 묻는 말이 함께 있을 때만, "오늘 비료 언제 줘요?"는 날씨 조회 없음)
+TIME_TRIGGERS = {
+    "지금": (WEATHER_NOW,),
+    "현재": (WEATHER_NOW,),
+    "오늘": (WEATHER_NOW, WEATHER_6H),
+    "이따": (WEATHER_6H,),
+    "오후": (WEATHER_6H,),
+    "저녁": (WEATHER_6H,),
+    "몇 시": (WEATHER_6H,),
+    "내일": (WEATHER_3DAY,),
+    "모레": (WEATHER_3DAY,),
+    "글피": (WEATHER_3DAY,),
+    "3일": (WEATHER_3DAY,),
+    "이번주": (WEATHER_3DAY, WEATHER_MID),
+    "이번 주": (WEATHER_3DAY, WEATHER_MID),
+    "주말": (WEATHER_3DAY, WEATHER_MID),
+    "다음주": (WEATHER_MID,),
+    "다음 주": (WEATHER_MID,),
+    "주간": (WEATHER_MID,),
+    "일주일": (WEATHER_MID,),
+    "열흘": (WEATHER_MID,),
+}
+
+CONTEXT_TRIGGERS = {
+    # 날씨 (그 자체로 날씨를 묻는 말)
+    "기온": (WEATHER_NOW,),
+    "온도": (WEATHER_NOW,),
+    "습도": (WEATHER_NOW,),
+    "바람": (WEATHER_NOW, WEATHER_6H),
+    # 농사 달력
+    "농사": ("calendar",),
+    "작업": ("calendar",),
+    "이달": ("calendar",),
+    "이번달": ("calendar",),
+    "이번 달": ("calendar",),
+    "할 일": ("calendar",),
+    "시기": ("calendar",),
+    "수확": ("calendar",),
+    "전정": ("calendar",),
+    "거름": ("calendar",),
+    "파종": ("calendar",),
+    "심기": ("calendar",),
+    "심어": ("calendar",),
+    "심는": ("calendar",),
+    "정식": ("calendar",),
+    "솎": ("calendar",),
+    "김매기": ("calendar",),
+    "저장": ("calendar",),
+    # 토양 관리
+    "토양": ("soil",),
+    "흙": ("soil",),
+    "땅": ("soil",),
+    "비료": ("soil",),
+    "ph": ("soil",),
+    # 병해충
+    "병": ("pests",),
+    "해충": ("pests",),
+    "벌레": ("pests",),
+    "방제": ("pests",),
+    "약": ("pests",),
+    "병해충": ("pests",),
+    "응애": ("pests",),
+    "깍지": ("pests",),
+}
+
+# 시기 없이 날씨만 묻는 키워드 -> 현재 + 6시간 + 3일
+WEATHER_KEYWORDS = ["날씨", "비", "강수", "예보", "봄비", "장맛비", "소나기", "태풍", "우박", "서리"]
+WEATHER_DEFAULT_SECTIONS = (WEATHER_NOW, WEATHER_6H, WEATHER_3DAY)
+
+# 짧은 키워드의 경계 규칙 (나머지는 어디서든)
+# "비": 낱말 첫머리에서만, "병"/"약"/"땅"/"무": 낱말 하나 전체 (뒤에 조사는 허용)
+KEYWORD_BOUNDARIES = {
+    "비": "start",
+    "병": "word",
+    "약": "word",
+    "땅": "word",
+    "흙": "word",
+    "ph": "word",
+    "무": "word",
+}
+
+# 짧은 키워드를 포함하지만 의도가 없는 말 (등록해두면 "비료"가 "비"로 잡히지 않는 것처럼 막아줌)
+NON_INTENT_WORDS = ["비닐", "비용", "비교", "비밀", "비싸", "비슷", "비상", "비율", "비중", "비타민", "약간", "약속"]
+
+# 작물/병해충 어휘 - 늘려도 매칭 속도는 그대로
+CROP_VOCABULARY = ["감귤", "귤", "한라봉", "천혜향", "레드향", "황금향", "당근", "월동무", "무", "마늘", "양배추", "브로콜리", "비트", "콜라비"]
+PEST_VOCABULARY = [
+    "궤양병", "검은점무늬병", "더뎅이병", "잿빛곰팡이병", "탄저병", "노균병", "무름병", "뿌리혹병",
+    "진딧물", "총채벌레", "깍지벌레", "귤응애", "차먼지응애", "나방", "노린재", "선충", "농약", "약제",
+]
+CROP_INTENT = "crop"
+
+
+def _intent_matcher():
+    matcher = KeywordMatcher()
+    for keyword, names in CONTEXT_TRIGGERS.items():
+        matcher.add(keyword, names, KEYWORD_BOUNDARIES.get(keyword, "any"))
+    for keyword, names in TIME_TRIGGERS.items():
+        matcher.add(keyword, [horizon_intent(name) for name in names], KEYWORD_BOUNDARIES.get(keyword, "any"))
+    for keyword in WEATHER_KEYWORDS:
+        matcher.add(keyword, (WEATHER_INTENT,), KEYWORD_BOUNDARIES.get(keyword, "any"))
+    matcher.add_vocabulary(NON_INTENT_WORDS)
+    # 농사 지식 파일의 작물 이름/별칭도 작물로 (파일에 새로 넣은 별칭은 다음 시작 때부터)
+    for crop in dict.fromkeys(CROP_VOCABULARY + list(get_knowledge().aliases)):
+        matcher.add(crop, (CROP_INTENT,), KEYWORD_BOUNDARIES.get(crop, "any"))
+    matcher.add_vocabulary(PEST_VOCABULARY, ("pests",))
+    matcher.build()
+    return matcher
+
+
+# 질문 의도 매처 (시작할 때 한 번 만듦)
+INTENT_MATCHER = _intent_matcher()
+
+
+def _weather_now_section(region, weather, plan):
+    return format_current_context(region, weather.get("ultra_short_now")) + "\n"
+
+
+def _weather_6h_section(region, weather, plan):
+    return format_ultra_short_context(weather.get("ultra_short_fcst"), region)
+
+
+def _weather_3day_section(region, weather, plan):
+    return format_short_context(weather.get("short_forecast"), region)
+
+
+def _weather_mid_section(region, weather, plan):
+    return format_mid_context(weather.get("mid_temp"), weather.get("mid_land"), region)
+
+
+# 한 질문에 넣는 작물 수
+MAX_CONTEXT_CROPS = 3
+
+
+def _knowledge_entries(plan):
+    """
+    질문에 나온 작물의 오늘(순) 농사 지식 (작물이 없으면 기본 작물)
+    농사 지식에 없는 작물만 물으면 빈 목록 (다른 작물 정보를 넣지 않음)
+    """
+    knowledge = get_knowledge()
+    mentioned = [match.keyword for match in plan.matches if CROP_INTENT in match.intents]
+    if not mentioned:
+        entry = knowledge.lookup()
+        return [entry] if entry is not None else []
+
+    period = period_of()
+    crops = dict.fromkeys(filter(None, (knowledge.crop_for(word) for word in mentioned)))
+    return [knowledge.lookup(crop, period) for crop in list(crops)[:MAX_CONTEXT_CROPS]]
+
+
+def _calendar_section(region, weather, plan):
+    return "".join(entry.calendar_text for entry in _knowledge_entries(plan))
+
+
+def _soil_section(region, weather, plan):
+    return "".join(entry.soil_text for entry in _knowledge_entries(plan))
+
+
+def _pest_section(region, weather, plan):
+    return "".join(entry.pests_text for entry in _knowledge_entries(plan))
 
-def get_soil_recommendations():
-    """계절별 토양 관리"""
-    month = datetime.now().month
-    
-    if month in [3, 4, 5]:
-        return "봄철에는 석회 비료로 토양 pH를 5.5-6.5로 조정하고, 유기질 비료를 충분히 투입하세요."
-    elif month in [6, 7, 8]:
-        return "여름철에는 멀칭으로 토양 수분을 유지하고, 배수가 잘 되도록 관리하세요."
-    elif month in [9, 10, 11]:
-        return "가을철에는 수확 전 칼륨 비료를 추가하여 당도를 높이고, 착색을 개선하세요."
-    else:
-        return "겨울철에는 동해 방지를 위해 토양 피복과 수분 관리에 신경 쓰세요."
 
+def _documents_section(region, weather, plan):
+    # 영농 자료에서 질문과 관련된 조각 (관련 조각이 없으면 빈 문자열)
+    return format_passages(retrieve(plan.question))
 
-# ============================================
-# CONTEXT BUILDER
-# ============================================
 
-def build_context_for_llm(user_question, region="제주"):
-    """사용자 질문에 맞는 컨텍스트 구성"""
-    context_parts = []
-    question_lower = user_question.lower()
-    
-    # 날씨 관련 키워드 확인
-    weather_keywords = ["날씨", "기온", "비", "온도", "습도", "바람", "강수", "예보", "주간", "이번주", "다음주"]
-    is_weather_question = any(word in question_lower for word in weather_keywords)
-    
-    # 1. 날씨 정보 (날씨 관련 질문이면 포함)
-    if is_weather_question:
+# 섹션 순서 = 컨텍스트에 들어가는 순서
+CONTEXT_PIPELINE = ContextPipeline(
+    providers=(
+        ContextProvider(WEATHER_NOW, ("ultra_short_now",), _weather_now_section),
+        ContextProvider(WEATHER_6H, ("ultra_short_fcst",), _weather_6h_section),
+        ContextProvider(WEATHER_3DAY, ("short_forecast",), _weather_3day_section),
+        ContextProvider(WEATHER_MID, ("mid_temp", "mid_land"), _weather_mid_section),
+        ContextProvider("calendar", (), _calendar_section),
+        ContextProvider("soil", (), _soil_section),
+        ContextProvider("pests", (), _pest_section),
+        ContextProvider("documents", (), _documents_section),
+    ),
+    matcher=INTENT_MATCHER,
+    weather_defaults=WEATHER_DEFAULT_SECTIONS,
+    # 관련 키워드가 하나도 없으면 이달의 농사 정보
+    fallback=("calendar",),
+    # 영농 자료 검색은 점수로 관련성을 판단하므로 항상
+    always=("documents",),
+)
+
+# 영농 자료 색인을 시작할 때 열어둠 (없거나 자료가 바뀌었으면 다시 만듦)
+get_index()
+
+
+def plan_context(user_question):
+    """
+    질문 -> ContextPlan (넣을 섹션, 조회할 기상 상품)
+    """
+    return CONTEXT_PIPELINE.plan(user_question)
+
+
+def is_weather_question(user_question):
+    return bool(plan_context(user_question).products)
+
+
+def request_region(data):
+    """
+    요청에서 지역 꺼내기
+    농장 위치(lat, lon)가 있으면 "위도,경도", 없으면 location(읍/면/동) 또는 region
+    """
+    lat, lon = data.get("lat"), data.get("lon")
+    if lat not in (None, "") and lon not in (None, ""):
         try:
-            # 현재 날씨 + 단기예보 (3일)
-            weather_context = get_weather_for_context(region)
-            context_parts.append(f"=== 현재 날씨 및 3일 예보 ===\n{weather_context}\n")
-            
-            # 중기예보 추가 (4-10일)
-            cache_key = datetime.now().strftime("%Y%m%d%H")
-            mid_temp = get_mid_forecast(cache_key, region)
-            mid_land = get_mid_land_forecast(cache_key, region)
-            
-            if mid_temp and not mid_temp.get("error"):
-                mid_context = "\n=== 중기예보 (4-10일 후) ===\n"
-                forecast_data = mid_temp.get("forecast", {})
-                
-                for day_key in sorted(forecast_data.keys()):
-                    day_num = day_key.replace("day_", "")
-                    day_info = forecast_data[day_key]
-                    min_temp = day_info.get("min_temp", "N/A")
-                    max_temp = day_info.get("max_temp", "N/A")
-                    mid_context += f"{day_num}일 후: 최저 {min_temp}°C, 최고 {max_temp}°C\n"
-                
-                # 중기 육상예보 추가
-                if mid_land and not mid_land.get("error"):
-                    land_data = mid_land.get("forecast", {})
-                    for day_key in sorted(land_data.keys()):
-                        day_num = day_key.replace("day_", "")
-                        day_info = land_data[day_key]
-                        
-                        if "am_weather" in day_info:
-                            mid_context += f"  - 오전: {day_info.get('am_weather', 'N/A')} (강수확률 {day_info.get('am_rain_prob', 'N/A')}%)\n"
-                            mid_context += f"  - 오후: {day_info.get('pm_weather', 'N/A')} (강수확률 {day_info.get('pm_rain_prob', 'N/A')}%)\n"
-                        elif "weather" in day_info:
-                            mid_context += f"  - 날씨: {day_info.get('weather', 'N/A')} (강수확률 {day_info.get('rain_prob', 'N/A')}%)\n"
-                
-                context_parts.append(mid_context)
-        
-        except Exception as e:
-            print(f"Weather API Error: {e}")
-    
-    # 2. 농사 달력 (항상 포함)
-    calendar = get_farming_calendar()
-    if calendar:
-        context_parts.append(f"""
-=== 이달의 농사 정보 ===
-주요 작업: {', '.join(calendar['tasks'])}
-팁: {calendar['tips']}
-""")
-    
-    # 3. 토양 관리
-    if any(word in question_lower for word in ["토양", "흙", "땅", "비료", "ph"]):
-        soil = get_soil_recommendations()
-        context_parts.append(f"\n=== 토양 관리 ===\n{soil}\n")
-    
-    # 4. 병해충 정보
-    if any(word in question_lower for word in ["병", "해충", "벌레", "방제", "약", "병해충", "응애", "깍지"]):
-        pests = get_pest_alerts()
-        context_parts.append(f"""
-=== 병해충 정보 ===
-주의 병해충: {', '.join(pests['high_risk'])}
-예방 조치: {pests['prevention']}
-""")
-    
-    return "\n".join(context_parts) if context_parts else ""
+            return format_latlon(lat, lon)
+        except (TypeError, ValueError):
+            pass
+    return data.get("location") or data.get("region") or "제주"  # 기본값: 제주
+
+
+def request_conversation(data):
+    """
+    요청의 conversation_id에 해당하는 대화 (없으면 None - 한 번만 묻는 질문)
+    서버에 기록이 없으면 브라우저가 보낸 최근 대화(history)로 채움
+    """
+    return CONVERSATIONS.get(data.get("conversation_id"), seed=data.get("history"))
+
+
+def build_context_for_llm(user_question, region="제주", weather=None, plan=None):
+    """
+    사용자 질문에 맞는 컨텍스트 구성
+    질문에 필요한 섹션만 만들고, 그 섹션에 필요한 기상 상품만 동시 조회
+    영농 자료에서 관련 조각을 찾으면 토큰 예산(RETRIEVAL_TOKEN_BUDGET) 안에서 함께 넣음
+    weather: 이미 조회한 fetch_weather_products() 결과 (비동기 경로에서 전달)
+    plan: 이미 만든 plan_context() 결과 (없으면 여기서 만듦)
+    """
+    if plan is None:
+        plan = plan_context(user_question)
+    return CONTEXT_PIPELINE.build(plan, region, weather, fetch=fetch_weather_products)
 
 
 # ============================================
@@ -224,16 +327,18 @@ def ask():
     try:
         data = request.get_json()
         question = data.get("question")
-        region = data.get("region", "제주")  # 기본값: 제주
+        region = request_region(data)
 
         if not question or not question.strip():
             return jsonify({"answer": "질문을 입력해주세요."}), 400
 
+        conversation = request_conversation(data)
+
         # 실시간 API 데이터로 컨텍스트 구성
         api_context = build_context_for_llm(question, region)
         
-        # LLM 호출
-        answer = call_llm(question, api_context)
+        # LLM 호출 (이어지는 대화면 지난 대화 포함)
+        answer = call_llm(question, api_context, conversation)
         return jsonify({"answer": answer})
     
     except Exception as e:
@@ -241,77 +346,215 @@ def ask():
         return jsonify({"answer": "죄송합니다. 오류가 발생했습니다. 다시 시도해주세요."}), 500
 
 
+@app.route("/ask/stream", methods=["POST"])
+def ask_stream():
+    """
+    /ask 스트리밍 버전 (Server-Sent Events)
+    data: {"delta": "..."} 이벤트를 토큰이 도착하는 대로 보내고
+    마지막에 event: done 을 보냄
+    """
+    data = request.get_json(silent=True) or {}
+    question = data.get("question")
+    region = request_region(data)
+
+    if not question or not question.strip():
+        return jsonify({"answer": "질문을 입력해주세요."}), 400
+
+    conversation = request_conversation(data)
+
+    try:
+        api_context = build_context_for_llm(question, region)
+    except Exception as e:
+        print(f"Error in /ask/stream route: {str(e)}")
+        api_context = ""
+
+    def generate():
+        try:
+            for delta in call_llm_stream(question, api_context, conversation):
+                yield f"data: {json.dumps({'delta': delta}, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            print(f"Error in /ask/stream route: {str(e)}")
+            message = "죄송합니다. 오류가 발생했습니다. 다시 시도해주세요."
+            yield f"data: {json.dumps({'delta': message}, ensure_ascii=False)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # nginx 버퍼링 끄기
+        }
+    )
+
+
 @app.route("/api/regions", methods=["GET"])
 def get_regions():
-    """사용 가능한 지역 목록 반환"""
-    return jsonify({
-        "regions": list(SHORT_FORECAST_COORDS.keys())
-    })
+    """사용 가능한 지역 목록 반환 (제주 읍/면/동, 별칭 포함)"""
+    return jsonify(REGIONS.names())
 
 
 @app.route("/api/weather/<region>", methods=["GET"])
 def get_weather(region):
-    """특정 지역 날씨 조회"""
+    """
+    특정 지역 날씨 조회
+    region: 지역 이름, 읍/면/동, "위도,경도" (또는 ?lat=..&lon=.. 쿼리)
+    """
     try:
+        region = request_region(dict(request.args.to_dict(), region=region))
         weather = get_weather_for_context(region)
         return jsonify({"weather": weather})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+# 한 번에 조회할 수 있는 최대 지역 수
+BATCH_MAX_REGIONS = 50
+
+
+@app.route("/api/weather/batch", methods=["GET", "POST"])
+def get_weather_batch():
+    """
+    여러 지역 날씨를 한 번에 조회 (대시보드용)
+    GET  /api/weather/batch?regions=제주시;서귀포시&products=short_forecast
+         (지역은 ";"로 구분하거나 regions=를 여러 번, "위도,경도"의 쉼표는 좌표로 봄)
+    POST {"regions": ["제주시", "애월읍"] 또는 "all", "products": [...]}
+    regions=all 이면 등록된 모든 도시, 모르는 지역 이름이 있으면 400
+    """
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        regions = data.get("regions", "all")
+        products = data.get("products")
+    else:
+        regions = [r for value in request.args.getlist("regions") for r in value.split(";")]
+        products = request.args.get("products")
+        if not regions or regions == ["all"]:
+            regions = "all"
+        if products:
+            products = products.split(",")
+
+    if regions == "all":
+        regions = list(REGIONS.cities)
+    if not isinstance(regions, list) or not regions:
+        return jsonify({"error": "regions는 지역 목록 또는 \"all\"이어야 합니다."}), 400
+    regions = list(dict.fromkeys(str(r).strip() for r in regions if str(r).strip()))
+    if len(regions) > BATCH_MAX_REGIONS:
+        return jsonify({"error": f"한 번에 최대 {BATCH_MAX_REGIONS}개 지역까지 조회할 수 있습니다."}), 400
+    unknown = [r for r in regions if not REGIONS.is_known(r)]
+    if unknown:
+        return jsonify({"error": f"알 수 없는 지역: {', '.join(unknown)}"}), 400
+
+    products = products or list(PRODUCT_REQUESTS)
+    unknown = [p for p in products if p not in PRODUCT_REQUESTS]
+    if unknown:
+        return jsonify({"error": f"알 수 없는 상품: {', '.join(unknown)}"}), 400
+
+    try:
+        results, unique_fetches = fetch_weather_batch(regions, products)
+    except Exception as e:
+        print(f"Error in /api/weather/batch route: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+    body = {}
+    for region, product_results in results.items():
+        codes = resolve_region(region)
+        body[region] = {
+            "name": codes.name,
+            "codes": {
+                "nx": codes.nx, "ny": codes.ny,
+                "mid_temp": codes.mid_temp, "mid_land": codes.mid_land, "mid_stn": codes.mid_stn,
+            },
+            # 같은 코드의 지역끼리 레코드를 공유하므로 지역 이름은 위의 name 사용
+            "products": {
+                product: result if is_error(result) else result.to_dict()
+                for product, result in product_results.items()
+            },
+        }
+    return jsonify({
+        "regions": body,
+        "requested": len(regions) * len(products),
+        "unique_fetches": unique_fetches,
+    })
+
+
+@app.route("/api/cache/stats", methods=["GET"])
+def cache_stats():
+    """날씨 캐시, 답변 캐시 hit/miss/eviction 통계"""
+    stats = get_cache_stats()
+    stats["answers"] = answer_cache_stats()
+    stats["conversations"] = CONVERSATIONS.stats()
+    stats["knowledge"] = get_knowledge().stats()
+    stats["documents"] = document_stats()
+    return jsonify(stats)
+
+
 # ============================================
 # LLM CALL
 # ============================================
 
-def call_llm(prompt, api_context=""):
-    url = LINK
-    headers = {
+def _llm_headers():
+    return {
         "Authorization": f"Bearer {API_KEY}",
         "Content-Type": "application/json",
         "HTTP-Referer": "http://localhost:5000",
         "X-Title": "Jeju Farmer AI"
     }
 
-    system_content = f"""너는 제주도의 농민들을 돕는 친절한 AI 농업 전문가다. 
-제주도의 기후와 토양 특성을 고려하여 조언해라.
-귤 농사, 밭농사, 토양 관리, 병해충 방제, 비료 사용 등에 대해 실용적이고 구체적인 답변을 제공해라.
-항상 자연스러운 한국어로 대답하고, 농민들이 쉽게 이해할 수 있도록 어려운 전문 용어는 피하거나 쉽게 풀어서 설명해라.
-답변은 친근하고 따뜻한 어조로, 존댓말을 사용해라.
-
-[CHATTEEN_AI_IDENTITY]
-너의 이름은 귤담 AI(Gyuldam AI) 이다.
-귤담 AI(Gyuldam AI)는 학생 주도의 농업 지원 프로젝트인 틴저린 프로젝트 (Teengerine Project)가 개발한 AI 도우미이다.
-정보 제공과 설명을 돕는 역할에 집중한다.
-
-[TEENGERINE_PROJECT_CONTEXT]
-틴저린 프로젝트 (Teengerine Project)는 학생들이 제주 지역 농가를 직접 방문해 현장 농작업을 돕고 SNS 운영을 통해 F2T 판매를 지원하는 프로젝트이다.
-현재 약 10개 농가와 함께 운영되고 있습니다.
-
-중요한 원칙:
-- 사용자가 묻지 않으면 프로젝트를 먼저 언급하지 마세요.
-- 자신을 운영 주체처럼 표현하지 마세요.
-- 농가 입장에서 도움이 되는 정보를 중심으로 설명하세요.
-
-아래는 실시간 기상 정보와 농사 정보입니다. 답변할 때 이 정보를 자연스럽게 활용하세요:
-{api_context}
-
-위 정보를 자연스럽게 답변에 녹여서 활용하되, 사용자가 물어보지 않은 정보는 강제로 언급하지 마세요."""
-
-    payload = {
-        "model": MODEL_NAME,
-        "messages": [
-            {"role": "system", "content": system_content},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.7,
-        "max_tokens": 2000
-    }
+
+# 모델/생성 설정 (요청마다 같은 부분)
+LLM_OPTIONS = {
+    "model": MODEL_NAME,
+    "temperature": 0.7,
+    "max_tokens": 2000
+}
+
+
+def _llm_payload(prompt, api_context="", stream=False, conversation=None):
+    # 고정 system 프롬프트가 항상 맨 앞에 오고, 지난 대화, 실시간 정보 + 질문 순서
+    # (prompt prefix 캐시 재사용 - llm_prompt.py 참고)
+    summary, history = conversation.history() if conversation is not None else ("", [])
+    payload = dict(LLM_OPTIONS, messages=build_messages(prompt, api_context, history, summary))
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+def _answer_lookup(prompt, api_context, conversation):
+    """
+    (저장된 답변, 캐시 키)
+    지난 대화가 있는 질문("그럼 내일은요?")은 앞 대화에 따라 답이 달라지므로 캐시를 쓰지 않음
+    """
+    if conversation is not None and len(conversation):
+        return None, None
+    return cached_answer(prompt, api_context)
+
+
+def _answered(prompt, answer, key, conversation):
+    # 정상 답변만 캐시와 대화 기록에 남김
+    store_answer(key, answer, weather=is_weather_question(prompt), question=prompt)
+    if conversation is not None:
+        conversation.add(prompt, answer)
+
+
+def call_llm(prompt, api_context="", conversation=None):
+    # 같은 참고 정보로 같은 질문을 이미 했으면 저장된 답변
+    answer, key = _answer_lookup(prompt, api_context, conversation)
+    if answer is not None:
+        if conversation is not None:
+            conversation.add(prompt, answer)
+        return answer
+
+    url = LINK
+    headers = _llm_headers()
+    payload = _llm_payload(prompt, api_context, conversation=conversation)
 
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        response = http_post(url, headers=headers, json=payload, timeout=30)
         response.raise_for_status()
         result = response.json()
-        return result["choices"][0]["message"]["content"]
+        answer = result["choices"][0]["message"]["content"]
+        _answered(prompt, answer, key, conversation)
+        return answer
 
     except requests.exceptions.Timeout:
         return "응답 시간이 초과되었습니다. 다시 시도해주세요."
@@ -326,15 +569,115 @@ def call_llm(prompt, api_context=""):
         return f"오류가 발생했습니다: {str(e)}"
 
 
+async def call_llm_async(prompt, api_context="", conversation=None):
+    """
+    call_llm의 asyncio 버전 (asgi.py에서 사용)
+    응답을 기다리는 동안 이벤트 루프가 다른 질문을 처리할 수 있음
+    """
+    import httpx
+
+    answer, key = _answer_lookup(prompt, api_context, conversation)
+    if answer is not None:
+        if conversation is not None:
+            conversation.add(prompt, answer)
+        return answer
+
+    try:
+        response = await async_http_post(
+            LINK, headers=_llm_headers(),
+            json=_llm_payload(prompt, api_context, conversation=conversation), timeout=30
+        )
+        response.raise_for_status()
+        result = response.json()
+        answer = result["choices"][0]["message"]["content"]
+        _answered(prompt, answer, key, conversation)
+        return answer
+
+    except httpx.TimeoutException:
+        return "응답 시간이 초과되었습니다. 다시 시도해주세요."
+    except httpx.HTTPError as e:
+        print(f"API Request Error: {str(e)}")
+        return "AI 서비스에 연결할 수 없습니다. 잠시 후 다시 시도해주세요."
+    except KeyError as e:
+        print(f"Response parsing error: {str(e)}")
+        return "응답을 처리하는 중 오류가 발생했습니다."
+    except Exception as e:
+        print(f"Unexpected error: {str(e)}")
+        return f"오류가 발생했습니다: {str(e)}"
+
+
+def call_llm_stream(prompt, api_context="", conversation=None):
+    """
+    LLM 답변을 토큰이 도착하는 대로 조각(str) 단위로 반환하는 generator
+    OpenRouter SSE 응답(data: {...})을 읽어서 delta.content만 꺼냄
+    저장된 답변이 있으면 한 조각으로 바로 반환, 끝까지 받은 답변은 저장
+    """
+    answer, key = _answer_lookup(prompt, api_context, conversation)
+    if answer is not None:
+        if conversation is not None:
+            conversation.add(prompt, answer)
+        yield answer
+        return
+
+    url = LINK
+    headers = _llm_headers()
+    payload = _llm_payload(prompt, api_context, stream=True, conversation=conversation)
+
+    try:
+        # (연결 timeout, 토큰 사이 최대 대기 시간)
+        with http_post(url, headers=headers, json=payload, stream=True, timeout=(5, 30)) as response:
+            response.raise_for_status()
+            response.encoding = "utf-8"
+            parts = []
+
+            for line in response.iter_lines(decode_unicode=True):
+                # 빈 줄, ": OPENROUTER PROCESSING" 같은 주석 줄은 건너뜀
+                if not line or not line.startswith("data:"):
+                    continue
+
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    _answered(prompt, "".join(parts), key, conversation)
+                    break
+
+                chunk = json.loads(data)
+                if "error" in chunk:
+                    print(f"Stream error: {chunk['error']}")
+                    yield "\n\nAI 응답 중 오류가 발생했습니다."
+                    return
+
+                choices = chunk.get("choices") or [{}]
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    parts.append(delta)
+                    yield delta
+
+    except requests.exceptions.Timeout:
+        yield "응답 시간이 초과되었습니다. 다시 시도해주세요."
+    except requests.exceptions.RequestException as e:
+        print(f"API Request Error: {str(e)}")
+        yield "AI 서비스에 연결할 수 없습니다. 잠시 후 다시 시도해주세요."
+    except (KeyError, ValueError) as e:
+        print(f"Response parsing error: {str(e)}")
+        yield "응답을 처리하는 중 오류가 발생했습니다."
+
+
 if __name__ == "__main__":
     print("=" * 50)
     print("제주 농민 AI 도우미 시작")
     print("=" * 50)
+    print(f"시스템 프롬프트: {PROMPT_STATS['system_chars']}자, 약 {PROMPT_STATS['system_tokens']}토큰 (고정, prefix 캐시 대상)")
     print("\n⚠️  중요: 기상청 API 키를 설정하세요!")
     print("   1. https://www.data.go.kr/ 에서 회원가입")
     print("   2. '기상청_단기예보 조회서비스' API 신청")
     print("   3. app.py 파일의 KMA_API_KEY에 키 입력")
     print("\n서버 시작 중...\n")
+
+    # 기상청 발표 직후 예보 미리 가져오기 (WEATHER_PREFETCH=1 일 때)
+    # gunicorn은 gunicorn.conf.py, asgi.py는 lifespan에서 시작
+    from weather_prefetch import WEATHER_PREFETCH_ENABLED, start_prefetcher
+    if WEATHER_PREFETCH_ENABLED:
+        start_prefetcher()
     
     ###app.run(debug=True, host='0.0.0.0', port=5000)
     app.run()
@@ -0,0 +1,106 @@
+"""
+ASGI 진입점 - 비동기 /ask 처리
+날씨 조회와 LLM 호출을 asyncio로 처리해서, 응답을 기다리는 동안
+워커 하나가 수백 개의 질문을 동시에 받을 수 있음
+
+실행 방법:
+    uvicorn asgi:application --host 0.0.0.0 --port 5000 --workers 2
+
+POST /ask 만 비동기로 처리하고, 나머지 경로(/, /ask/stream, /api/...)는
+기존 Flask 앱(WSGI)으로 그대로 전달
+"""
+
+import json
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app import (
+    app, build_context_for_llm, plan_context, call_llm_async,
+    request_region, request_conversation
+)
+from http_client import close_async_client
+from weather_api import fetch_weather_products_async
+from weather_prefetch import WEATHER_PREFETCH_ENABLED, start_prefetcher
+
+flask_app = WsgiToAsgi(app)
+
+# 요청 본문 최대 크기 (질문 하나에 충분한 크기)
+MAX_BODY_SIZE = 64 * 1024
+
+
+async def read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY_SIZE:
+            raise ValueError("요청 본문이 너무 큽니다")
+        if not message.get("more_body", False):
+            return body
+
+
+async def send_json(send, status, data):
+    body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"access-control-allow-origin", b"*"),  # flask-cors 기본 설정과 동일
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def ask(scope, receive, send):
+    try:
+        data = json.loads(await read_body(receive) or b"{}")
+        question = data.get("question")
+        region = request_region(data)
+
+        if not question or not question.strip():
+            await send_json(send, 400, {"answer": "질문을 입력해주세요."})
+            return
+
+        # 질문에 필요한 기상 상품만 이벤트 루프에서 동시 조회
+        plan = plan_context(question)
+        weather = None
+        if plan.products:
+            weather = await fetch_weather_products_async(region, plan.products)
+
+        api_context = build_context_for_llm(question, region, weather, plan)
+
+        # LLM 호출 (이어지는 대화면 지난 대화 포함)
+        answer = await call_llm_async(question, api_context, request_conversation(data))
+        await send_json(send, 200, {"answer": answer})
+
+    except Exception as e:
+        print(f"Error in async /ask route: {str(e)}")
+        await send_json(send, 500, {"answer": "죄송합니다. 오류가 발생했습니다. 다시 시도해주세요."})
+
+
+async def lifespan(scope, receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # 워커가 여러 개여도 잠금을 잡은 하나만 prefetch (WEATHER_PREFETCH=1 일 때)
+            if WEATHER_PREFETCH_ENABLED:
+                start_prefetcher()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_async_client()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(scope, receive, send)
+        return
+
+    if scope["type"] == "http" and scope["path"] == "/ask" and scope["method"] == "POST":
+        await ask(scope, receive, send)
+        return
+
+    await flask_app(scope, receive, send)
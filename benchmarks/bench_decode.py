@@ -0,0 +1,115 @@
+"""
+기상청 항목(category) 디코딩 마이크로벤치마크
+
+fixtures/의 단기예보 전체 응답(14개 항목, 1088행)을
+1. 예전 방식: 항목마다 if/elif 분기 + sky_map/pty_map을 매번 새로 만들고 시간대별 dict에 문자열 저장
+2. 현재 방식: kma_categories 코드표 + ForecastSeries.extend (한 번 훑기, 항목별 배열)
+로 해석해서 시간과 메모리 할당량을 비교
+
+실행: python benchmarks/bench_decode.py
+"""
+
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import weather_api  # noqa: E402
+
+FIXTURE = os.path.join(
+    os.path.dirname(__file__), "fixtures", "getVilageFcst_20261017_0500_52_38.json"
+)
+ISSUED = datetime(2026, 10, 17, 5, 0)
+
+
+def legacy_parse(items):
+    """
+    코드표 도입 전의 파싱 방식 (모든 항목을 다루도록 확장한 것)
+    """
+    forecast_by_time = {}
+    for item in items:
+        key = item.get("fcstDate") + item.get("fcstTime")
+        category = item.get("category")
+        value = item.get("fcstValue")
+
+        if key not in forecast_by_time:
+            forecast_by_time[key] = {}
+        slot = forecast_by_time[key]
+
+        if category == "TMP":
+            slot["temp"] = f"{value}°C"
+        elif category == "TMN":
+            slot["min_temp"] = f"{value}°C"
+        elif category == "TMX":
+            slot["max_temp"] = f"{value}°C"
+        elif category == "POP":
+            slot["rain_prob"] = f"{value}%"
+        elif category == "SKY":
+            sky_map = {"1": "맑음", "3": "구름많음", "4": "흐림"}
+            slot["sky"] = sky_map.get(value, "알 수 없음")
+        elif category == "PTY":
+            pty_map = {"0": "없음", "1": "비", "2": "비/눈", "3": "눈", "4": "소나기"}
+            slot["pty"] = pty_map.get(value, "없음")
+        elif category == "PCP":
+            slot["rainfall"] = value
+        elif category == "SNO":
+            slot["snow"] = value
+        elif category == "REH":
+            slot["humidity"] = f"{value}%"
+        elif category == "WSD":
+            slot["wind_speed"] = f"{value}m/s"
+        elif category == "VEC":
+            slot["wind_dir"] = f"{value}deg"
+        elif category == "UUU":
+            slot["wind_u"] = f"{value}m/s"
+        elif category == "VVV":
+            slot["wind_v"] = f"{value}m/s"
+        elif category == "WAV":
+            slot["wave"] = f"{value}M"
+    return forecast_by_time
+
+
+def table_parse(items):
+    return weather_api._parse_short_forecast(items, "제주시", ISSUED)
+
+
+def allocations(fn, items):
+    """
+    fn(items) 한 번에 새로 할당된 메모리 블록 수와 결과가 차지하는 바이트
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = fn(items)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(s.count_diff for s in stats if s.count_diff > 0)
+    size = sum(s.size_diff for s in stats if s.size_diff > 0)
+    del result
+    return blocks, size
+
+
+def main():
+    with open(FIXTURE, encoding="utf-8") as f:
+        items = json.load(f)["response"]["body"]["items"]["item"]
+    categories = sorted({item["category"] for item in items})
+    print(f"입력: {len(items)}행, 항목 {len(categories)}개 ({', '.join(categories)})")
+
+    record = table_parse(items)
+    assert len(record) == len(legacy_parse(items))
+    assert set(categories) <= set(record.columns)
+
+    number = 300
+    for name, fn in (("if/elif", legacy_parse), ("코드표", table_parse)):
+        seconds = min(timeit.repeat(lambda: fn(items), number=number, repeat=3))
+        blocks, size = allocations(fn, items)
+        print(f"{name:8s} {seconds / number * 1000:.3f} ms/회, "
+              f"할당 {blocks}블록 / {size / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
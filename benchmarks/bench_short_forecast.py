@@ -0,0 +1,136 @@
+"""
+단기예보(getVilageFcst) 조회/파싱 벤치마크
+
+fixtures/의 전체 크기 응답(05시 발표, 4일치 12개 항목 + TMN/TMX = 1088행)으로
+1. 예전 요청(numOfRows=100)이 얼마나 잘렸는지
+2. 한 페이지 조회가 전체 항목을 빠짐없이 받는지
+3. totalCount가 한 페이지보다 클 때 나머지 페이지(_page_executor)를 순서대로 합치는지
+   (뒤 페이지가 먼저 도착하도록 응답을 늦춤)
+4. 3일치 최저/최고 기온이 모두 채워지는지
+5. 파싱 시간
+을 확인
+
+실행: python benchmarks/bench_short_forecast.py
+"""
+
+import json
+import os
+import sys
+import time
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import weather_api  # noqa: E402
+
+FIXTURE = os.path.join(
+    os.path.dirname(__file__), "fixtures", "getVilageFcst_20261017_0500_52_38.json"
+)
+REGION = "제주시"
+ISSUED = datetime(2026, 10, 17, 5, 0)
+
+
+class RecordedResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+def serve_pages(recorded, calls, delay=0.0):
+    """
+    기록된 응답을 numOfRows/pageNo에 맞게 잘라서 돌려주는 http_get 대체 함수
+    delay: 앞 페이지일수록 늦게 응답 (마지막 페이지까지 남은 페이지 수 x delay초)
+    """
+    all_items = recorded["response"]["body"]["items"]["item"]
+    total_count = int(recorded["response"]["body"]["totalCount"])
+
+    def fake_get(url, params=None, timeout=None):
+        calls.append(dict(params))
+        size, page = int(params["numOfRows"]), int(params["pageNo"])
+        if delay:
+            time.sleep(delay * max(0, -(-total_count // size) - page))
+        body = dict(recorded["response"]["body"])
+        body["items"] = {"item": all_items[(page - 1) * size:page * size]}
+        body["numOfRows"], body["pageNo"] = size, page
+        return RecordedResponse({"response": {"header": recorded["response"]["header"], "body": body}})
+
+    return fake_get
+
+
+def short_request(page_size, merged=None):
+    req = weather_api._short_forecast_request(REGION)
+    params = dict(req.params, base_date="20261017", base_time="0500", numOfRows=page_size)
+    req = req._replace(issued=ISSUED, params=params)
+    if merged is not None:
+        # 합쳐진 items를 그대로 기록해서 순서 확인
+        parse = req.parse
+        req = req._replace(parse=lambda items: merged.extend(items) or parse(items))
+    return req
+
+
+def check_complete(result, items, days):
+    assert not weather_api.is_error(result), result
+    assert len(result) == len({(i["fcstDate"], i["fcstTime"]) for i in items})
+    daily = result.daily()
+    for day in days:
+        info = daily[day]
+        for field in ("min_temp", "max_temp", "rain_prob", "sky"):
+            assert field in info, (day, field)
+    return daily
+
+
+def main():
+    with open(FIXTURE, encoding="utf-8") as f:
+        recorded = json.load(f)
+    items = recorded["response"]["body"]["items"]["item"]
+    days = sorted({item["fcstDate"] for item in items})[:3]
+    print(f"기록된 응답: {len(items)}행")
+
+    # 1. 예전 방식: numOfRows=100 한 페이지만
+    truncated = weather_api._parse_short_forecast(items[:100], REGION, ISSUED).daily()
+    missing = [d for d in days if "max_temp" not in truncated.get(d, {})]
+    print(f"numOfRows=100: {len(truncated)}일, 최고기온 없는 날 {missing}")
+
+    original_get = weather_api.http_get
+    try:
+        # 2. 현재 방식: 한 페이지에 전체 (넘치면 나머지 페이지 병렬 조회)
+        calls = []
+        weather_api.http_get = serve_pages(recorded, calls)
+        result = weather_api._load(short_request(weather_api.SHORT_FORECAST_PAGE_SIZE))
+        print(f"numOfRows={weather_api.SHORT_FORECAST_PAGE_SIZE}: 요청 {len(calls)}회, "
+              f"시간별 {len(result)}개")
+        assert len(calls) == 1, "전체 응답이 한 페이지에 들어가야 함"
+
+        # 3. totalCount가 페이지 크기보다 큰 경우: 나머지 페이지를 병렬로 받고 순서대로 합침
+        page_size = 256
+        calls, merged = [], []
+        weather_api.http_get = serve_pages(recorded, calls, delay=0.02)
+        paged = weather_api._load(short_request(page_size, merged))
+        pages = [int(c["pageNo"]) for c in calls]
+        print(f"numOfRows={page_size}: 요청 {len(calls)}회 (페이지 {sorted(pages)}), "
+              f"시간별 {len(paged)}개")
+        assert sorted(pages) == list(range(1, -(-len(items) // page_size) + 1)), pages
+        assert merged == items, "페이지가 순서대로 합쳐져야 함"
+    finally:
+        weather_api.http_get = original_get
+
+    # 4. 완전성 확인
+    daily = check_complete(result, items, days)
+    paged_daily = check_complete(paged, items, days)
+    assert all(paged_daily[d] == daily[d] for d in days)
+    print(f"3일 예보: {[(d, daily[d]['min_temp'], daily[d]['max_temp']) for d in days]}")
+
+    # 5. 파싱 시간
+    number = 200
+    seconds = timeit.timeit(lambda: weather_api._parse_short_forecast(items, REGION, ISSUED), number=number)
+    print(f"파싱: {seconds / number * 1000:.3f} ms/회 ({len(items)}행)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+LLM 컨텍스트 파이프라인
+질문에 필요한 섹션(제공자)만 골라서, 필요한 기상 상품만 조회하고 필요한 섹션만 만듦
+
+- ContextProvider: 섹션 하나 (이름, 필요한 기상 상품, 만드는 함수)
+  필요한 상품이 곧 필요한 지역 코드 (초단기/단기는 격자 nx/ny, 중기는 구역 regId)
+- 키워드 -> 제공자는 KeywordMatcher(Aho-Corasick) 하나로 질문을 한 번만 훑어서 찾음
+  (의도 = 제공자 이름, 시기 없는 날씨 키워드는 WEATHER_INTENT,
+   "오늘"/"내일" 같은 시기 말은 horizon_intent(제공자) - 날씨를 묻는 말이 함께 있을 때만 그 제공자를 고름)
+- plan(): 질문 -> ContextPlan (고른 제공자, 조회할 상품, 맞은 키워드와 위치)
+- build(): 계획대로 상품을 한 번에 조회하고 (이미 조회한 결과가 있으면 그대로 사용)
+  고른 제공자만 섹션을 만듦
+"""
+
+from collections import namedtuple
+
+# render(region, weather, plan) -> 섹션 문자열 (빈 문자열이면 생략)
+# plan: 이 질문의 ContextPlan (plan.matches에서 작물 이름 등을 꺼내 씀)
+# products: 이 섹션에 필요한 기상 상품 (weather_api.PRODUCT_FETCHERS 키)
+ContextProvider = namedtuple("ContextProvider", ["name", "products", "render"])
+
+# providers: 섹션 순서대로, products: 한 번에 조회할 기상 상품
+# matches: 질문에서 맞은 키워드 [keyword_matcher.Match] (작물 이름 등 섹션에서 사용)
+# question: 원래 질문 (자료 검색 등 질문 전체가 필요한 섹션에서 사용)
+ContextPlan = namedtuple("ContextPlan", ["providers", "products", "matches", "question"])
+
+# 시기 없이 날씨만 묻는 키워드("날씨", "비")의 의도
+WEATHER_INTENT = "weather"
+
+_HORIZON_PREFIX = "horizon:"
+
+
+def horizon_intent(name):
+    """
+    시기 말("오늘", "다음주")의 의도 - 날씨를 묻는 질문일 때만 제공자 name을 고름
+    """
+    return _HORIZON_PREFIX + name
+
+
+class ContextPipeline:
+    """
+    제공자 목록과 키워드 매처로 만든 파이프라인 (시작할 때 한 번 만들고 이후 읽기 전용)
+
+    matcher: KeywordMatcher (의도 = 제공자 이름 또는 WEATHER_INTENT)
+      제공자가 아닌 의도(작물 이름 등)는 섹션을 고르지 않고 plan.matches에만 남음
+    weather_defaults: 시기 없이 날씨만 묻는 키워드("날씨", "비")일 때 쓸 제공자
+      (다른 키워드로 이미 날씨 섹션을 골랐으면 추가하지 않음)
+    fallback: 아무 제공자도 고르지 못했을 때 쓸 제공자
+    always: 키워드와 상관없이 항상 넣는 제공자 (자료 검색처럼 섹션이 스스로 관련성을 판단)
+    """
+
+    def __init__(self, providers, matcher, weather_defaults=(), fallback=(), always=()):
+        self.providers = tuple(providers)
+        self._by_name = {provider.name: provider for provider in self.providers}
+        self._order = {provider.name: i for i, provider in enumerate(self.providers)}
+
+        self.matcher = matcher
+        self.weather_defaults = frozenset(weather_defaults)
+        self.fallback = frozenset(fallback)
+        self.always = frozenset(always)
+
+        unknown = (self.weather_defaults | self.fallback | self.always) - set(self._by_name)
+        if unknown:
+            raise ValueError(f"등록되지 않은 제공자: {sorted(unknown)}")
+
+    def plan(self, question):
+        """
+        질문 -> ContextPlan
+        """
+        matches = self.matcher.find(question)
+        names = set()
+        horizons = set()
+        weather_asked = False
+        for match in matches:
+            for intent in match.intents:
+                if intent == WEATHER_INTENT:
+                    weather_asked = True
+                elif intent.startswith(_HORIZON_PREFIX):
+                    horizons.add(intent[len(_HORIZON_PREFIX):])
+                elif intent in self._by_name:
+                    names.add(intent)
+
+        # 시기 말은 날씨를 물을 때만 ("날씨", "비" 또는 "기온"처럼 날씨 섹션을 고른 말과 함께)
+        if weather_asked or any(self._by_name[name].products for name in names):
+            names |= horizons & set(self._by_name)
+        if weather_asked and not any(self._by_name[name].products for name in names):
+            names |= self.weather_defaults
+        if not names:
+            names = set(self.fallback)
+        names |= self.always
+
+        providers = sorted((self._by_name[name] for name in names), key=lambda p: self._order[p.name])
+        products = []
+        for provider in providers:
+            products.extend(p for p in provider.products if p not in products)
+        return ContextPlan(tuple(providers), tuple(products), tuple(matches), question)
+
+    def build(self, plan, region, weather=None, fetch=None):
+        """
+        계획대로 섹션을 만들어 이어 붙인 문자열
+        weather: 이미 조회한 {상품: 결과} (비동기 경로), 없으면 fetch(region, products)로 조회
+        """
+        if weather is None and plan.products and fetch is not None:
+            try:
+                weather = fetch(region, plan.products)
+            except Exception as e:
+                print(f"Weather API Error: {e}")
+        weather = weather or {}
+
+        sections = []
+        for provider in plan.providers:
+            try:
+                section = provider.render(region, weather, plan)
+            except Exception as e:
+                print(f"Context section error ({provider.name}): {e}")
+                continue
+            if section:
+                sections.append(section)
+        return "\n".join(sections)
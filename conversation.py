@@ -0,0 +1,208 @@
+"""
+대화 기록 (여러 번 주고받는 질문)
+conversation_id별로 지난 질문/답변을 서버에 보관하고, LLM에는 토큰 예산 안의 최근 대화만 보냄
+
+- 최근 대화가 HISTORY_TOKEN_BUDGET을 넘으면 오래된 것부터 빼서 "이전 질문" 요약 줄로 옮김
+  (요약은 질문만 짧게 남기고 개수도 제한 -> 대화가 아무리 길어도 프롬프트 크기는 일정)
+- 저장하는 답변도 HISTORY_ANSWER_CHARS 글자까지만 (긴 답변 전체를 매번 다시 보내지 않음)
+- 서버가 재시작됐거나 다른 워커면 브라우저가 보낸 최근 대화(history)로 다시 채움
+  이미 가진 대화라도 브라우저 쪽이 더 길거나 마지막 대화가 다르면 (다른 워커에서 이어진 대화)
+  브라우저가 보낸 대화로 바꿈
+- 오래 안 쓴 대화는 CONVERSATION_TTL 후, 개수가 넘치면 가장 오래 안 쓴 것부터 제거
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from llm_prompt import estimate_tokens
+
+# 최근 대화(질문+답변)에 쓰는 토큰 예산
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1200"))
+
+# 대화 기록에 남기는 답변 길이 (글자)
+HISTORY_ANSWER_CHARS = 600
+
+# 요약 줄에 남기는 이전 질문 개수, 질문 하나 길이 (글자)
+SUMMARY_MAX_QUESTIONS = 8
+SUMMARY_QUESTION_CHARS = 60
+
+# 브라우저가 보낸 history에서 받아들이는 최대 대화 수
+MAX_SEED_TURNS = 20
+
+CONVERSATION_TTL = int(os.getenv("CONVERSATION_TTL", str(6 * 60 * 60)))
+CONVERSATION_MAXSIZE = int(os.getenv("CONVERSATION_MAXSIZE", "2000"))
+
+# 브라우저에서 만든 id (uuid 등)만 허용
+_CONVERSATION_ID = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+def _clip(text, limit):
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+class Conversation:
+    """
+    대화 하나: 최근 대화 [(질문, 답변, 토큰 수)] + 예산 밖으로 밀려난 질문 목록
+    """
+
+    __slots__ = ("conversation_id", "turns", "earlier", "tokens", "added", "updated_at", "_lock")
+
+    def __init__(self, conversation_id):
+        self.conversation_id = conversation_id
+        self.turns = []
+        self.earlier = []
+        self.tokens = 0
+        self.added = 0  # 지금까지 추가한 대화 수 (요약으로 옮긴 것 포함)
+        self.updated_at = time.time()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.turns)
+
+    def add(self, question, answer):
+        """
+        질문/답변 추가 후 예산을 넘으면 오래된 대화부터 요약으로 옮김
+        """
+        answer = _clip(answer, HISTORY_ANSWER_CHARS)
+        tokens = estimate_tokens(question) + estimate_tokens(answer)
+        with self._lock:
+            self.turns.append((question, answer, tokens))
+            self.tokens += tokens
+            self.added += 1
+            # 방금 추가한 대화는 예산을 넘더라도 남김
+            while self.tokens > HISTORY_TOKEN_BUDGET and len(self.turns) > 1:
+                old_question, _, old_tokens = self.turns.pop(0)
+                self.tokens -= old_tokens
+                self.earlier.append(_clip(old_question, SUMMARY_QUESTION_CHARS))
+            del self.earlier[:-SUMMARY_MAX_QUESTIONS]
+            self.updated_at = time.time()
+
+    def matches(self, turns):
+        """
+        브라우저가 보낸 대화 [(질문, 답변)]와 같은 대화인지
+        (브라우저 쪽이 더 길지 않고 마지막 대화가 같으면 True)
+        """
+        with self._lock:
+            if len(turns) > self.added:
+                return False
+            if not turns:
+                return True
+            if not self.turns:
+                return False
+            question, answer = turns[-1]
+            last_question, last_answer, _ = self.turns[-1]
+            return question == last_question and _clip(answer, HISTORY_ANSWER_CHARS) == last_answer
+
+    def reset(self):
+        with self._lock:
+            self.turns = []
+            self.earlier = []
+            self.tokens = 0
+            self.added = 0
+            self.updated_at = time.time()
+
+    def history(self):
+        """
+        LLM에 보낼 (요약 줄, [(질문, 답변), ...])
+        """
+        with self._lock:
+            summary = ""
+            if self.earlier:
+                summary = "이전 질문: " + " / ".join(self.earlier)
+            return summary, [(question, answer) for question, answer, _ in self.turns]
+
+
+class ConversationStore:
+    """
+    conversation_id -> Conversation (TTL + LRU)
+    """
+
+    def __init__(self, maxsize=CONVERSATION_MAXSIZE, ttl=CONVERSATION_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.seeded = 0
+        self.resynced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, conversation_id, seed=None):
+        """
+        conversation_id의 대화 (없으면 만들고, seed(브라우저가 보낸 최근 대화)로 채움)
+        이미 있는 대화도 seed와 다르면 (다른 워커가 이어 받은 대화) seed로 다시 채움
+        id 형식이 틀리면 None (대화 기록 없이 한 번만 묻는 것으로 처리)
+        """
+        if not isinstance(conversation_id, str) or not _CONVERSATION_ID.match(conversation_id):
+            return None
+        turns = self._seed_turns(seed)
+
+        now = time.time()
+        with self._lock:
+            conversation = self._data.get(conversation_id)
+            if conversation is not None and conversation.updated_at + self.ttl <= now:
+                del self._data[conversation_id]
+                self.expirations += 1
+                conversation = None
+
+            if conversation is not None:
+                self._data.move_to_end(conversation_id)
+
+                created = False
+            else:
+                conversation = Conversation(conversation_id)
+                self._data[conversation_id] = conversation
+                self.created += 1
+                created = True
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+
+        if turns and not conversation.matches(turns):
+            if created:
+                self.seeded += 1
+            else:
+                conversation.reset()
+                self.resynced += 1
+            for question, answer in turns:
+                conversation.add(question, answer)
+        return conversation
+
+    @staticmethod
+    def _seed_turns(seed):
+        # 브라우저가 보낸 history의 최근 MAX_SEED_TURNS개 -> [(질문, 답변)] (형식이 틀린 항목은 건너뜀)
+        if not isinstance(seed, list):
+            return []
+        turns = []
+        for turn in seed[-MAX_SEED_TURNS:]:
+            if not isinstance(turn, dict):
+                continue
+            question, answer = turn.get("question"), turn.get("answer")
+            if isinstance(question, str) and isinstance(answer, str) and question.strip() and answer.strip():
+                turns.append((question.strip(), answer))
+        return turns
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "created": self.created,
+                "seeded": self.seeded,
+                "resynced": self.resynced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "history_token_budget": HISTORY_TOKEN_BUDGET,
+            }
+
+
+CONVERSATIONS = ConversationStore()
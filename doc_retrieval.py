@@ -0,0 +1,417 @@
+"""
+농업 자료 검색 (BM25)
+data/corpus의 영농 자료(.md/.txt)를 조각으로 나눠 BM25 색인 파일 하나로 만들고
+시작할 때 mmap으로 열어서 질문과 관련된 조각 몇 개를 LLM 컨텍스트에 넣음 (네트워크 없이 동작)
+
+- 조각: "## 소제목" 단위로 나누고, 길면 CHUNK_CHARS 글자 안팎으로 다시 나눔
+  출처 표시는 "문서 제목 > 소제목" (제목도 색인에 들어감)
+- 검색어: 낱말에서 조사/존댓말 어미를 뗀 뒤 글자 2-gram (한 글자 낱말은 그대로)
+  형태소 분석기 없이도 "궤양병이" / "궤양병은" / "감귤 궤양병"이 같은 말로 잡힘
+- 색인 파일 (data/corpus.idx)
+  헤더(JSON: 검색어 -> (위치, 문서 수), 자료 파일 목록) + 포스팅(조각 번호 uint32, BM25 가중치 float32)
+  + 조각 본문. BM25 가중치를 미리 계산해 두므로 검색은 검색어별 포스팅을 더하기만 하면 됨
+  포스팅과 본문은 메모리에 읽어 들이지 않고 mmap으로 필요한 부분만 봄 (워커끼리 페이지 캐시 공유)
+- 자료 파일이 바뀌었으면 (파일 이름/크기/수정 시각) 시작할 때 색인을 다시 만듦
+  직접 만들기: python doc_retrieval.py, 검색해 보기: python doc_retrieval.py "감귤 궤양병 방제"
+"""
+
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import unicodedata
+from array import array
+from collections import Counter, namedtuple
+from datetime import datetime
+
+from llm_prompt import estimate_tokens
+from question_text import HONORIFIC_ENDINGS, PARTICLES, strip_suffix
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DOC_RETRIEVAL_ENABLED = os.getenv("DOC_RETRIEVAL", "1") != "0"
+CORPUS_DIR = os.getenv("DOC_CORPUS_DIR", os.path.join(_BASE_DIR, "data", "corpus"))
+INDEX_PATH = os.getenv("DOC_INDEX_PATH", os.path.join(_BASE_DIR, "data", "corpus.idx"))
+
+CORPUS_EXTENSIONS = (".md", ".txt")
+
+# 조각 하나 길이 (글자)
+CHUNK_CHARS = 400
+
+# BM25 매개변수
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 컨텍스트에 넣는 조각 수, 토큰 예산, 최소 점수 (이보다 낮으면 관련 없는 조각으로 봄)
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "3"))
+RETRIEVAL_TOKEN_BUDGET = int(os.getenv("RETRIEVAL_TOKEN_BUDGET", "600"))
+RETRIEVAL_MIN_SCORE = float(os.getenv("RETRIEVAL_MIN_SCORE", "4.0"))
+
+# 질문에만 쓰이고 자료 내용과는 상관없는 말 (검색어에서 뺌)
+QUERY_STOPWORDS = frozenset({
+    "언제", "어떻게", "어떤", "어떡", "무엇", "뭐", "뭘", "왜", "얼마나", "좀",
+    "알려", "알려줘", "알려주", "궁금", "궁금해", "해야", "하면", "되", "돼",
+})
+
+INDEX_MAGIC = b"JFBM25\x00\x01"
+INDEX_FORMAT = 1
+
+# 검색 결과 조각 하나
+Passage = namedtuple("Passage", ["source", "text", "score"])
+
+_WORD = re.compile(r"\w+")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+
+# 낱말 끝에서 떼는 어미 ("요" 하나는 "필요", "중요"를 망가뜨리므로 뺌)
+_ENDINGS = tuple(ending for ending in HONORIFIC_ENDINGS if len(ending) > 1)
+
+
+def _words(text):
+    for word in _WORD.findall(unicodedata.normalize("NFKC", text).lower()):
+        yield strip_suffix(strip_suffix(word, _ENDINGS), PARTICLES)
+
+
+def _bigrams(word):
+    if len(word) == 1:
+        return (word,)
+    return (word[i:i + 2] for i in range(len(word) - 1))
+
+
+def terms(text):
+    """
+    본문 -> 검색어 목록 (낱말별 글자 2-gram)
+    """
+    return [term for word in _words(text) for term in _bigrams(word)]
+
+
+def query_terms(question):
+    """
+    질문 -> 검색어 목록 (의문사 등 QUERY_STOPWORDS는 뺌)
+    """
+    return [
+        term for word in _words(question)
+        if word not in QUERY_STOPWORDS
+        for term in _bigrams(word)
+    ]
+
+
+# ============================================
+# 색인 만들기
+# ============================================
+
+def _corpus_files(corpus_dir):
+    files = []
+    for root, _, names in os.walk(corpus_dir):
+        for name in names:
+            if name.endswith(CORPUS_EXTENSIONS) and not name.startswith("."):
+                files.append(os.path.join(root, name))
+    return sorted(files)
+
+
+def corpus_signature(corpus_dir=CORPUS_DIR):
+    """
+    자료 파일 목록 [상대 경로, 크기, 수정 시각] (색인을 다시 만들어야 하는지 비교용)
+    """
+    signature = []
+    for path in _corpus_files(corpus_dir):
+        stat = os.stat(path)
+        signature.append([os.path.relpath(path, corpus_dir), stat.st_size, stat.st_mtime_ns])
+    return signature
+
+
+def _split_long(lines, limit):
+    # 줄 단위로 모아서 limit 글자 안팎의 조각으로 (한 줄이 limit보다 길면 그 줄 하나가 조각)
+    chunk, size = [], 0
+    for line in lines:
+        if chunk and size + len(line) > limit:
+            yield " ".join(chunk)
+            chunk, size = [], 0
+        chunk.append(line)
+        size += len(line) + 1
+    if chunk:
+        yield " ".join(chunk)
+
+
+def chunk_document(path, limit=CHUNK_CHARS):
+    """
+    자료 파일 하나 -> [(출처, 조각 본문)]
+    "# 제목"은 문서 제목, 그 아래 "##" 이하 제목은 소제목 (제목이 없으면 파일 이름)
+    """
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    title = os.path.splitext(os.path.basename(path))[0].replace("_", " ")
+    heading = ""
+    lines = []
+    passages = []
+
+    def flush():
+        source = f"{title} > {heading}" if heading else title
+        passages.extend((source, chunk) for chunk in _split_long(lines, limit))
+        lines.clear()
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        match = _HEADING.match(line)
+        if match:
+            flush()
+            if len(match.group(1)) == 1 and not heading and not passages:
+                title = match.group(2).strip()
+            else:
+                heading = match.group(2).strip()
+        elif line:
+            lines.append(line)
+    flush()
+    return passages
+
+
+def _pad4(size):
+    return (-size) % 4
+
+
+def _idf(total, df):
+    # BM25 idf (+1로 음수가 되지 않게)
+    return math.log(1 + (total - df + 0.5) / (df + 0.5))
+
+
+def build_index(corpus_dir=CORPUS_DIR, path=INDEX_PATH):
+    """
+    자료 디렉터리 -> 색인 파일 (임시 파일에 쓴 뒤 바꿔치기, 워커 여럿이 동시에 만들어도 안전)
+    만든 조각 수 반환
+    """
+    signature = corpus_signature(corpus_dir)
+    passages = []
+    for file_path in _corpus_files(corpus_dir):
+        passages.extend(chunk_document(file_path))
+
+    # 조각별 검색어 빈도 (출처 제목도 포함)
+    counts = [Counter(terms(f"{source} {text}")) for source, text in passages]
+    lengths = [sum(count.values()) for count in counts]
+    total = len(passages)
+    avgdl = (sum(lengths) / total) if total else 0.0
+
+    postings = {}
+    for doc, count in enumerate(counts):
+        for term, tf in count.items():
+            postings.setdefault(term, []).append((doc, tf))
+
+    ids = array("I")
+    weights = array("f")
+    table = {}
+    for term in sorted(postings):
+        docs = postings[term]
+        df = len(docs)
+        idf = _idf(total, df)
+        table[term] = [len(ids), df]
+        for doc, tf in docs:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc] / avgdl)
+            ids.append(doc)
+            weights.append(idf * tf * (BM25_K1 + 1) / (tf + norm))
+
+    offsets = array("I", [0])
+    blob = bytearray()
+    for source, text in passages:
+        blob += f"{source}\n{text}".encode("utf-8")
+        offsets.append(len(blob))
+
+    header = json.dumps({
+        "format": INDEX_FORMAT,
+        "byteorder": sys.byteorder,
+        "signature": signature,
+        "chunk_chars": CHUNK_CHARS,
+        "passages": total,
+        "postings": len(ids),
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "terms": table,
+    }, ensure_ascii=False).encode("utf-8")
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(INDEX_MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        f.write(b"\x00" * _pad4(len(INDEX_MAGIC) + 4 + len(header)))
+        ids.tofile(f)
+        weights.tofile(f)
+        offsets.tofile(f)
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return total
+
+
+# ============================================
+# 검색
+# ============================================
+
+class DocumentIndex:
+    """
+    mmap으로 연 색인 파일 (읽기 전용, 여러 스레드에서 같이 써도 됨)
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self._mmap)
+        if bytes(view[:len(INDEX_MAGIC)]) != INDEX_MAGIC:
+            raise ValueError(f"색인 파일 형식이 아닙니다: {path}")
+        position = len(INDEX_MAGIC)
+        (header_size,) = struct.unpack_from("<I", self._mmap, position)
+        position += 4
+        header = json.loads(bytes(view[position:position + header_size]).decode("utf-8"))
+        position += header_size
+        position += _pad4(position)
+
+        if header.get("format") != INDEX_FORMAT or header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"다른 형식으로 만든 색인입니다: {path}")
+
+        self.header = header
+        self.signature = header["signature"]
+        self.passages = header["passages"]
+        self._terms = header.pop("terms")
+
+        postings = header["postings"]
+        ids_end = position + postings * 4
+        weights_end = ids_end + postings * 4
+        offsets_end = weights_end + (self.passages + 1) * 4
+        self._ids = view[position:ids_end].cast("I")
+        self._weights = view[ids_end:weights_end].cast("f")
+        self._offsets = view[weights_end:offsets_end].cast("I")
+        self._text = view[offsets_end:]
+
+    def passage(self, doc):
+        """
+        조각 번호 -> (출처, 본문)
+        """
+        raw = bytes(self._text[self._offsets[doc]:self._offsets[doc + 1]]).decode("utf-8")
+        source, _, text = raw.partition("\n")
+        return source, text
+
+    def search(self, question, k=RETRIEVAL_TOP_K, min_score=RETRIEVAL_MIN_SCORE):
+        """
+        질문 -> 점수 높은 순 [Passage] (최대 k개, min_score 미만은 뺌)
+        """
+        scores = {}
+        for term, qtf in Counter(query_terms(question)).items():
+            entry = self._terms.get(term)
+            if entry is None:
+                continue
+            start, df = entry
+            ids = self._ids[start:start + df]
+            weights = self._weights[start:start + df]
+            for doc, weight in zip(ids, weights):
+                scores[doc] = scores.get(doc, 0.0) + weight * qtf
+
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [
+            Passage(*self.passage(doc), round(score, 3))
+            for doc, score in best
+            if score >= min_score
+        ]
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "files": len(self.signature),
+            "passages": self.passages,
+            "terms": len(self._terms),
+            "postings": self.header["postings"],
+            "built_at": self.header.get("built_at"),
+        }
+
+
+_lock = threading.Lock()
+_index = None
+_loaded = False
+
+
+def load_index(corpus_dir=CORPUS_DIR, path=INDEX_PATH):
+    """
+    색인 파일을 열어서 반환 (없거나 자료 파일과 다르면 먼저 다시 만듦)
+    자료 디렉터리가 없으면 None
+    """
+    if not os.path.isdir(corpus_dir):
+        return None
+
+    signature = corpus_signature(corpus_dir)
+    try:
+        index = DocumentIndex(path)
+        if index.signature == signature:
+            return index
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Document index reload ({path}): {e}")
+
+    build_index(corpus_dir, path)
+    return DocumentIndex(path)
+
+
+def get_index():
+    """
+    프로세스에서 처음 부를 때 한 번 색인을 엶 (실패하면 검색 없이 동작)
+    """
+    global _index, _loaded
+    if _loaded:
+        return _index
+    with _lock:
+        if not _loaded:
+            if DOC_RETRIEVAL_ENABLED:
+                try:
+                    _index = load_index()
+                except Exception as e:
+                    print(f"Document index error: {e}")
+            _loaded = True
+    return _index
+
+
+def retrieve(question, k=RETRIEVAL_TOP_K, budget=RETRIEVAL_TOKEN_BUDGET):
+    """
+    질문과 관련된 조각 (점수 높은 순, 합쳐서 budget 토큰 이내)
+    """
+    index = get_index()
+    if index is None or not question:
+        return []
+
+    selected = []
+    used = 0
+    for passage in index.search(question, k):
+        tokens = estimate_tokens(passage.source) + estimate_tokens(passage.text)
+        if used + tokens > budget:
+            continue
+        selected.append(passage)
+        used += tokens
+    return selected
+
+
+def format_passages(passages):
+    """
+    LLM 컨텍스트용 문자열 (조각이 없으면 빈 문자열)
+    """
+    if not passages:
+        return ""
+    lines = ["", "=== 참고 자료 ==="]
+    for passage in passages:
+        lines.append(f"[{passage.source}]")
+        lines.append(passage.text)
+    return "\n".join(lines) + "\n"
+
+
+def document_stats():
+    index = get_index()
+    if index is None:
+        return {"enabled": False}
+    return {"enabled": True, **index.stats()}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        for passage in retrieve(" ".join(sys.argv[1:])):
+            print(f"{passage.score:7.3f}  [{passage.source}] {passage.text[:80]}")
+    else:
+        count = build_index()
+        print(f"{INDEX_PATH}: 조각 {count}개")
@@ -0,0 +1,239 @@
+"""
+농사 지식 (작물별 순(旬) 단위 농사 달력 / 병해충 / 토양 관리)
+data/farm_knowledge.json을 시작할 때 한 번 읽어서 (작물, 순) -> 항목 색인을 만들고
+요청마다 dict 조회 한 번으로 끝남 (LLM 컨텍스트 문자열도 미리 만들어 둠)
+
+- 순: 한 달을 상순(1~10일) / 중순(11~20일) / 하순(21일~)으로 나눈 것, 1년 36개 (0 = 1월 상순)
+- 데이터 파일의 항목은 기간("from" ~ "to", 해를 넘겨도 됨)으로 적고
+  색인을 만들 때 순 하나하나로 펼침 (기간이 겹치면 작업/주의 병해충을 합침)
+- 만든 색인은 읽기 전용 (MappingProxyType), 다시 읽을 때는 새 객체를 만들어 통째로 바꿈
+- 워커를 재시작하지 않아도 됨: get_knowledge()가 KNOWLEDGE_CHECK_SECONDS마다 파일 수정 시각을 보고
+  바뀌었으면 다시 읽음 (워커마다 각자 확인하므로 파일만 고치면 모든 워커에 반영)
+  새 파일에 오류가 있으면 기존 색인을 그대로 씀
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from types import MappingProxyType
+
+KNOWLEDGE_PATH = os.getenv(
+    "FARM_KNOWLEDGE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "farm_knowledge.json"),
+)
+
+# 파일 수정 시각 확인 간격 (초)
+KNOWLEDGE_CHECK_SECONDS = float(os.getenv("FARM_KNOWLEDGE_CHECK_SECONDS", "30"))
+
+PERIODS_PER_YEAR = 36
+PERIOD_NAMES = ("상순", "중순", "하순")
+
+_PERIOD_LABEL = re.compile(r"^\s*(\d{1,2})월\s*(상|중|하)순\s*$")
+
+# 작물 하나, 순 하나의 농사 정보
+# tasks/high_risk: 튜플, tips/prevention/soil: 문자열 (없으면 빈 값)
+# calendar_text/pests_text/soil_text: LLM 컨텍스트에 그대로 넣는 섹션 (정보가 없으면 빈 문자열)
+KnowledgeEntry = namedtuple(
+    "KnowledgeEntry",
+    [
+        "crop", "period", "label",
+        "tasks", "tips", "high_risk", "prevention", "soil",
+        "calendar_text", "pests_text", "soil_text",
+    ],
+)
+
+
+def period_of(date=None):
+    """
+    날짜 -> 순 번호 (0 = 1월 상순, 35 = 12월 하순)
+    """
+    date = date or datetime.now()
+    part = 0 if date.day <= 10 else 1 if date.day <= 20 else 2
+    return (date.month - 1) * 3 + part
+
+
+def period_label(period):
+    """
+    순 번호 -> "10월 중순"
+    """
+    month, part = divmod(period % PERIODS_PER_YEAR, 3)
+    return f"{month + 1}월 {PERIOD_NAMES[part]}"
+
+
+def parse_period(label):
+    """
+    "10월 중순" -> 순 번호 (형식이 틀리면 ValueError)
+    """
+    match = _PERIOD_LABEL.match(str(label))
+    if not match or not 1 <= int(match.group(1)) <= 12:
+        raise ValueError(f"잘못된 순 표기: {label!r}")
+    return (int(match.group(1)) - 1) * 3 + "상중하".index(match.group(2))
+
+
+def _period_range(item):
+    # "from" ~ "to" (둘 다 포함), 해를 넘기면 12월 하순 다음 1월 상순으로 이어짐
+    start = parse_period(item["from"])
+    end = parse_period(item.get("to", item["from"]))
+    length = (end - start) % PERIODS_PER_YEAR + 1
+    return [(start + i) % PERIODS_PER_YEAR for i in range(length)]
+
+
+def _merge(values):
+    # 순서 유지, 중복 제거
+    return tuple(dict.fromkeys(value for value in values if value))
+
+
+def _render_entry(crop, period, calendar, pests, soil):
+    label = period_label(period)
+    tasks = _merge(task for item in calendar for task in item.get("tasks", ()))
+    tips = " / ".join(_merge(item.get("tips", "") for item in calendar))
+    high_risk = _merge(name for item in pests for name in item.get("high_risk", ()))
+    prevention = " ".join(_merge(item.get("prevention", "") for item in pests))
+    advice = " ".join(_merge(item.get("advice", "") for item in soil))
+
+    calendar_text = ""
+    if tasks:
+        calendar_text = f"""
+=== 이달의 농사 정보 ({crop}, {label}) ===
+주요 작업: {', '.join(tasks)}
+팁: {tips}
+"""
+    pests_text = ""
+    if high_risk:
+        pests_text = f"""
+=== 병해충 정보 ({crop}, {label}) ===
+주의 병해충: {', '.join(high_risk)}
+예방 조치: {prevention}
+"""
+    soil_text = f"\n=== 토양 관리 ({crop}, {label}) ===\n{advice}\n" if advice else ""
+
+    return KnowledgeEntry(
+        crop, period, label, tasks, tips, high_risk, prevention, advice,
+        calendar_text, pests_text, soil_text,
+    )
+
+
+class FarmKnowledge:
+    """
+    (작물, 순) -> KnowledgeEntry 색인 (만든 뒤에는 읽기 전용)
+    aliases: 작물 이름/별칭 -> 작물 이름 ("한라봉" -> "감귤", "무" -> "월동무")
+    """
+
+    def __init__(self, data, source=None, mtime=None):
+        self.source = source
+        self.mtime = mtime
+        self.loaded_at = time.time()
+        self.version = data.get("version")
+
+        crops = data.get("crops") or {}
+        if not isinstance(crops, dict):
+            raise ValueError("crops는 {작물: 정보} 형식이어야 합니다")
+
+        entries = {}
+        aliases = {}
+        for crop, info in crops.items():
+            by_period = [([], [], []) for _ in range(PERIODS_PER_YEAR)]
+            for slot, key in enumerate(("calendar", "pests", "soil")):
+                for item in info.get(key, ()):
+                    for period in _period_range(item):
+                        by_period[period][slot].append(item)
+            for period, (calendar, pests, soil) in enumerate(by_period):
+                entries[(crop, period)] = _render_entry(crop, period, calendar, pests, soil)
+
+            aliases[crop] = crop
+            for alias in info.get("aliases", ()):
+                aliases.setdefault(alias.lower(), crop)
+
+        default_crop = data.get("default_crop")
+        if crops and default_crop not in crops:
+            raise ValueError(f"default_crop이 crops에 없습니다: {default_crop!r}")
+
+        self.crops = tuple(crops)
+        self.default_crop = default_crop if crops else None
+        self.entries = MappingProxyType(entries)
+        self.aliases = MappingProxyType(aliases)
+
+    def crop_for(self, word):
+        """
+        작물 이름/별칭 -> 작물 이름 (모르는 작물이면 None)
+        """
+        return self.aliases.get(str(word).lower())
+
+    def lookup(self, crop=None, period=None):
+        """
+        (작물, 순)의 KnowledgeEntry
+        crop이 없으면 기본 작물, period가 없으면 오늘, 모르는 작물이면 None
+        """
+        crop = self.crop_for(crop) if crop else self.default_crop
+        if period is None:
+            period = period_of()
+        return self.entries.get((crop, period % PERIODS_PER_YEAR))
+
+    def stats(self):
+        return {
+            "source": self.source,
+            "version": self.version,
+            "crops": list(self.crops),
+            "entries": len(self.entries),
+            "loaded_at": datetime.fromtimestamp(self.loaded_at).isoformat(timespec="seconds"),
+        }
+
+
+def load_knowledge(path=KNOWLEDGE_PATH):
+    """
+    데이터 파일 -> FarmKnowledge (파일이 없거나 형식이 틀리면 예외)
+    """
+    mtime = os.stat(path).st_mtime
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return FarmKnowledge(data, source=path, mtime=mtime)
+
+
+_lock = threading.Lock()
+_knowledge = None
+_checked_at = 0.0
+
+
+def reload_knowledge(path=KNOWLEDGE_PATH):
+    """
+    데이터 파일을 다시 읽어 색인을 바꿈 (실패하면 기존 색인 유지하고 False)
+    """
+    global _knowledge, _checked_at
+    with _lock:
+        _checked_at = time.monotonic()
+        try:
+            knowledge = load_knowledge(path)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Farm knowledge load error ({path}): {e}")
+            if _knowledge is None:
+                _knowledge = FarmKnowledge({}, source=path)
+            return False
+        _knowledge = knowledge
+        return True
+
+
+def get_knowledge():
+    """
+    현재 농사 지식 색인
+    KNOWLEDGE_CHECK_SECONDS마다 한 번만 파일 수정 시각을 확인 (그 사이에는 변수 하나 읽기)
+    """
+    global _checked_at
+    knowledge = _knowledge
+    if knowledge is not None and time.monotonic() - _checked_at < KNOWLEDGE_CHECK_SECONDS:
+        return knowledge
+
+    path = knowledge.source if knowledge is not None else KNOWLEDGE_PATH
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        mtime = None
+
+    if knowledge is None or (mtime is not None and mtime != knowledge.mtime):
+        reload_knowledge(path)
+    else:
+        _checked_at = time.monotonic()
+    return _knowledge
@@ -0,0 +1,13 @@
+"""
+gunicorn 설정 (gunicorn app:app 실행 시 현재 디렉터리의 이 파일을 자동으로 읽음)
+WEATHER_PREFETCH=1 이면 워커가 뜰 때 prefetch 스레드 시작을 시도하고
+잠금 파일을 잡은 워커 하나만 실제로 prefetch 함
+(--preload 여부와 상관없이 fork 이후에 시작하므로 스레드가 사라지지 않음)
+"""
+
+
+def post_fork(server, worker):
+    from weather_prefetch import WEATHER_PREFETCH_ENABLED, start_prefetcher
+
+    if WEATHER_PREFETCH_ENABLED and start_prefetcher() is not None:
+        server.log.info("Weather prefetcher: worker %s", worker.pid)
@@ -0,0 +1,181 @@
+"""
+공용 HTTP 클라이언트
+기상청(data.go.kr)과 OpenRouter 호출이 커넥션을 재사용하도록 관리
+
+- 호스트별 커넥션 풀 (keep-alive, 최대 개수 제한)
+- 5xx 응답과 연결 끊김에 대해 백오프 재시도
+- 프로세스당 세션 1개를 모든 스레드가 공유 (gunicorn 스레드 워커 대응)
+- asyncio 경로(asgi.py)용 httpx.AsyncClient도 같은 정책으로 제공
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 호스트당 keep-alive 커넥션 수 (동시 조회 스레드 수보다 크게)
+# 기상청 조회 스레드: weather_api 조회 10 + 페이지 4 + 새로고침 4, weather_prefetch 8 -> 26, 요청 스레드 여유분 포함
+# 이보다 많은 스레드가 몰리면 기다리지 않고 임시 커넥션을 열었다가 닫음 (pool_block=False)
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+
+# 기상청 API: GET 요청이므로 연결 끊김/5xx 모두 재시도
+KMA_RETRY = Retry(
+    total=3,
+    connect=3,
+    read=1,
+    status=3,
+    backoff_factor=0.3,
+    status_forcelist=(500, 502, 503, 504),
+    allowed_methods=frozenset({"GET"}),
+    raise_on_status=False,
+)
+
+# OpenRouter: 생성 요청(POST)은 비용이 들기 때문에 재시도 횟수를 적게
+# 읽기 시간 초과는 재시도하지 않음 (이미 생성/과금됐을 수 있음) -> 연결 실패와 502/503/504만
+LLM_RETRY = Retry(
+    total=2,
+    connect=2,
+    read=0,
+    status=2,
+    backoff_factor=0.5,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset({"POST"}),
+    raise_on_status=False,
+)
+
+# URL prefix -> 재시도 정책
+RETRY_POLICIES = {
+    "http://apis.data.go.kr/": KMA_RETRY,
+    "https://apis.data.go.kr/": KMA_RETRY,
+    "https://openrouter.ai/": LLM_RETRY,
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session():
+    session = requests.Session()
+
+    # 여러 스레드가 세션을 공유하므로 쿠키 저장은 막아둠 (두 API 모두 쿠키 불필요)
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    for prefix, retry in RETRY_POLICIES.items():
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=POOL_MAXSIZE,
+            pool_block=False,
+            max_retries=retry,
+        )
+        session.mount(prefix, adapter)
+    return session
+
+
+def get_session():
+    """
+    프로세스 공용 세션 반환 (처음 호출될 때 생성)
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _reset_after_fork():
+    # 부모 프로세스의 소켓을 자식 워커가 공유하지 않도록 새로 만듦
+    global _session, _session_lock
+    _session = None
+    _session_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def http_get(url, **kwargs):
+    return get_session().get(url, **kwargs)
+
+
+def http_post(url, **kwargs):
+    return get_session().post(url, **kwargs)
+
+
+# ============================================
+# 비동기 클라이언트 (httpx)
+# ============================================
+
+# 이벤트 루프별 AsyncClient (클라이언트는 만든 루프에서만 사용 가능)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    현재 이벤트 루프의 공용 AsyncClient 반환 (처음 호출될 때 생성)
+    httpx는 비동기 경로에서만 필요하므로 여기서 import
+    """
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        # transport를 직접 넘기면 AsyncClient(limits=...)는 무시되므로 transport에 설정
+        client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=POOL_MAXSIZE * 4,
+                    max_keepalive_connections=POOL_MAXSIZE,
+                ),
+                # 연결 실패는 transport 단계에서 재시도
+                retries=2,
+            ),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def _retry_policy(url):
+    for prefix, retry in RETRY_POLICIES.items():
+        if url.startswith(prefix):
+            return retry
+    return None
+
+
+async def _async_request(method, url, **kwargs):
+    """
+    5xx 응답은 동기 세션과 같은 Retry 정책(횟수, 백오프)으로 재시도
+    """
+    client = get_async_client()
+    retry = _retry_policy(url)
+    attempts = (retry.status or 0) + 1 if retry else 1
+
+    for attempt in range(attempts):
+        response = await client.request(method, url, **kwargs)
+        last_attempt = attempt == attempts - 1
+        if last_attempt or response.status_code not in retry.status_forcelist:
+            return response
+        await response.aclose()
+        await asyncio.sleep(retry.backoff_factor * (2 ** attempt))
+
+
+async def async_http_get(url, **kwargs):
+    return await _async_request("GET", url, **kwargs)
+
+
+async def async_http_post(url, **kwargs):
+    return await _async_request("POST", url, **kwargs)
+
+
+async def close_async_client():
+    """
+    현재 이벤트 루프의 AsyncClient 정리 (ASGI 서버 종료 시)
+    """
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
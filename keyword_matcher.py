@@ -0,0 +1,169 @@
+"""
+질문 키워드 매칭 (Aho-Corasick)
+키워드 전체를 오토마톤 하나로 만들어서 질문을 글자 단위로 한 번만 훑음
+키워드가 늘어나도 훑는 시간은 질문 길이에만 비례 (작물/병해충 어휘를 계속 추가해도 됨)
+
+- Keyword: (키워드, 의도들, 경계 규칙)
+  경계 규칙
+    "any": 어디서든 (기본)
+    "start": 낱말 첫머리에서만 ("비" -> "비가 와요" O, "봄비" X)
+    "word": 낱말 하나 전체, 뒤에 조사는 허용 ("병" -> "병이 생겼어요" O, "병아리" X)
+- 겹치는 키워드는 왼쪽에서 가장 긴 것 하나만 (leftmost-longest)
+  -> 의도 없는 키워드("비닐", "비용")를 등록해두면 짧은 키워드("비")가 잘못 맞는 것을 막음
+- find(): 맞은 키워드와 위치 목록, intents(): 의도 목록
+"""
+
+from collections import deque, namedtuple
+
+from question_text import PARTICLES
+
+Keyword = namedtuple("Keyword", ["text", "intents", "boundary"])
+
+# start, end: 질문 안의 위치 (question[start:end] == keyword)
+Match = namedtuple("Match", ["keyword", "start", "end", "intents"])
+
+BOUNDARIES = ("any", "start", "word")
+
+# "word" 경계 키워드 뒤에 붙어도 되는 말 (조사 + 자주 붙는 서술어 어미)
+WORD_SUFFIXES = tuple(sorted(
+    set(PARTICLES) | {"이랑", "하고", "만", "까지", "부터", "처럼", "이나", "나", "요", "이요", "인가요", "은요", "는요"},
+    key=len, reverse=True
+))
+
+
+def _is_word_char(char):
+    return char.isalnum()
+
+
+class KeywordMatcher:
+    """
+    키워드 -> 의도 오토마톤
+    add()/add_vocabulary()로 키워드를 모두 넣은 뒤 처음 찾을 때 한 번 만듦 (이후 읽기 전용)
+    """
+
+    def __init__(self):
+        self.keywords = {}  # 키워드 -> Keyword
+        self._goto = None
+        self._fail = None
+        self._out = None
+        self._entries = None
+
+    def add(self, keyword, intents=(), boundary="any"):
+        """
+        키워드 등록 (같은 키워드를 다시 넣으면 의도를 합침)
+        intents가 비어 있으면 더 짧은 키워드가 잘못 맞지 않게 막는 용도
+        """
+        if boundary not in BOUNDARIES:
+            raise ValueError(f"알 수 없는 경계 규칙: {boundary}")
+        text = keyword.lower()
+        if not text:
+            raise ValueError("빈 키워드는 등록할 수 없습니다")
+
+        previous = self.keywords.get(text)
+        if previous is not None:
+            intents = tuple(dict.fromkeys(previous.intents + tuple(intents)))
+        self.keywords[text] = Keyword(text, tuple(intents), boundary)
+        self._goto = None  # 다음 검색 때 다시 만듦
+
+    def add_vocabulary(self, words, intents=(), boundary="any"):
+        for word in words:
+            self.add(word, intents, boundary)
+
+    def build(self):
+        """
+        트라이 + 실패 링크 (너비 우선으로 한 번)
+        """
+        goto = [{}]
+        out = [[]]
+        entries = list(self.keywords.values())
+
+        for index, entry in enumerate(entries):
+            state = 0
+            for char in entry.text:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    out.append([])
+                state = next_state
+            out[state].append(index)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                out[next_state].extend(out[fail[next_state]])
+
+        self._goto = goto
+        self._fail = fail
+        self._out = [tuple(indexes) for indexes in out]
+        self._entries = entries
+
+    def _scan(self, text):
+        # (시작, 끝, Keyword) - 모든 위치의 모든 키워드
+        if self._goto is None:
+            self.build()
+        goto, fail, out, entries = self._goto, self._fail, self._out, self._entries
+
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in out[state]:
+                entry = entries[index]
+                yield i + 1 - len(entry.text), i + 1, entry
+
+    @staticmethod
+    def _boundary_ok(text, start, end, boundary):
+        if boundary == "any":
+            return True
+        if start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if boundary == "start" or end == len(text) or not _is_word_char(text[end]):
+            return True
+        # "word": 뒤에 조사/어미가 붙은 경우만 (그 뒤는 낱말 끝이어야 함)
+        for suffix in WORD_SUFFIXES:
+            if text.startswith(suffix, end):
+                after = end + len(suffix)
+                if after == len(text) or not _is_word_char(text[after]):
+                    return True
+        return False
+
+    def find(self, question):
+        """
+        질문에서 맞은 키워드 [Match] (위치 순서, 겹치지 않음, 의도 없는 키워드 제외)
+        """
+        text = question.lower()
+        candidates = [
+            (start, end, entry)
+            for start, end, entry in self._scan(text)
+            if self._boundary_ok(text, start, end, entry.boundary)
+        ]
+        # 왼쪽에서 가장 긴 것부터 (같은 시작 위치면 긴 키워드 우선)
+        candidates.sort(key=lambda c: (c[0], c[0] - c[1]))
+
+        matches = []
+        covered = 0
+        for start, end, entry in candidates:
+            if start < covered:
+                continue
+            covered = end
+            if entry.intents:
+                matches.append(Match(entry.text, start, end, entry.intents))
+        return matches
+
+    def intents(self, question):
+        """
+        질문의 의도 목록 (처음 나온 순서, 중복 없음)
+        """
+        return list(dict.fromkeys(
+            intent for match in self.find(question) for intent in match.intents
+        ))
@@ -0,0 +1,126 @@
+"""
+기상청 단기예보 항목(category) 코드표
+초단기실황(getUltraSrtNcst), 초단기예보(getUltraSrtFcst), 단기예보(getVilageFcst)가
+같은 표를 사용해서 값을 해석함
+
+항목 코드 -> (설명, 단위, 배열 타입코드, 디코더)
+- 배열 타입코드: "f"(float32), "h"(int16), "b"(int8)
+- 값이 없는 칸: float는 NaN, 정수는 -1
+"""
+
+import math
+from collections import namedtuple
+
+NAN = float("nan")
+
+Category = namedtuple("Category", ["name", "unit", "typecode", "decode"])
+
+
+def missing_value(typecode):
+    return NAN if typecode == "f" else -1
+
+
+def decode_float(value):
+    """
+    숫자 값 (기상청 결측값 +900 이상, -900 이하는 NaN)
+    """
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return NAN
+    if number >= 900 or number <= -900:
+        return NAN
+    return number
+
+
+def decode_code(value):
+    """
+    코드/정수 값 (하늘상태, 강수형태, 퍼센트, 풍향) - 없으면 -1
+    """
+    number = decode_float(value)
+    return -1 if math.isnan(number) else int(number)
+
+
+# 강수량/적설 범주 문자열 -> 숫자
+# "1mm 미만" 같은 값은 0보다 크다는 것만 알 수 있으므로 TRACE로 저장
+TRACE = 0.1
+
+
+def _decode_amount(value, none_text, unit):
+    if not isinstance(value, str):
+        return decode_float(value)
+
+    text = value.strip()
+    if text == none_text or text in ("0", "-"):
+        return 0.0
+    if text.endswith("미만"):
+        return TRACE
+    # "6.2mm", "30.0~50.0mm", "50.0mm 이상" -> 하한값
+    number = text.replace("이상", "").replace(unit, "").split("~")[0].strip()
+    return decode_float(number)
+
+
+def decode_precipitation(value):
+    return _decode_amount(value, "강수없음", "mm")
+
+
+def decode_snow(value):
+    return _decode_amount(value, "적설없음", "cm")
+
+
+CATEGORIES = {
+    # 기온
+    "T1H": Category("기온", "°C", "f", decode_float),
+    "TMP": Category("1시간 기온", "°C", "f", decode_float),
+    "TMN": Category("일 최저기온", "°C", "f", decode_float),
+    "TMX": Category("일 최고기온", "°C", "f", decode_float),
+    # 강수
+    "POP": Category("강수확률", "%", "b", decode_code),
+    "PTY": Category("강수형태", "", "b", decode_code),
+    "PCP": Category("1시간 강수량", "mm", "f", decode_precipitation),
+    "RN1": Category("1시간 강수량", "mm", "f", decode_precipitation),
+    "SNO": Category("1시간 신적설", "cm", "f", decode_snow),
+    # 하늘/습도/낙뢰
+    "SKY": Category("하늘상태", "", "b", decode_code),
+    "REH": Category("습도", "%", "b", decode_code),
+    "LGT": Category("낙뢰", "kA", "f", decode_float),
+    # 바람
+    "WSD": Category("풍속", "m/s", "f", decode_float),
+    "VEC": Category("풍향", "deg", "h", decode_code),
+    "UUU": Category("동서바람성분", "m/s", "f", decode_float),
+    "VVV": Category("남북바람성분", "m/s", "f", decode_float),
+    # 해상
+    "WAV": Category("파고", "M", "f", decode_float),
+}
+
+# 상품별 제공 항목 (기상청 API 활용가이드 기준)
+PRODUCT_CATEGORIES = {
+    "ultra_short_now": ("T1H", "RN1", "UUU", "VVV", "REH", "PTY", "VEC", "WSD"),
+    "ultra_short_fcst": ("T1H", "RN1", "SKY", "UUU", "VVV", "REH", "PTY", "LGT", "VEC", "WSD"),
+    "short_forecast": (
+        "TMP", "TMN", "TMX", "POP", "PTY", "PCP", "SNO", "SKY", "REH",
+        "UUU", "VVV", "WAV", "VEC", "WSD",
+    ),
+}
+
+# 항목별 "원본 문자열 -> 해석한 값" 기억 (프로세스 공용)
+# 응답 값은 "20", "1", "강수없음"처럼 같은 문자열이 반복되므로
+# 디코더 호출 대신 dict 조회 한 번으로 끝남
+DECODE_MEMO_LIMIT = 4096
+
+DECODED = {code: {} for code in CATEGORIES}
+
+
+def decode(category, raw):
+    """
+    항목 코드와 원본 값으로 해석한 값 반환 (표에 없는 항목은 NaN)
+    """
+    known = DECODED.get(category)
+    if known is None:
+        return NAN
+    value = known.get(raw)
+    if value is None:
+        value = CATEGORIES[category].decode(raw)
+        if len(known) < DECODE_MEMO_LIMIT:
+            known[raw] = value
+    return value
@@ -0,0 +1,149 @@
+"""
+위경도 -> 기상청 단기예보 격자(nx, ny) 변환
+기상청 Lambert Conformal Conic 투영 (격자 5km, 표준위도 30/60도, 기준점 126E 38N = (43, 136))
+
+- latlon_to_grid(): 투영 계산 (전국 어디든, 몇 µs)
+  위경도 격자로 미리 계산해두면 칸 경계 근처에서 옆 칸이 나오므로 좌표는 항상 직접 계산
+- JEJU_GRID: 읍/면/동 이름 -> 격자, 제주 격자 칸 -> 가장 가까운 읍/면/동 색인
+"""
+
+import math
+from collections import namedtuple
+
+from weather_config import JEJU_EMD_COORDS
+
+# 기상청 격자 투영 상수
+EARTH_RADIUS = 6371.00877  # km
+GRID_SPACING = 5.0  # km
+SLAT1, SLAT2 = 30.0, 60.0  # 표준위도
+OLON, OLAT = 126.0, 38.0  # 기준점 경도, 위도
+XO, YO = 43, 136  # 기준점 격자 좌표
+
+
+def _projection():
+    re = EARTH_RADIUS / GRID_SPACING
+    slat1, slat2 = math.radians(SLAT1), math.radians(SLAT2)
+    olat = math.radians(OLAT)
+
+    sn = math.tan(math.pi * 0.25 + slat2 * 0.5) / math.tan(math.pi * 0.25 + slat1 * 0.5)
+    sn = math.log(math.cos(slat1) / math.cos(slat2)) / math.log(sn)
+    sf = math.tan(math.pi * 0.25 + slat1 * 0.5)
+    sf = sf ** sn * math.cos(slat1) / sn
+    ro = math.tan(math.pi * 0.25 + olat * 0.5)
+    ro = re * sf / ro ** sn
+    return re, sn, sf, ro
+
+
+_RE, _SN, _SF, _RO = _projection()
+_OLON = math.radians(OLON)
+
+
+def latlon_to_grid(lat, lon):
+    """
+    위도, 경도 -> (nx, ny)
+    """
+    ra = math.tan(math.pi * 0.25 + math.radians(lat) * 0.5)
+    ra = _RE * _SF / ra ** _SN
+    theta = math.radians(lon) - _OLON
+    if theta > math.pi:
+        theta -= 2.0 * math.pi
+    if theta < -math.pi:
+        theta += 2.0 * math.pi
+    theta *= _SN
+    nx = math.floor(ra * math.sin(theta) + XO + 0.5)
+    ny = math.floor(_RO - ra * math.cos(theta) + YO + 0.5)
+    return nx, ny
+
+
+# 읍/면/동과 그 격자 좌표
+GridPlace = namedtuple("GridPlace", ["name", "city", "nx", "ny"])
+
+
+def parse_latlon(text):
+    """
+    "33.4500,126.5600" 형식의 위치 문자열 -> (위도, 경도), 형식이 다르면 None
+    """
+    if not isinstance(text, str) or "," not in text:
+        return None
+    try:
+        lat, lon = (float(part) for part in text.split(","))
+    except ValueError:
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+def format_latlon(lat, lon):
+    """
+    위도, 경도 -> 지역 이름 대신 쓰는 위치 문자열 (캐시/API에서 그대로 사용)
+    """
+    return f"{float(lat):.4f},{float(lon):.4f}"
+
+
+class JejuGridIndex:
+    """
+    제주 격자 색인 (시작할 때 한 번 만들고 이후 읽기 전용)
+    - 읍/면/동 이름(접미사 없는 별칭 포함) -> GridPlace
+    - 제주 범위의 격자 칸 (nx, ny) -> 가장 가까운 읍/면/동 (응답에 "애월읍 부근"으로 표시)
+    """
+
+    # 추자도(33.96N)까지 포함
+    LAT_MIN, LAT_MAX = 33.10, 34.00
+    LON_MIN, LON_MAX = 126.10, 127.00
+    # 제주 범위의 격자 칸을 빠짐없이 모으기 위한 간격 (격자 한 칸은 약 0.045도)
+    STEP = 0.01
+
+    def __init__(self, places=JEJU_EMD_COORDS):
+        rows = round((self.LAT_MAX - self.LAT_MIN) / self.STEP) + 1
+        cols = round((self.LON_MAX - self.LON_MIN) / self.STEP) + 1
+        self.cells = frozenset(
+            latlon_to_grid(self.LAT_MIN + i * self.STEP, self.LON_MIN + j * self.STEP)
+            for i in range(rows)
+            for j in range(cols)
+        )
+
+        self.places = {}
+        for name, (city, lat, lon) in places.items():
+            self.places[name] = GridPlace(name, city, *latlon_to_grid(lat, lon))
+
+        # "애월" -> 애월읍 (접미사를 떼도 겹치지 않는 이름만)
+        self.aliases = {}
+        short_names = {}
+        for name in self.places:
+            short_names.setdefault(name[:-1], []).append(name)
+        for short, names in short_names.items():
+            if len(names) == 1 and len(short) >= 2 and short not in self.places:
+                self.aliases[short] = names[0]
+
+        self._nearest = {cell: self._closest_place(cell) for cell in self.cells}
+
+    def _closest_place(self, cell):
+        nx, ny = cell
+        return min(
+            self.places.values(),
+            key=lambda p: (p.nx - nx) ** 2 + (p.ny - ny) ** 2,
+            default=None
+        )
+
+    def lookup(self, lat, lon):
+        """
+        위경도 -> (nx, ny) (항상 투영을 직접 계산, 칸 경계에서도 정확)
+        """
+        return latlon_to_grid(lat, lon)
+
+    def place(self, name):
+        """
+        읍/면/동 이름 -> GridPlace (없으면 None)
+        """
+        name = name.strip()
+        return self.places.get(name) or self.places.get(self.aliases.get(name))
+
+    def nearest_place(self, nx, ny):
+        """
+        (nx, ny)에서 가장 가까운 읍/면/동 (제주 밖이면 None)
+        """
+        return self._nearest.get((nx, ny))
+
+
+JEJU_GRID = JejuGridIndex()
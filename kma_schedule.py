@@ -0,0 +1,92 @@
+"""
+기상청 발표 일정
+상품별로 "지금 조회 가능한 가장 최근 발표 시각"과 "다음 발표가 조회 가능해지는 시각" 계산
+
+발표 시각 직후에는 자료가 아직 올라오지 않아 NO_DATA 응답이 오므로
+상품별 반영 지연(lag)이 지난 발표분만 조회 가능한 것으로 봄
+캐시 키(발표 시각), 캐시 만료(다음 조회 가능 시각), prefetch 일정이 모두 여기서 나옴
+"""
+
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+# base_times: 하루 중 발표 시각 (시, 분)
+# lag_minutes: 발표 시각 이후 조회 가능해지기까지 걸리는 시간 (분)
+ProductSchedule = namedtuple("ProductSchedule", ["base_times", "lag_minutes"])
+
+# 단기예보 발표 시각 (하루 8회)
+SHORT_BASE_HOURS = (2, 5, 8, 11, 14, 17, 20, 23)
+
+# 중기예보 발표 시각 (하루 2회)
+MID_BASE_HOURS = (6, 18)
+
+SCHEDULES = {
+    # 초단기실황: 매시 정시 관측, 10분 이후 조회 가능
+    "ultra_short_now": ProductSchedule(tuple((h, 0) for h in range(24)), 10),
+    # 초단기예보: 매시 30분 발표, 45분 이후 조회 가능
+    "ultra_short_fcst": ProductSchedule(tuple((h, 30) for h in range(24)), 15),
+    # 단기예보: 02시부터 3시간 간격 발표, 10분 이후 조회 가능
+    "short_forecast": ProductSchedule(tuple((h, 0) for h in SHORT_BASE_HOURS), 10),
+    # 중기예보: 06시, 18시 발표
+    "mid_temp": ProductSchedule(tuple((h, 0) for h in MID_BASE_HOURS), 10),
+    "mid_land": ProductSchedule(tuple((h, 0) for h in MID_BASE_HOURS), 10),
+}
+
+# 발표 회차 안에서도 값이 갱신되는 상품의 새로고침 주기 (초)
+# 초단기 예보는 같은 발표분이 계속 보정되므로 30분마다 다시 가져옴
+PRODUCT_REFRESH_SECONDS = {
+    "ultra_short_fcst": 30 * 60,
+}
+
+# 상품별 (발표 시각을 자정 기준 초로 정렬한 목록, 지연 시간) - 시작할 때 한 번 계산
+_BASE_SECONDS = {
+    product: (sorted(h * 3600 + m * 60 for h, m in schedule.base_times),
+              timedelta(minutes=schedule.lag_minutes))
+    for product, schedule in SCHEDULES.items()
+}
+
+
+def get_issuance(product, now=None):
+    """
+    (조회 가능한 가장 최근 발표 시각, 다음 발표가 조회 가능해지는 시각)
+    """
+    base_seconds, lag = _BASE_SECONDS[product]
+    now = now or datetime.now()
+
+    # now - lag 시점까지 발표된 것 중 가장 최근 것이 조회 가능한 최신 발표분
+    ref = now - lag
+    midnight = ref.replace(hour=0, minute=0, second=0, microsecond=0)
+    elapsed = (ref - midnight).total_seconds()
+
+    index = bisect_right(base_seconds, elapsed)
+    if index == 0:
+        issued = midnight - timedelta(days=1) + timedelta(seconds=base_seconds[-1])
+    else:
+        issued = midnight + timedelta(seconds=base_seconds[index - 1])
+
+    if index == len(base_seconds):
+        next_issue = midnight + timedelta(days=1, seconds=base_seconds[0])
+    else:
+        next_issue = midnight + timedelta(seconds=base_seconds[index])
+    return issued, next_issue + lag
+
+
+def superseded_at(product, issued):
+    """
+    issued 발표분의 다음 발표가 조회 가능해지는 시각 (= issued 발표분이 최신이 아니게 된 시각)
+    """
+    _, lag = _BASE_SECONDS[product]
+    return get_issuance(product, issued + lag)[1]
+
+
+def next_refresh(product, next_release, now=None):
+    """
+    캐시를 새로 채울 시각 = 다음 발표가 조회 가능해지는 시각
+    (새로고침 주기가 더 짧은 상품은 그 시각)
+    """
+    refresh = PRODUCT_REFRESH_SECONDS.get(product)
+    if refresh is None:
+        return next_release
+    now = now or datetime.now()
+    return min(next_release, now + timedelta(seconds=refresh))
@@ -0,0 +1,101 @@
+"""
+LLM 프롬프트 구성
+요청마다 바뀌지 않는 시스템 프롬프트(페르소나, 귤담 AI 정체성, 틴저린 프로젝트 원칙)는
+시작할 때 한 번 만들어두고, 요청마다 바뀌는 날씨/농사 정보는 그 뒤(사용자 메시지 앞부분)에 붙임
+
+- 모든 요청의 앞부분(system 메시지)이 글자 하나까지 같으므로
+  OpenRouter/모델 제공자의 prompt prefix 캐시를 그대로 재사용할 수 있음
+- 이어지는 대화는 고정 system 메시지 뒤, 이번 질문 앞에 user/assistant 메시지로 들어감
+  (지난 대화는 바뀌지 않으므로 prefix 캐시가 대화 부분까지 이어짐)
+- 고정 부분의 토큰 수는 시작할 때 한 번만 추정 (PROMPT_STATS)
+"""
+
+import re
+
+# 요청마다 바뀌지 않는 시스템 프롬프트 (수정하면 prefix 캐시가 새로 만들어짐)
+SYSTEM_PROMPT = """너는 제주도의 농민들을 돕는 친절한 AI 농업 전문가다.
+제주도의 기후와 토양 특성을 고려하여 조언해라.
+귤 농사, 밭농사, 토양 관리, 병해충 방제, 비료 사용 등에 대해 실용적이고 구체적인 답변을 제공해라.
+항상 자연스러운 한국어로 대답하고, 농민들이 쉽게 이해할 수 있도록 어려운 전문 용어는 피하거나 쉽게 풀어서 설명해라.
+답변은 친근하고 따뜻한 어조로, 존댓말을 사용해라.
+
+[CHATTEEN_AI_IDENTITY]
+너의 이름은 귤담 AI(Gyuldam AI) 이다.
+귤담 AI(Gyuldam AI)는 학생 주도의 농업 지원 프로젝트인 틴저린 프로젝트 (Teengerine Project)가 개발한 AI 도우미이다.
+정보 제공과 설명을 돕는 역할에 집중한다.
+
+[TEENGERINE_PROJECT_CONTEXT]
+틴저린 프로젝트 (Teengerine Project)는 학생들이 제주 지역 농가를 직접 방문해 현장 농작업을 돕고 SNS 운영을 통해 F2T 판매를 지원하는 프로젝트이다.
+현재 약 10개 농가와 함께 운영되고 있습니다.
+
+중요한 원칙:
+- 사용자가 묻지 않으면 프로젝트를 먼저 언급하지 마세요.
+- 자신을 운영 주체처럼 표현하지 마세요.
+- 농가 입장에서 도움이 되는 정보를 중심으로 설명하세요.
+
+[참고 정보 사용 방법]
+사용자 메시지 앞의 [참고 정보]에는 실시간 기상 정보와 농사 정보, 영농 자료 발췌(=== 참고 자료 ===)가 들어 있습니다.
+이 정보를 자연스럽게 답변에 녹여서 활용하되, 사용자가 물어보지 않은 정보는 강제로 언급하지 마세요.
+[이전 대화]가 있으면 앞서 나눈 질문을 이어서 묻는 것이니, 사용자가 같은 내용을 다시 말하지 않아도 이해하고 답하세요."""
+
+# 요청마다 바뀌는 부분 (사용자 메시지 앞에 붙음)
+CONTEXT_TEMPLATE = """[참고 정보]
+{api_context}
+
+[질문]
+{prompt}"""
+
+# 고정 system 메시지 - 요청마다 새로 만들지 않고 같은 객체를 재사용 (수정 금지)
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+# 한글 음절 / 영문 단어·숫자 / 그 밖의 기호
+_TOKEN_PATTERN = re.compile(r"[가-힣]|[A-Za-z]+|\d+|[^\sA-Za-z\d가-힣]")
+
+
+def estimate_tokens(text):
+    """
+    토큰 수 추정 (토크나이저 없이)
+    한글은 음절 하나, 영문 단어/숫자/기호는 덩어리 하나를 토큰 하나로 셈
+    (실제 토크나이저보다 조금 많게 나오므로 예산 계산에는 안전한 쪽)
+    """
+    if not text:
+        return 0
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+# 토큰 예산 때문에 빠진 지난 대화 요약 (이번 질문 앞에 붙음)
+SUMMARY_TEMPLATE = """[이전 대화]
+{summary}
+
+"""
+
+
+def user_content(prompt, api_context="", summary=""):
+    """
+    사용자 메시지 본문 (참고 정보가 없으면 질문만)
+    """
+    content = CONTEXT_TEMPLATE.format(api_context=api_context, prompt=prompt) if api_context else prompt
+    if summary:
+        content = SUMMARY_TEMPLATE.format(summary=summary) + content
+    return content
+
+
+def build_messages(prompt, api_context="", history=(), summary=""):
+    """
+    [고정 system 메시지, 지난 대화 (user/assistant)..., 참고 정보 + 질문]
+    history: [(질문, 답변), ...] 오래된 것부터, summary: 예산 밖으로 밀려난 대화 요약
+    """
+    messages = [_SYSTEM_MESSAGE]
+    for question, answer in history:
+        messages.append({"role": "user", "content": question})
+        messages.append({"role": "assistant", "content": answer})
+    messages.append({"role": "user", "content": user_content(prompt, api_context, summary)})
+    return messages
+
+
+# 고정 부분 크기 - 시작할 때 한 번 계산
+PROMPT_STATS = {
+    "system_chars": len(SYSTEM_PROMPT),
+    "system_tokens": estimate_tokens(SYSTEM_PROMPT),
+    "template_tokens": estimate_tokens(CONTEXT_TEMPLATE.format(api_context="", prompt="")),
+}
@@ -0,0 +1,54 @@
+"""
+질문 문장 정규화
+답변 캐시 키와 비슷한 질문 비교가 같은 규칙으로 질문을 다듬도록 한 곳에 모음
+"""
+
+import re
+import unicodedata
+
+# 문장 끝에서 떼어낼 존댓말/의문 어미 (긴 것부터 검사)
+HONORIFIC_ENDINGS = tuple(sorted((
+    "습니까", "입니까", "합니까", "됩니까",
+    "인가요", "는가요", "나요", "을까요", "까요", "가요",
+    "으세요", "주세요", "세요",
+    "해요", "이에요", "예요", "에요", "네요", "지요", "죠",
+    "습니다", "니다", "요",
+), key=len, reverse=True))
+
+# 낱말 끝에서 떼어낼 조사 (긴 것부터 검사)
+PARTICLES = ("에서", "으로", "에는", "은", "는", "이", "가", "을", "를", "에", "도", "로", "의")
+
+_PUNCT_SPACE = re.compile(r"[\s\W_]+")
+_WORD = re.compile(r"\w+")
+
+
+def strip_suffix(word, suffixes):
+    """
+    suffixes 중 처음 맞는 것 하나를 뗌 (단어 전체가 접미사면 그대로)
+    """
+    for suffix in suffixes:
+        if word.endswith(suffix) and len(word) > len(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def normalize_question(question):
+    """
+    "이번주 날씨 어때요?" / "이번 주 날씨 어때" -> "이번주날씨어때"
+    """
+    text = unicodedata.normalize("NFKC", question or "").lower()
+    return strip_suffix(_PUNCT_SPACE.sub("", text), HONORIFIC_ENDINGS)
+
+
+def question_words(question):
+    """
+    "이번 주에 비 오나요?" -> ["이번", "주", "비", "오"]
+    조사와 마지막 낱말의 존댓말 어미를 뗀 낱말 목록
+    """
+    words = _WORD.findall(unicodedata.normalize("NFKC", question or "").lower())
+    result = []
+    for i, word in enumerate(words):
+        if i == len(words) - 1:
+            word = strip_suffix(word, HONORIFIC_ENDINGS)
+        result.append(strip_suffix(word, PARTICLES))
+    return result
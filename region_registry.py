@@ -0,0 +1,123 @@
+"""
+지역 레지스트리
+지역 이름, 별칭, 제주 읍/면/동, "위도,경도"를 기상청 코드 전체로 한 번에 변환
+(단기예보 격자 nx/ny, 중기기온 regId, 중기육상 regId, 중기예보 stnId)
+
+시작할 때 weather_config의 코드표를 합쳐 색인 하나를 만들고
+조회는 dict 한 번 (좌표는 kma_grid 색인 한 번)으로 끝남
+"""
+
+from collections import namedtuple
+
+from kma_grid import JEJU_GRID, parse_latlon
+from weather_config import (
+    MID_FORECAST_REGIONS,
+    MID_LAND_REGIONS,
+    MID_TEMP_REGIONS,
+    SHORT_FORECAST_COORDS,
+    MID_REGION_BY_CITY,
+    REGION_ALIASES,
+    DEFAULT_REGION,
+    DEFAULT_MID_FORECAST,
+    DEFAULT_MID_LAND,
+    DEFAULT_MID_TEMP
+)
+
+# 한 지역의 기상청 코드 전체
+# name: 응답에 표시할 이름, city: 기준 도시 (SHORT_FORECAST_COORDS 키)
+RegionCodes = namedtuple(
+    "RegionCodes",
+    ["name", "city", "nx", "ny", "mid_temp", "mid_land", "mid_stn"]
+)
+
+
+class RegionRegistry:
+    """
+    지역 이름/별칭/읍면동 -> RegionCodes 색인 (시작할 때 한 번 만들고 이후 읽기 전용)
+    """
+
+    def __init__(self):
+        # 1. 도시 (SHORT_FORECAST_COORDS + 중기 예보구역)
+        self.cities = {}
+        for city, coords in SHORT_FORECAST_COORDS.items():
+            temp, land, stn = MID_REGION_BY_CITY.get(city, (None, None, None))
+            self.cities[city] = RegionCodes(
+                city, city, coords["nx"], coords["ny"],
+                MID_TEMP_REGIONS.get(temp, DEFAULT_MID_TEMP),
+                MID_LAND_REGIONS.get(land, DEFAULT_MID_LAND),
+                MID_FORECAST_REGIONS.get(stn, DEFAULT_MID_FORECAST),
+            )
+        self._index = dict(self.cities)
+
+        # 2. 별칭 ("제주" -> 제주시)
+        for alias, city in REGION_ALIASES.items():
+            self._index.setdefault(alias, self.cities[city]._replace(name=alias))
+
+        # 3. 제주 읍/면/동 (격자는 읍면동, 중기 코드는 속한 시)
+        for name, place in JEJU_GRID.places.items():
+            label = f"{place.city} {name}"
+            self._index[name] = self.cities[place.city]._replace(
+                name=label, nx=place.nx, ny=place.ny
+            )
+        for alias, name in JEJU_GRID.aliases.items():
+            self._index.setdefault(alias, self._index[name])
+
+        self.default = self._index[DEFAULT_REGION]
+
+    def resolve(self, region):
+        """
+        지역 -> RegionCodes
+        모르는 이름은 기본 지역(제주)의 코드로, 표시 이름은 그대로 둠
+        """
+        codes = self._index.get(region)
+        if codes is not None:
+            return codes
+
+        latlon = parse_latlon(region)
+        if latlon is None:
+            if isinstance(region, str):
+                codes = self._index.get(region.strip())
+            return codes or self.default._replace(name=region)
+        return self._resolve_latlon(region, *latlon)
+
+    def is_known(self, region):
+        """
+        이름/별칭/읍면동으로 찾을 수 있거나 "위도,경도"이면 True
+        (resolve는 모르는 이름도 기본 지역으로 돌려주므로 입력 검사용)
+        """
+        if region in self._index:
+            return True
+        if isinstance(region, str) and region.strip() in self._index:
+            return True
+        return parse_latlon(region) is not None
+
+    def _resolve_latlon(self, region, lat, lon):
+        # 격자는 좌표 그대로, 중기 코드는 가장 가까운 읍/면/동(제주 밖은 도시) 기준
+        nx, ny = JEJU_GRID.lookup(lat, lon)
+        place = JEJU_GRID.nearest_place(nx, ny)
+        if place is not None:
+            codes, near = self.cities[place.city], f"{place.city} {place.name}"
+        else:
+            codes = min(
+                self.cities.values(),
+                key=lambda c: (c.nx - nx) ** 2 + (c.ny - ny) ** 2
+            )
+            near = codes.name
+        return codes._replace(name=f"{near} 부근 ({region})", nx=nx, ny=ny)
+
+    def names(self):
+        """
+        이름으로 찾을 수 있는 지역 목록 (도시, 제주 읍/면/동)
+        """
+        return {
+            "regions": list(self.cities),
+            "locations": list(JEJU_GRID.places),
+            "aliases": sorted(set(self._index) - set(self.cities) - set(JEJU_GRID.places)),
+        }
+
+
+REGIONS = RegionRegistry()
+
+
+def resolve_region(region):
+    return REGIONS.resolve(region)
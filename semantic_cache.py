@@ -0,0 +1,248 @@
+"""
+비슷한 질문 캐시 (선택 기능, SEMANTIC_CACHE=1 이고 numpy가 설치돼 있을 때만 사용)
+"비 언제 와요?" / "비는 언제 오나요"처럼 어미/조사/띄어쓰기만 다른 질문에 저장된 답변을 재사용
+
+- 질문 벡터: 낱말마다 조사와 어미를 떼어 줄기만 남기고 ("와요"/"오나요" -> "오")
+  "뭐", "어떻게" 같은 내용 없는 낱말은 뺀 뒤
+  줄기(낱말 단위)와 줄기를 이어 붙인 글자 2-gram을 해시해서 DIM 차원에 누적, 길이 1로 정규화
+  (모델 다운로드, GPU, 네트워크 없이 CPU만 사용)
+- 참고 정보 해시(context fingerprint)마다 (DIM x 질문 수) 행렬 하나
+  질문 벡터에서 0이 아닌 차원(20개 안팎)의 행만 골라 곱하므로 2만 개도 0.1ms 수준
+  같은 날씨/농사 정보로 만든 답변끼리만 비교하므로 다른 지역/발표 회차 답변이 섞이지 않음
+  (참고 정보가 달라지는 질문끼리는 비교하지 않음: "비 언제 와요?"는 단기예보, "이번 주에 비 오나요?"는
+  중기예보까지 들어가므로 서로 재사용되지 않음)
+- 코사인 유사도가 SEMANTIC_CACHE_THRESHOLD 이상이면 저장된 답변 반환
+"""
+
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # numpy가 없으면 비슷한 질문 캐시는 꺼짐
+    np = None
+
+from question_text import HONORIFIC_ENDINGS, PARTICLES, strip_suffix
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE") == "1" and np is not None
+
+# 이 값 이상으로 비슷하면 같은 질문으로 봄 (0~1, 높을수록 엄격)
+# 농민 질문 표현 쌍으로 맞춘 값:
+#   같은 질문 ("비 언제 와요?" / "비는 언제 오나요", "다음주 날씨 알려줘" / "다음 주 날씨 알려주세요") 0.9 이상
+#   다른 질문 ("마늘 언제 심어요?" / "마늘 언제 캐요?", "오늘 비 와요?" / "오늘 비 안 와요?") 0.73 이하
+#   낱말 자체가 바뀌는 표현은 못 맞춤 ("방제 어떻게 해요?" / "방제 방법 알려주세요" 0.77 -> 새로 물어봄)
+#   (tests/test_semantic_cache.py의 표현 쌍)
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))
+
+# 질문 벡터 차원 (해시 버킷 수)
+DIM = 256
+
+# 참고 정보(지역/발표 회차)별 최대 질문 수, 유지하는 참고 정보 개수
+MAX_PER_CONTEXT = int(os.getenv("SEMANTIC_CACHE_MAX_PER_CONTEXT", "20000"))
+MAX_CONTEXTS = int(os.getenv("SEMANTIC_CACHE_MAX_CONTEXTS", "256"))
+
+# 줄기 가중치: 낱말 단위 / 글자 2-gram ("다음주" / "다음 주"처럼 띄어쓰기만 다르면 2-gram이 같음)
+WORD_WEIGHT = 0.7
+BIGRAM_WEIGHT = 1.0
+
+# 존댓말 어미 + 반말/명령 어미 (긴 것부터)
+VERB_ENDINGS = tuple(sorted(
+    set(HONORIFIC_ENDINGS) | {"어야", "아야", "야", "줘", "주세요"}, key=len, reverse=True
+))
+
+# 줄어든 끝 글자 -> 원래 줄기 ("와" -> "오", "줘" -> "주", "해" -> "하")
+CONTRACTIONS = {"와": "오", "줘": "주", "해": "하", "돼": "되", "봐": "보", "써": "쓰", "꿔": "꾸", "워": "우"}
+
+# 질문 내용과 상관없는 낱말 (줄기 기준)
+STOPWORDS = frozenset({"하", "되", "무슨", "뭐", "뭘", "어떻게", "어떻", "어때", "어떠", "어떤", "좀"})
+
+_WORD = re.compile(r"\w+")
+_HANGUL_BASE = 0xAC00
+_FINAL_N_L = (4, 8)  # 받침 ㄴ, ㄹ ("올까요" -> "올" -> "오")
+
+
+def _drop_final(syllable):
+    code = ord(syllable) - _HANGUL_BASE
+    if 0 <= code < 11172 and code % 28 in _FINAL_N_L:
+        return chr(ord(syllable) - code % 28)
+    return syllable
+
+
+def stem(word):
+    """
+    낱말 -> 줄기 ("비는" -> "비", "오나요" -> "오", "와요" -> "오", "방제하나요" -> "방제")
+    """
+    # "온도는" -> "온도" -> "온"처럼 두 번 떼야 "온도" 쪽과 같아짐
+    word = strip_suffix(strip_suffix(word, PARTICLES), PARTICLES)
+    base = strip_suffix(word, VERB_ENDINGS)
+    if base != word:
+        word = base
+        if len(word) > 1 and word[-1] in "아어여":
+            word = word[:-1]
+        word = word[:-1] + _drop_final(word[-1])
+    word = word[:-1] + CONTRACTIONS.get(word[-1], word[-1])
+    if len(word) > 1 and word.endswith("하"):
+        word = word[:-1]
+    return word
+
+
+def content_words(question):
+    """
+    "비는 언제 오나요?" -> ["비", "언제", "오"]
+    """
+    text = unicodedata.normalize("NFKC", question or "").lower()
+    words = (stem(word) for word in _WORD.findall(text))
+    return [word for word in words if word and word not in STOPWORDS]
+
+
+def _bucket(text):
+    # crc32는 프로세스가 달라도 같은 값 (hash()는 실행마다 다름)
+    return zlib.crc32(text.encode("utf-8")) % DIM
+
+
+def embed(question):
+    """
+    질문 -> 길이 1인 float32 벡터 (낱말이 없으면 None)
+    """
+    vector = np.zeros(DIM, dtype=np.float32)
+    words = content_words(question)
+    for word in words:
+        vector[_bucket("w:" + word)] += WORD_WEIGHT
+    joined = "".join(words)
+    for i in range(len(joined) - 1):
+        vector[_bucket(joined[i:i + 2])] += BIGRAM_WEIGHT
+    norm = float(np.linalg.norm(vector))
+    if norm == 0.0:
+        return None
+    vector /= norm
+    return vector
+
+
+class _ContextIndex:
+    """
+    참고 정보 하나에 대한 (질문 벡터 행렬, 답변 목록, 답변별 만료 시각)
+    행렬은 열 하나가 질문 하나 (DIM x 용량), 두 배씩 늘려서 추가할 때마다 복사하지 않음
+    expires_at: 답변 중 가장 늦은 만료 시각 (이 시각이 지나면 색인을 통째로 버림)
+    """
+
+    def __init__(self):
+        self.expires_at = 0.0
+        self.matrix = np.empty((DIM, 16), dtype=np.float32)
+        self.row_expires = np.empty(16, dtype=np.float64)
+        self.questions = {}  # 질문 -> 열 번호
+        self.answers = []
+
+    def __len__(self):
+        return len(self.answers)
+
+    def search(self, vector):
+        count = len(self.answers)
+        if count == 0:
+            return None, 0.0
+        dims = np.flatnonzero(vector)
+        scores = vector[dims] @ self.matrix[dims, :count]
+        # 만료된 답변은 고르지 않음
+        scores[self.row_expires[:count] <= time.time()] = -1.0
+        best = int(scores.argmax())
+        return best, float(scores[best])
+
+    def add(self, question, vector, answer, expires_at):
+        row = self.questions.get(question)
+        if row is None:
+            row = len(self.answers)
+            if row >= MAX_PER_CONTEXT:
+                return
+            if row == self.matrix.shape[1]:
+                grown = np.empty((DIM, row * 2), dtype=np.float32)
+                grown[:, :row] = self.matrix
+                self.matrix = grown
+                grown_expires = np.empty(row * 2, dtype=np.float64)
+                grown_expires[:row] = self.row_expires
+                self.row_expires = grown_expires
+            self.questions[question] = row
+            self.answers.append(answer)
+        else:
+            # 같은 질문을 다시 저장하면 (만료 후 다시 물어본 경우) 답변과 만료 시각을 바꿈
+            self.answers[row] = answer
+        self.matrix[:, row] = vector
+        self.row_expires[row] = expires_at
+        self.expires_at = max(self.expires_at, expires_at)
+
+
+class SemanticCache:
+    """
+    context fingerprint -> _ContextIndex (참고 정보 단위로 LRU)
+    답변마다 자기 만료 시각이 지나면 검색에서 빠지고, 모든 답변이 만료되면 색인을 통째로 버림
+    """
+
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, max_contexts=MAX_CONTEXTS):
+        self.threshold = threshold
+        self.max_contexts = max_contexts
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _index(self, fingerprint):
+        index = self._indexes.get(fingerprint)
+        if index is not None and index.expires_at <= time.time():
+            del self._indexes[fingerprint]
+            return None
+        return index
+
+    def get(self, question, fingerprint):
+        """
+        같은 참고 정보로 한 비슷한 질문의 답변 (없으면 None)
+        """
+        vector = embed(question)
+        with self._lock:
+            index = self._index(fingerprint)
+            if index is None or vector is None:
+                self.misses += 1
+                return None
+            self._indexes.move_to_end(fingerprint)
+            best, score = index.search(vector)
+            if best is None or score < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return index.answers[best]
+
+    def set(self, question, fingerprint, answer, expires_at):
+        vector = embed(question)
+        if vector is None or expires_at <= time.time():
+            return
+        with self._lock:
+            index = self._index(fingerprint)
+            if index is None:
+                index = _ContextIndex()
+                self._indexes[fingerprint] = index
+                while len(self._indexes) > self.max_contexts:
+                    self._indexes.popitem(last=False)
+            self._indexes.move_to_end(fingerprint)
+            index.add(" ".join(content_words(question)), vector, answer, expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": True,
+                "contexts": len(self._indexes),
+                "questions": sum(len(index) for index in self._indexes.values()),
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+SEMANTIC_CACHE = SemanticCache() if SEMANTIC_CACHE_ENABLED else None
@@ -0,0 +1,49 @@
+from conversation import MAX_SEED_TURNS, ConversationStore
+
+CONVERSATION_ID = "conv-0001"
+
+
+def _seed(turns):
+    return [{"question": q, "answer": a} for q, a in turns]
+
+
+def test_worker_with_older_copy_takes_newer_turns_from_seed():
+    # 워커 두 개가 같은 대화를 나눠 받은 상황
+    worker_a, worker_b = ConversationStore(), ConversationStore()
+    first = ("오늘 비 와요?", "오후에 비가 옵니다.")
+    second = ("내일은요?", "내일은 맑습니다.")
+
+    worker_a.get(CONVERSATION_ID).add(*first)
+    # 두 번째 질문은 worker_b가 받음 (브라우저가 첫 대화를 history로 보냄)
+    worker_b.get(CONVERSATION_ID, seed=_seed([first])).add(*second)
+
+    # 세 번째 질문이 다시 worker_a로 오면 브라우저의 history를 따라야 함
+    conversation = worker_a.get(CONVERSATION_ID, seed=_seed([first, second]))
+    assert conversation.history()[1] == [first, second]
+    assert worker_a.stats()["resynced"] == 1
+
+
+def test_diverged_last_turn_is_replaced_from_seed():
+    worker_a, worker_b = ConversationStore(), ConversationStore()
+    first = ("감귤 전정 언제 해요?", "2월 하순부터 3월 상순입니다.")
+    worker_a.get(CONVERSATION_ID).add(*first)
+    worker_a.get(CONVERSATION_ID).add("서귀포는요?", "서귀포도 같습니다.")
+    worker_b.get(CONVERSATION_ID, seed=_seed([first])).add("적과는요?", "7월 상순입니다.")
+
+    seed = _seed([first, ("적과는요?", "7월 상순입니다.")])
+    conversation = worker_a.get(CONVERSATION_ID, seed=seed)
+    assert conversation.history()[1] == [first, ("적과는요?", "7월 상순입니다.")]
+
+
+def test_matching_seed_keeps_stored_turns():
+    store = ConversationStore()
+    turns = [(f"질문 {i}", f"답변 {i}") for i in range(MAX_SEED_TURNS + 5)]
+    conversation = store.get(CONVERSATION_ID, seed=_seed(turns))
+    conversation.add("새 질문", "새 답변")
+
+    # 브라우저는 긴 대화를 보내지만 마지막 대화가 같으면 다시 채우지 않음
+    again = store.get(CONVERSATION_ID, seed=_seed(turns + [("새 질문", "새 답변")]))
+    assert again is conversation
+    assert again.added == MAX_SEED_TURNS + 1
+    assert store.stats()["resynced"] == 0
+    assert store.stats()["seeded"] == 1
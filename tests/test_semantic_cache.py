@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from semantic_cache import SemanticCache
+
+FINGERPRINT = "context-1"
+
+# 같은 질문 (저장된 답변을 다시 씀)
+PARAPHRASES = [
+    ("비 언제 와요?", "비는 언제 오나요"),
+    ("내일 비가 오나요", "내일 비 올까요?"),
+    ("오늘 날씨 어때요?", "오늘 날씨는 어떤가요?"),
+    ("다음주 날씨 알려줘", "다음 주 날씨 알려주세요"),
+    ("감귤 저장고 온도 몇 도가 좋아요?", "감귤 저장고 온도는 몇 도가 좋나요?"),
+    ("당근 파종 언제 해야 돼요?", "당근 파종은 언제 해야 하나요?"),
+    ("응애 방제 어떻게 해요?", "응애는 어떻게 방제하나요?"),
+]
+
+# 다른 질문, 또는 낱말이 바뀌어 못 맞추는 표현 (새로 물어봄)
+MISSES = [
+    ("오늘 비 와요?", "오늘 비 안 와요?"),
+    ("마늘 언제 심어요?", "마늘 언제 캐요?"),
+    ("내일 비 와요?", "모레 비 와요?"),
+    ("귤 수확 언제 해요?", "당근 수확 언제 해요?"),
+    ("감귤 궤양병 방제 어떻게 해요?", "감귤 궤양병 방제 방법 알려주세요"),
+]
+
+
+def _cache_with(question, answer="답변", ttl=60):
+    cache = SemanticCache()
+    cache.set(question, FINGERPRINT, answer, time.time() + ttl)
+    return cache
+
+
+@pytest.mark.parametrize("stored, asked", PARAPHRASES)
+def test_paraphrase_hits(stored, asked):
+    assert _cache_with(stored).get(asked, FINGERPRINT) == "답변"
+
+
+@pytest.mark.parametrize("stored, asked", MISSES)
+def test_different_question_misses(stored, asked):
+    assert _cache_with(stored).get(asked, FINGERPRINT) is None
+
+
+def test_each_answer_keeps_its_own_expiry():
+    cache = SemanticCache()
+    now = time.time()
+    cache.set("비 언제 와요?", FINGERPRINT, "곧 만료", now + 0.2)
+    cache.set("마늘 언제 심어요?", FINGERPRINT, "오래 감", now + 60)
+    time.sleep(0.3)
+
+    # 먼저 저장한 답변이 만료돼도 색인과 나중 답변은 남음
+    assert cache.get("비는 언제 오나요", FINGERPRINT) is None
+    assert cache.get("마늘은 언제 심나요?", FINGERPRINT) == "오래 감"
+
+    # 만료된 질문을 다시 저장하면 새 만료 시각으로 다시 쓰임
+    cache.set("비 언제 와요?", FINGERPRINT, "새 답변", time.time() + 60)
+    assert cache.get("비는 언제 오나요", FINGERPRINT) == "새 답변"
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import weather_api
+from weather_cache import SQLiteWeatherCache, WeatherCache
+
+
+def _request():
+    issued = datetime.now().replace(minute=0, second=0, microsecond=0)
+    return weather_api.KMARequest(
+        "ultra_short_now", "52_38", issued, datetime.now() + timedelta(hours=1), {}, None
+    )
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path, monkeypatch):
+    if request.param == "memory":
+        cache = WeatherCache()
+    else:
+        cache = SQLiteWeatherCache(str(tmp_path / "cache.db"))
+    monkeypatch.setattr(weather_api, "WEATHER_CACHE", cache)
+    return cache
+
+
+def test_cold_then_warm_fetch_counts_one_miss_and_one_hit(cache, monkeypatch):
+    loads = []
+
+    def fake_load(req):
+        loads.append(req)
+        return {"value": len(loads)}
+
+    monkeypatch.setattr(weather_api, "_load", fake_load)
+    req = _request()
+
+    assert weather_api._cached_fetch(req) == {"value": 1}
+    assert weather_api._cached_fetch(req) == {"value": 1}
+
+    stats = cache.stats()
+    assert len(loads) == 1
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_peek_does_not_count():
+    cache = WeatherCache()
+    key = ("ultra_short_now", "52_38", "202610170500")
+    assert cache.peek(key) is None
+    cache.set(key, "value", datetime.now().timestamp() + 60)
+    assert cache.peek(key) == "value"
+    assert cache.wait_for(key, 1) == "value"
+
+    stats = cache.stats()
+    assert stats["hits"] == 0
+    assert stats["misses"] == 0
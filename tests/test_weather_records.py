@@ -0,0 +1,24 @@
+from weather_records import ForecastSeries, Observation
+
+
+def test_observation_missing_integer_value_is_none():
+    observation = Observation("ultra_short_now", "52_38", "202610170500", ["T1H", "REH", "PTY"])
+    observation.extend([
+        {"category": "T1H", "obsrValue": "15.2"},
+        {"category": "REH", "obsrValue": "-999"},
+        {"category": "PTY", "obsrValue": "0"},
+    ])
+
+    assert observation.get("REH") is None
+    assert observation.get("PTY") == 0
+    assert observation.to_dict()["values"] == {"T1H": 15.2, "REH": None, "PTY": 0}
+
+
+def test_float_values_are_rounded_to_kma_precision():
+    series = ForecastSeries("short_forecast", "52_38", "202610170500", ["TMP", "POP"])
+    series.extend([
+        {"category": "TMP", "fcstDate": "20261017", "fcstTime": "1200", "fcstValue": "15.2"},
+        {"category": "POP", "fcstDate": "20261017", "fcstTime": "1200", "fcstValue": "30"},
+    ])
+
+    assert list(series.rows()) == [(2026101712, {"TMP": 15.2, "POP": 30})]
@@ -7,25 +7,42 @@ Korea Meteorological Administration Weather API Integration
 2. 중기예보 API (MidFcstInfoService)
 """
 
-import requests
-from datetime import datetime, timedelta
-from functools import lru_cache
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
+from collections import namedtuple
 from dotenv import load_dotenv
+import copy
 import os
+import asyncio
+import threading
+import time
+import weakref
 load_dotenv()
 
+# 공용 HTTP 세션 (커넥션 재사용)
+from http_client import http_get, async_http_get
+from weather_cache import WeatherCache, SQLiteWeatherCache, SingleFlight
+from kma_categories import PRODUCT_CATEGORIES
+from region_registry import resolve_region
+from kma_schedule import get_issuance, next_refresh, superseded_at
+from weather_records import (
+    Observation,
+    ForecastSeries,
+    MidTemp,
+    MidLand,
+    is_error,
+    to_float,
+    format_number,
+    sky_label,
+    pty_label,
+    precipitation_label
+)
+
 # 지역 코드 설정 import
 from weather_config import (
     WEATHER_API_KEY,
     MID_FORECAST_REGIONS,
-    MID_LAND_REGIONS,
-    MID_TEMP_REGIONS,
-    SHORT_FORECAST_COORDS,
-    DEFAULT_REGION,
-    DEFAULT_MID_FORECAST,
-    DEFAULT_MID_LAND,
-    DEFAULT_MID_TEMP,
-    DEFAULT_SHORT_COORDS
+    DEFAULT_REGION
 )
 
 # API 키 (환경변수 우선, 없으면 config 파일 사용)
@@ -51,790 +68,849 @@ ENDPOINTS = {
 }
 
 
+# ============================================
+# 캐시 - (상품, 지역코드, 발표시각) 키
+# ============================================
+
+# 지역이 많아져도 밀려나지 않도록 넉넉하게 (상품 5개 x 지역 x 발표 회차)
+WEATHER_CACHE_MAXSIZE = int(os.getenv("WEATHER_CACHE_MAXSIZE", "512"))
+
+# 워커 간 공유 캐시 파일 경로 (설정하지 않으면 워커별 메모리 캐시)
+# 예: export WEATHER_CACHE_DB=/tmp/jeju_weather_cache.db
+WEATHER_CACHE_DB = os.getenv("WEATHER_CACHE_DB")
+
+# 다른 워커가 조회 중일 때 기다리는 최대 시간 (초)
+FETCH_LEASE_SECONDS = 15
+
+if WEATHER_CACHE_DB:
+    WEATHER_CACHE = SQLiteWeatherCache(WEATHER_CACHE_DB, maxsize=WEATHER_CACHE_MAXSIZE)
+else:
+    WEATHER_CACHE = WeatherCache(maxsize=WEATHER_CACHE_MAXSIZE)
+
+# 같은 (상품, 지역코드, 발표시각)을 동시에 조회하면 기상청 요청 하나만 보냄
+_inflight = SingleFlight()
+
+# 새 발표분을 못 가져왔을 때 이전 예보를 대신 보여줄 최대 기간 (초)
+# 다음 발표 시각이 지난 뒤부터 계산 (기본 3시간)
+WEATHER_MAX_STALENESS = int(os.getenv("WEATHER_MAX_STALENESS", str(3 * 60 * 60)))
+
+# 백그라운드 새로고침이 실패하면 이 시간 동안은 다시 시도하지 않음 (초)
+STALE_REFRESH_BACKOFF = 30
+
+_refreshing = set()
+_refresh_retry_at = {}
+_refresh_lock = threading.Lock()
+
+# 백그라운드 새로고침 전용 (기상청이 느릴 때 새로고침이 쌓여도 사용자 요청용 풀을 막지 않음)
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="kma-refresh")
+
+
+def _expires_at(req):
+    # 다음 발표가 조회 가능해지는 시각 (kma_schedule 기준)에 정확히 만료
+    return next_refresh(req.product, req.next_release).timestamp()
+
+
+# 기상청 요청 한 건 (상품, 캐시 키 정보, 요청 파라미터, 파싱 함수)
+# 동기/비동기 조회가 같은 요청 정보와 파싱 로직을 공유함
+KMARequest = namedtuple(
+    "KMARequest",
+    ["product", "region_code", "issued", "next_release", "params", "parse"]
+)
+
+# 상품별 조회 실패 메시지
+PRODUCT_ERRORS = {
+    "ultra_short_now": "현재 날씨 정보를 불러올 수 없습니다.",
+    "ultra_short_fcst": "초단기 예보를 불러올 수 없습니다.",
+    "short_forecast": "단기예보를 불러올 수 없습니다.",
+    "mid_temp": "중기예보를 불러올 수 없습니다.",
+    "mid_land": "중기 육상예보를 불러올 수 없습니다.",
+}
+
+
+def _cache_key(req):
+    return (req.product, req.region_code, req.issued.strftime("%Y%m%d%H%M"))
+
+
+def _page_items(data):
+    """
+    기상청 응답에서 (items, totalCount) 꺼내기
+    resultCode가 "00"이 아니면 None
+    """
+    response = data.get("response", {})
+    if response.get("header", {}).get("resultCode") != "00":
+        return None
+    body = response.get("body", {})
+    items = body.get("items", {}).get("item", [])
+    return items, int(body.get("totalCount") or len(items))
+
+
+def _remaining_pages(req, total_count):
+    """
+    첫 페이지에 다 담기지 않았을 때 나머지 페이지 요청 파라미터 목록
+    """
+    page_size = int(req.params["numOfRows"])
+    last_page = -(-total_count // page_size)
+    return [dict(req.params, pageNo=page) for page in range(2, last_page + 1)]
+
+
+def _parse_items(req, items):
+    result = req.parse(items)
+    if result is None:
+        return {"error": "데이터를 가져올 수 없습니다"}
+    return result
+
+
+def _get_page(product, params):
+    response = http_get(ENDPOINTS[product], params=params, timeout=10)
+    response.raise_for_status()
+    return _page_items(response.json())
+
+
+async def _get_page_async(product, params):
+    response = await async_http_get(ENDPOINTS[product], params=params, timeout=10)
+    response.raise_for_status()
+    return _page_items(response.json())
+
+
+def _load(req):
+    """
+    기상청 호출 (동기)
+    totalCount가 한 페이지보다 많으면 나머지 페이지를 병렬로 받아서 합침
+    """
+    try:
+        page = _get_page(req.product, req.params)
+        if page is None:
+            return {"error": "데이터를 가져올 수 없습니다"}
+
+        items, total_count = page
+        rest = _remaining_pages(req, total_count) if len(items) < total_count else []
+        for extra in _page_executor.map(lambda params: _get_page(req.product, params), rest):
+            if extra is None:
+                return {"error": "데이터를 가져올 수 없습니다"}
+            items = items + extra[0]
+
+        return _parse_items(req, items)
+    except Exception as e:
+        print(f"Weather API Error ({req.product}): {e}")
+        return {"error": PRODUCT_ERRORS[req.product]}
+
+
+async def _load_async(req):
+    """
+    기상청 호출 (비동기)
+    """
+    try:
+        page = await _get_page_async(req.product, req.params)
+        if page is None:
+            return {"error": "데이터를 가져올 수 없습니다"}
+
+        items, total_count = page
+        rest = _remaining_pages(req, total_count) if len(items) < total_count else []
+        pages = await asyncio.gather(*[_get_page_async(req.product, params) for params in rest])
+        for extra in pages:
+            if extra is None:
+                return {"error": "데이터를 가져올 수 없습니다"}
+            items = items + extra[0]
+
+        return _parse_items(req, items)
+    except Exception as e:
+        print(f"Weather API Error ({req.product}): {e}")
+        return {"error": PRODUCT_ERRORS[req.product]}
+
+
+def _cached_fetch(req):
+    """
+    캐시 조회 후 없으면 기상청 호출
+    같은 프로세스의 동시 요청은 SingleFlight로 하나로 합치고,
+    공유 캐시 사용 시 같은 발표 회차는 한 워커만 기상청을 호출함
+    에러 응답은 저장하지 않음 (다음 요청에서 다시 시도)
+
+    새 발표분이 캐시에 없더라도 WEATHER_MAX_STALENESS 이내의 이전 예보가 있으면
+    그 예보를 바로 반환하고 (stale 표시) 새 발표분은 백그라운드에서 가져옴
+    같은 발표분을 새로고침하는 경우에도 기존 값을 바로 반환하고 백그라운드에서 갱신
+    """
+    key = _cache_key(req)
+    ready = _ready_value(key, req)
+    if ready is not None:
+        return ready
+    return _inflight.do(key, lambda: _fetch_and_store(key, req))
+
+
+def _ready_value(key, req):
+    """
+    기상청을 기다리지 않고 바로 줄 수 있는 값 (캐시 hit 또는 이전 예보), 없으면 None
+    이전 예보를 주는 경우 새 발표분은 백그라운드에서 가져옴
+    """
+    cached = WEATHER_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    stale = _usable_stale(WEATHER_CACHE.last_good(key[:-1]))
+    if stale is not None:
+        _refresh_in_background(key, req)
+        return _serve_stale(key, stale)
+    return None
+
+
+def _usable_stale(last_good):
+    if last_good is None:
+        return None
+    if time.time() - last_good["expires_at"] > WEATHER_MAX_STALENESS:
+        return None
+    return last_good
+
+
+def _serve_stale(key, last_good):
+    # 같은 발표분의 주기적 새로고침(PRODUCT_REFRESH_SECONDS)이면 이전 예보가 아님
+    if last_good["issuance"] == key[-1]:
+        return last_good["value"]
+    return _mark_stale(key[0], last_good)
+
+
+def _mark_stale(product, last_good):
+    """
+    이전 예보에 stale 표시를 붙인 사본
+    (숫자 열은 공유하고 stale 정보만 따로 가짐)
+    age_seconds: 이전 예보가 최신이 아니게 된 시각(다음 발표가 조회 가능해진 시각)부터 지난 시간
+    """
+    value = copy.copy(last_good["value"])
+    value.stale = True
+    value.stale_issuance = last_good["issuance"]
+    issued = datetime.strptime(last_good["issuance"], "%Y%m%d%H%M")
+    value.age_seconds = max(0, int(time.time() - superseded_at(product, issued).timestamp()))
+    return value
+
+
+def _refresh_in_background(key, req):
+    with _refresh_lock:
+        if key in _refreshing or _refresh_retry_at.get(key, 0) > time.time():
+            return
+        _refreshing.add(key)
+
+    def refresh():
+        try:
+            result = _inflight.do(key, lambda: _fetch_and_store(key, req))
+            failed = is_error(result)
+        except Exception as e:
+            print(f"Weather refresh error: {key}: {e}")
+            failed = True
+        with _refresh_lock:
+            _refreshing.discard(key)
+            now = time.time()
+            for old_key in [k for k, t in _refresh_retry_at.items() if t <= now]:
+                del _refresh_retry_at[old_key]
+            if failed:
+                _refresh_retry_at[key] = now + STALE_REFRESH_BACKOFF
+            else:
+                _refresh_retry_at.pop(key, None)
+
+    _refresh_executor.submit(refresh)
+
+
+def _fetch_and_store(key, req):
+    # 직전 leader가 막 저장했을 수 있으므로 한 번 더 확인 (miss는 _ready_value에서 이미 셌음)
+    cached = WEATHER_CACHE.peek(key)
+    if cached is not None:
+        return cached
+
+    if not WEATHER_CACHE.acquire_lease(key, FETCH_LEASE_SECONDS):
+        cached = WEATHER_CACHE.wait_for(key, FETCH_LEASE_SECONDS)
+        if cached is not None:
+            return cached
+        # 다른 워커의 조회가 실패했으면 직접 조회
+
+    try:
+        result = _load(req)
+        if not is_error(result):
+            WEATHER_CACHE.set(key, result, _expires_at(req))
+        return result
+    finally:
+        WEATHER_CACHE.release_lease(key)
+
+
+# 이벤트 루프별 진행 중인 조회 (asyncio 버전 single-flight)
+_async_inflight = weakref.WeakKeyDictionary()
+
+
+# 공유 캐시(SQLite)는 잠금 대기(busy_timeout)로 오래 걸릴 수 있으므로 이벤트 루프 밖에서 호출
+# 메모리 캐시는 dict 조회뿐이라 그대로 호출
+_CACHE_BLOCKS = isinstance(WEATHER_CACHE, SQLiteWeatherCache)
+
+
+async def _cache_call(fn, *args):
+    if _CACHE_BLOCKS:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+
+async def _cached_fetch_async(req):
+    """
+    _cached_fetch의 asyncio 버전
+    캐시/이전 예보 처리는 동일하고, 기상청 호출만 이벤트 루프에서 비동기로 실행
+    """
+    key = _cache_key(req)
+    ready = await _cache_call(_ready_value, key, req)
+    if ready is not None:
+        return ready
+
+    loop = asyncio.get_running_loop()
+    calls = _async_inflight.setdefault(loop, {})
+    future = calls.get(key)
+    if future is not None:
+        return await asyncio.shield(future)
+
+    future = loop.create_future()
+    calls[key] = future
+    try:
+        result = await _fetch_and_store_async(key, req)
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        future.exception()  # 기다리는 쪽이 없어도 경고가 나지 않도록
+        raise
+    finally:
+        del calls[key]
+
+
+async def _fetch_and_store_async(key, req):
+    cached = await _cache_call(WEATHER_CACHE.peek, key)
+    if cached is not None:
+        return cached
+
+    if not await _cache_call(WEATHER_CACHE.acquire_lease, key, FETCH_LEASE_SECONDS):
+        cached = await asyncio.to_thread(WEATHER_CACHE.wait_for, key, FETCH_LEASE_SECONDS)
+        if cached is not None:
+            return cached
+
+    try:
+        result = await _load_async(req)
+        if not is_error(result):
+            await _cache_call(WEATHER_CACHE.set, key, result, _expires_at(req))
+        return result
+    finally:
+        await _cache_call(WEATHER_CACHE.release_lease, key)
+
+
+def get_cache_stats():
+    stats = WEATHER_CACHE.stats()
+    stats["single_flight"] = _inflight.stats()
+    return stats
+
+
+# 단기예보 API 공통 파라미터 (격자 좌표 + 발표시각)
+def _grid_params(codes, issued, num_rows):
+    return {
+        "serviceKey": KMA_API_KEY,  # 단기예보 API 키 사용
+        "numOfRows": num_rows,
+        "pageNo": 1,
+        "dataType": "JSON",
+        "base_date": issued.strftime("%Y%m%d"),
+        "base_time": issued.strftime("%H%M"),
+        "nx": codes.nx,
+        "ny": codes.ny
+    }
+
+
+# 중기예보 API 공통 파라미터 (구역코드 + 발표시각)
+def _mid_params(region_code, issued):
+    return {
+        "serviceKey": KMA_API_KEY,  # 중기예보 API 키 사용
+        "numOfRows": 10,
+        "pageNo": 1,
+        "dataType": "JSON",
+        "regId": region_code,
+        "tmFc": issued.strftime("%Y%m%d%H%M")
+    }
+
+
+def region_label(region):
+    """
+    응답에 표시할 지역 이름 ("위도,경도"는 가장 가까운 읍/면/동으로)
+    """
+    return resolve_region(region).name
+
+
 # ============================================
 # 1. 초단기 실황 (현재 날씨) - 단기예보 API
 # ============================================
 
-@lru_cache(maxsize=10)
-def get_current_weather(cache_key, region=DEFAULT_REGION):
+def _current_weather_request(region):
+    codes = resolve_region(region)
+    
+    # 발표시각: 매 정시 (00:00, 01:00, ...), 10분 이후 조회 가능
+    issued, next_release = get_issuance("ultra_short_now")
+    
+    return KMARequest(
+        "ultra_short_now", f"{codes.nx},{codes.ny}", issued, next_release,
+        _grid_params(codes, issued, num_rows=10),
+        lambda items: _parse_current_weather(items, codes.name, issued)
+    )
+
+
+def get_current_weather(region=DEFAULT_REGION):
     """
     현재 날씨 실황 조회
     매시간 정시에 생성, 10분마다 업데이트
     API: 단기예보 API (VilageFcstInfoService)
     """
-    try:
-        coords = SHORT_FORECAST_COORDS.get(region, DEFAULT_SHORT_COORDS)
-        now = datetime.now()
-        
-        # 발표시각: 매 정시 (00:00, 01:00, ...)
-        base_time = now.strftime("%H00")
-        base_date = now.strftime("%Y%m%d")
-        
-        params = {
-            "serviceKey": KMA_API_KEY,  # 단기예보 API 키 사용
-            "numOfRows": 10,
-            "pageNo": 1,
-            "dataType": "JSON",
-            "base_date": base_date,
-            "base_time": base_time,
-            "nx": coords["nx"],
-            "ny": coords["ny"]
-        }
-        
-        response = requests.get(ENDPOINTS["ultra_short_now"], params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        # 응답 파싱
-        if data.get("response", {}).get("header", {}).get("resultCode") == "00":
-            items = data.get("response", {}).get("body", {}).get("items", {}).get("item", [])
-            
-            weather_data = {}
-            for item in items:
-                category = item.get("category")
-                value = item.get("obsrValue")
-                
-                if category == "T1H":  # 기온
-                    weather_data["temperature"] = f"{value}°C"
-                elif category == "RN1":  # 1시간 강수량
-                    weather_data["rainfall"] = f"{value}mm"
-                elif category == "REH":  # 습도
-                    weather_data["humidity"] = f"{value}%"
-                elif category == "WSD":  # 풍속
-                    weather_data["wind_speed"] = f"{value}m/s"
-                elif category == "PTY":  # 강수형태
-                    pty_map = {
-                        "0": "없음",
-                        "1": "비",
-                        "2": "비/눈",
-                        "3": "눈",
-                        "5": "빗방울",
-                        "6": "빗방울눈날림",
-                        "7": "눈날림"
-                    }
-                    weather_data["precipitation_type"] = pty_map.get(value, "없음")
-            
-            weather_data["region"] = region
-            weather_data["update_time"] = f"{base_date} {base_time}"
-            return weather_data
-        else:
-            return {"error": "데이터를 가져올 수 없습니다"}
-            
-    except Exception as e:
-        print(f"Current Weather API Error: {e}")
-        return {
-            "temperature": "데이터 없음",
-            "humidity": "데이터 없음",
-            "note": "현재 날씨 정보를 불러올 수 없습니다."
-        }
+    return _cached_fetch(_current_weather_request(region))
+
+
+async def get_current_weather_async(region=DEFAULT_REGION):
+    return await _cached_fetch_async(_current_weather_request(region))
+
+
+def _parse_current_weather(items, region, issued):
+    """
+    기온, 강수량, 습도, 바람, 강수형태 관측값 (항목은 kma_categories 참고)
+    """
+    return Observation(
+        "ultra_short_now", region, issued.strftime("%Y%m%d%H%M"),
+        PRODUCT_CATEGORIES["ultra_short_now"]
+    ).extend(items)
 
 
 # ============================================
 # 2. 초단기 예보 (6시간 예보) - 단기예보 API
 # ============================================
 
-@lru_cache(maxsize=10)
-def get_ultra_short_forecast(cache_key, region=DEFAULT_REGION):
+def _ultra_short_forecast_request(region):
+    codes = resolve_region(region)
+    
+    # 발표시각: 매 30분 (00:30, 01:30, ...), 45분 이후 조회 가능
+    issued, next_release = get_issuance("ultra_short_fcst")
+    
+    return KMARequest(
+        "ultra_short_fcst", f"{codes.nx},{codes.ny}", issued, next_release,
+        _grid_params(codes, issued, num_rows=60),
+        lambda items: _parse_ultra_short_forecast(items, codes.name, issued)
+    )
+
+
+def get_ultra_short_forecast(region=DEFAULT_REGION):
     """
     초단기 예보 (향후 6시간)
     매시간 30분에 생성, 45분 이후 호출
     API: 단기예보 API (VilageFcstInfoService)
     """
-    try:
-        coords = SHORT_FORECAST_COORDS.get(region, DEFAULT_SHORT_COORDS)
-        now = datetime.now()
-        
-        # 발표시각: 매 30분 (00:30, 01:30, ...)
-        base_time = now.strftime("%H30")
-        base_date = now.strftime("%Y%m%d")
-        
-        params = {
-            "serviceKey": KMA_API_KEY,  # 단기예보 API 키 사용
-            "numOfRows": 60,
-            "pageNo": 1,
-            "dataType": "JSON",
-            "base_date": base_date,
-            "base_time": base_time,
-            "nx": coords["nx"],
-            "ny": coords["ny"]
-        }
-        
-        response = requests.get(ENDPOINTS["ultra_short_fcst"], params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get("response", {}).get("header", {}).get("resultCode") == "00":
-            items = data.get("response", {}).get("body", {}).get("items", {}).get("item", [])
-            
-            # 시간대별로 정리
-            forecast_by_time = {}
-            for item in items:
-                fcst_time = item.get("fcstTime")
-                category = item.get("category")
-                value = item.get("fcstValue")
-                
-                if fcst_time not in forecast_by_time:
-                    forecast_by_time[fcst_time] = {}
-                
-                if category == "T1H":
-                    forecast_by_time[fcst_time]["temp"] = f"{value}°C"
-                elif category == "SKY":
-                    sky_map = {"1": "맑음", "3": "구름많음", "4": "흐림"}
-                    forecast_by_time[fcst_time]["sky"] = sky_map.get(value, "알 수 없음")
-                elif category == "PTY":
-                    pty_map = {"0": "없음", "1": "비", "2": "비/눈", "3": "눈", "5": "빗방울", "6": "빗방울눈날림", "7": "눈날림"}
-                    forecast_by_time[fcst_time]["pty"] = pty_map.get(value, "없음")
-            
-            return {
-                "region": region,
-                "forecast": forecast_by_time
-            }
-        else:
-            return {"error": "데이터를 가져올 수 없습니다"}
-            
-    except Exception as e:
-        print(f"Ultra Short Forecast API Error: {e}")
-        return {"error": "초단기 예보를 불러올 수 없습니다."}
+    return _cached_fetch(_ultra_short_forecast_request(region))
+
+
+async def get_ultra_short_forecast_async(region=DEFAULT_REGION):
+    return await _cached_fetch_async(_ultra_short_forecast_request(region))
+
+
+def _parse_ultra_short_forecast(items, region, issued):
+    return ForecastSeries(
+        "ultra_short_fcst", region, issued.strftime("%Y%m%d%H%M"),
+        PRODUCT_CATEGORIES["ultra_short_fcst"]
+    ).extend(items)
 
 
 # ============================================
 # 3. 단기예보 (3일 예보) - 단기예보 API
 # ============================================
 
-@lru_cache(maxsize=10)
-def get_short_forecast(cache_key, region=DEFAULT_REGION):
+# 가장 긴 응답(05시 발표, 4일치 약 1100행)도 한 페이지에 들어가도록 넉넉하게
+# 그래도 넘치면 _load가 나머지 페이지를 병렬로 가져옴 (예외적인 경우만)
+SHORT_FORECAST_PAGE_SIZE = 1500
+
+
+def _short_forecast_request(region):
+    codes = resolve_region(region)
+    
+    # 조회 가능한 가장 최근 발표 시각 (발표 10분 이후)
+    issued, next_release = get_issuance("short_forecast")
+    
+    return KMARequest(
+        "short_forecast", f"{codes.nx},{codes.ny}", issued, next_release,
+        _grid_params(codes, issued, num_rows=SHORT_FORECAST_PAGE_SIZE),
+        lambda items: _parse_short_forecast(items, codes.name, issued)
+    )
+
+
+def get_short_forecast(region=DEFAULT_REGION):
     """
     단기예보 (3일)
     하루 8회 발표: 02, 05, 08, 11, 14, 17, 20, 23시
     API: 단기예보 API (VilageFcstInfoService)
     """
-    try:
-        coords = SHORT_FORECAST_COORDS.get(region, DEFAULT_SHORT_COORDS)
-        now = datetime.now()
-        
-        # 가장 최근 발표 시각 계산
-        base_times = ["0200", "0500", "0800", "1100", "1400", "1700", "2000", "2300"]
-        current_hour = now.hour
-        
-        # 적절한 base_time 찾기
-        if current_hour < 2:
-            base_time = "2300"
-            base_date = (now - timedelta(days=1)).strftime("%Y%m%d")
-        else:
-            for i, bt in enumerate(["02", "05", "08", "11", "14", "17", "20", "23"]):
-                if current_hour >= int(bt):
-                    base_time = bt + "00"
-                    base_date = now.strftime("%Y%m%d")
-        
-        params = {
-            "serviceKey": KMA_API_KEY,  # 단기예보 API 키 사용
-            "numOfRows": 100,
-            "pageNo": 1,
-            "dataType": "JSON",
-            "base_date": base_date,
-            "base_time": base_time,
-            "nx": coords["nx"],
-            "ny": coords["ny"]
-        }
-        
-        response = requests.get(ENDPOINTS["short_forecast"], params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get("response", {}).get("header", {}).get("resultCode") == "00":
-            items = data.get("response", {}).get("body", {}).get("items", {}).get("item", [])
-            
-            # 날짜별로 정리
-            daily_forecast = {}
-            for item in items:
-                fcst_date = item.get("fcstDate")
-                fcst_time = item.get("fcstTime")
-                category = item.get("category")
-                value = item.get("fcstValue")
-                
-                if fcst_date not in daily_forecast:
-                    daily_forecast[fcst_date] = {}
-                
-                if category == "TMN":  # 최저기온
-                    daily_forecast[fcst_date]["min_temp"] = f"{value}°C"
-                elif category == "TMX":  # 최고기온
-                    daily_forecast[fcst_date]["max_temp"] = f"{value}°C"
-                elif category == "POP" and "rain_prob" not in daily_forecast[fcst_date]:  # 강수확률
-                    daily_forecast[fcst_date]["rain_prob"] = f"{value}%"
-                elif category == "SKY" and "sky" not in daily_forecast[fcst_date]:
-                    sky_map = {"1": "맑음", "3": "구름많음", "4": "흐림"}
-                    daily_forecast[fcst_date]["sky"] = sky_map.get(value, "알 수 없음")
-            
-            return {
-                "region": region,
-                "daily": daily_forecast
-            }
-        else:
-            return {"error": "데이터를 가져올 수 없습니다"}
-            
-    except Exception as e:
-        print(f"Short Forecast API Error: {e}")
-        return {"error": "단기예보를 불러올 수 없습니다."}
+    return _cached_fetch(_short_forecast_request(region))
+
+
+async def get_short_forecast_async(region=DEFAULT_REGION):
+    return await _cached_fetch_async(_short_forecast_request(region))
+
+
+def _parse_short_forecast(items, region, issued):
+    """
+    단기예보 응답 전체를 한 번에 훑어서 항목별 숫자 열로 저장 (전체 14개 항목)
+    날짜별 최저/최고/강수확률/하늘상태는 ForecastSeries.daily()에서 계산
+    """
+    return ForecastSeries(
+        "short_forecast", region, issued.strftime("%Y%m%d%H%M"),
+        PRODUCT_CATEGORIES["short_forecast"]
+    ).extend(items)
 
 
 # ============================================
 # 4. 중기예보 (4-10일 예보) - 중기예보 API
 # ============================================
 
-@lru_cache(maxsize=10)
-def get_mid_forecast(cache_key, region=DEFAULT_REGION):
+def _mid_forecast_request(region):
+    codes = resolve_region(region)
+    
+    # 발표시각 계산
+    issued, next_release = get_issuance("mid_temp")
+    
+    return KMARequest(
+        "mid_temp", codes.mid_temp, issued, next_release,
+        _mid_params(codes.mid_temp, issued),
+        lambda items: _parse_mid_forecast(items, codes.name, issued)
+    )
+
+
+def get_mid_forecast(region=DEFAULT_REGION):
     """
     중기 기온 예보
     하루 2회 발표: 06시, 18시
     API: 중기예보 API (MidFcstInfoService)
     """
-    try:
-        region_code = MID_TEMP_REGIONS.get(region, DEFAULT_MID_TEMP)
-        now = datetime.now()
-        
-        # 발표시각 계산
-        if now.hour >= 18:
-            base_time = "1800"
-            base_date = now.strftime("%Y%m%d")
-        elif now.hour >= 6:
-            base_time = "0600"
-            base_date = now.strftime("%Y%m%d")
-        else:
-            base_time = "1800"
-            base_date = (now - timedelta(days=1)).strftime("%Y%m%d")
-        
-        tm_fc = f"{base_date}{base_time}"
-        
-        params = {
-            "serviceKey": KMA_API_KEY,  # 중기예보 API 키 사용
-            "numOfRows": 10,
-            "pageNo": 1,
-            "dataType": "JSON",
-            "regId": region_code,
-            "tmFc": tm_fc
-        }
-        
-        response = requests.get(ENDPOINTS["mid_temp"], params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get("response", {}).get("header", {}).get("resultCode") == "00":
-            items = data.get("response", {}).get("body", {}).get("items", {}).get("item", [])
-            
-            if items:
-                item = items[0]
-                forecast = {}
-                
-                for day in range(4, 11):  # 4일~10일
-                    forecast[f"day_{day}"] = {
-                        "min_temp": item.get(f"taMin{day}", "N/A"),
-                        "max_temp": item.get(f"taMax{day}", "N/A")
-                    }
-                
-                return {
-                    "region": region,
-                    "forecast": forecast
-                }
-        
-        return {"error": "중기예보 데이터를 가져올 수 없습니다"}
-            
-    except Exception as e:
-        print(f"Mid Forecast API Error: {e}")
-        return {"error": "중기예보를 불러올 수 없습니다."}
+    return _cached_fetch(_mid_forecast_request(region))
+
+
+async def get_mid_forecast_async(region=DEFAULT_REGION):
+    return await _cached_fetch_async(_mid_forecast_request(region))
+
+
+def _parse_mid_forecast(items, region, issued):
+    if not items:
+        return None
+    
+    item = items[0]
+    record = MidTemp("mid_temp", region, issued.strftime("%Y%m%d%H%M"))
+    
+    for i, day in enumerate(MidTemp.DAYS):  # 4일~10일
+        record.min_temps[i] = to_float(item.get(f"taMin{day}"))
+        record.max_temps[i] = to_float(item.get(f"taMax{day}"))
+    
+    return record
 
 
 # ============================================
 # 5. 중기 육상예보 (날씨 예보) - 중기예보 API
 # ============================================
 
-@lru_cache(maxsize=10)
-def get_mid_land_forecast(cache_key, region=DEFAULT_REGION):
+def _mid_land_forecast_request(region):
+    codes = resolve_region(region)
+    
+    # 발표시각 계산
+    issued, next_release = get_issuance("mid_land")
+    
+    return KMARequest(
+        "mid_land", codes.mid_land, issued, next_release,
+        _mid_params(codes.mid_land, issued),
+        lambda items: _parse_mid_land_forecast(items, codes.name, issued)
+    )
+
+
+def get_mid_land_forecast(region=DEFAULT_REGION):
     """
     중기 육상 예보 (날씨, 강수확률)
     하루 2회 발표: 06시, 18시
     API: 중기예보 API (MidFcstInfoService)
     """
-    try:
-        # 지역에 맞는 육상예보 코드 매핑
-        region_mapping = {
-            "제주": "제주",
-            "서귀포": "제주",
-            "제주시": "제주",
-            "서울": "서울_인천_경기",
-            "인천": "서울_인천_경기",
-            "경기": "서울_인천_경기",
-        }
-        
-        mapped_region = region_mapping.get(region, "제주")
-        region_code = MID_LAND_REGIONS.get(mapped_region, DEFAULT_MID_LAND)
-        
-        now = datetime.now()
-        
-        # 발표시각 계산
-        if now.hour >= 18:
-            base_time = "1800"
-            base_date = now.strftime("%Y%m%d")
-        elif now.hour >= 6:
-            base_time = "0600"
-            base_date = now.strftime("%Y%m%d")
-        else:
-            base_time = "1800"
-            base_date = (now - timedelta(days=1)).strftime("%Y%m%d")
-        
-        tm_fc = f"{base_date}{base_time}"
-        
-        params = {
-            "serviceKey": KMA_API_KEY,  # 중기예보 API 키 사용
-            "numOfRows": 10,
-            "pageNo": 1,
-            "dataType": "JSON",
-            "regId": region_code,
-            "tmFc": tm_fc
-        }
-        
-        response = requests.get(ENDPOINTS["mid_land"], params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get("response", {}).get("header", {}).get("resultCode") == "00":
-            items = data.get("response", {}).get("body", {}).get("items", {}).get("item", [])
-            
-            if items:
-                item = items[0]
-                forecast = {}
-                
-                # 4일~10일 예보
-                for day in range(4, 11):
-                    if day <= 7:
-                        forecast[f"day_{day}"] = {
-                            "am_weather": item.get(f"wf{day}Am", "N/A"),
-                            "pm_weather": item.get(f"wf{day}Pm", "N/A"),
-                            "am_rain_prob": item.get(f"rnSt{day}Am", "N/A"),
-                            "pm_rain_prob": item.get(f"rnSt{day}Pm", "N/A")
-                        }
-                    else:
-                        forecast[f"day_{day}"] = {
-                            "weather": item.get(f"wf{day}", "N/A"),
-                            "rain_prob": item.get(f"rnSt{day}", "N/A")
-                        }
-                
-                return {
-                    "region": mapped_region,
-                    "forecast": forecast
-                }
-        
-        return {"error": "중기 육상예보 데이터를 가져올 수 없습니다"}
-            
-    except Exception as e:
-        print(f"Mid Land Forecast API Error: {e}")
-        return {"error": "중기 육상예보를 불러올 수 없습니다."}
+    return _cached_fetch(_mid_land_forecast_request(region))
 
 
-# ============================================
-# 통합 함수
-# ============================================
+async def get_mid_land_forecast_async(region=DEFAULT_REGION):
+    return await _cached_fetch_async(_mid_land_forecast_request(region))
 
-def get_weather_for_context(region=DEFAULT_REGION):
-    """
-    농민 챗봇용 날씨 정보 통합
-    단기예보 API와 중기예보 API 모두 사용
-    """
-    cache_key = datetime.now().strftime("%Y%m%d%H")
-    
-    try:
-        # 단기예보 API로 현재 날씨와 3일 예보
-        current = get_current_weather(cache_key, region)
-        short = get_short_forecast(cache_key, region)
-        
-        context = f"""
-현재 {region} 날씨:
-- 기온: {current.get('temperature', 'N/A')}
-- 습도: {current.get('humidity', 'N/A')}
-- 강수: {current.get('rainfall', 'N/A')}
-- 하늘상태: {current.get('precipitation_type', 'N/A')}
 
-"""
-        
-        if short.get("daily"):
-            context += "3일 예보:\n"
-            for date, info in list(short["daily"].items())[:3]:
-                context += f"  {date}: 최저 {info.get('min_temp', 'N/A')}, 최고 {info.get('max_temp', 'N/A')}, "
-                context += f"강수확률 {info.get('rain_prob', 'N/A')}, {info.get('sky', 'N/A')}\n"
-        
-        return context.strip()
+def _parse_mid_land_forecast(items, region, issued):
+    if not items:
+        return None
     
-    except Exception as e:
-        print(f"Weather Context Error: {e}")
-        return f"{region} 날씨 정보를 가져올 수 없습니다."
+    item = items[0]
+    weather, rain_probs = [], []
+    
+    # 4일~7일은 오전/오후, 8일~10일은 하루 단위
+    for day, half in MidLand.SLOTS:
+        weather.append(item.get(f"wf{day}{half}") or "")
+        prob = item.get(f"rnSt{day}{half}")
+        rain_probs.append(-1 if prob in (None, "") else int(prob))
+    
+    return MidLand("mid_land", region, issued.strftime("%Y%m%d%H%M"), weather, rain_probs)
 
 
 # ============================================
-# 테스트 함수
+# 동시 조회 - 여러 API를 한 번에 요청
 # ============================================
 
-if __name__ == "__main__":
-    print("=== 기상청 API 테스트 ===\n")
-    print(KMA_API_KEY)
-    
-    test_region = "제주"
-    
-    print("1. 현재 날씨 (단기예보 API):")
-    current = get_current_weather(datetime.now().strftime("%Y%m%d%H"), test_region)
-    print(current)
-    print()
-    
-    print("2. 단기예보 (단기예보 API):")
-    short = get_short_forecast(datetime.now().strftime("%Y%m%d%H"), test_region)
-    print(short)
-    print()
-    
-    print("3. 중기기온 (중기예보 API):")
-    mid = get_mid_forecast(datetime.now().strftime("%Y%m%d%H"), test_region)
-    print(mid)
-    print()
-    
-    print("4. 통합 컨텍스트:")
-    context = get_weather_for_context(test_region)
-    print(context)
+# 동시 조회 전체 제한 시간 (초)
+# 개별 요청 timeout(10초)이 아니라 "가장 느린 요청" 기준으로 기다림
+FETCH_DEADLINE = float(os.getenv("KMA_FETCH_DEADLINE", "10"))
+
+# 상품 이름 -> 조회 함수 (ENDPOINTS 키와 동일한 이름 사용)
+PRODUCT_FETCHERS = {
+    "ultra_short_now": get_current_weather,
+    "ultra_short_fcst": get_ultra_short_forecast,
+    "short_forecast": get_short_forecast,
+    "mid_temp": get_mid_forecast,
+    "mid_land": get_mid_land_forecast,
+}
+
+# 비동기 버전 (asgi.py의 /ask 경로에서 사용)
+PRODUCT_FETCHERS_ASYNC = {
+    "ultra_short_now": get_current_weather_async,
+    "ultra_short_fcst": get_ultra_short_forecast_async,
+    "short_forecast": get_short_forecast_async,
+    "mid_temp": get_mid_forecast_async,
+    "mid_land": get_mid_land_forecast_async,
+}
 
+# 워커 스레드는 첫 submit 때 생성되므로 gunicorn fork 이전에 만들어도 안전
+_fetch_executor = ThreadPoolExecutor(
+    max_workers=len(PRODUCT_FETCHERS) * 2,
+    thread_name_prefix="kma-fetch"
+)
 
+# 여러 페이지 응답의 나머지 페이지용 (조회 스레드 안에서 쓰이므로 풀을 따로 둠)
+_page_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="kma-page")
 
-# ============================================
-# 2. 초단기 예보 (6시간 예보)
-# ============================================
 
-@lru_cache(maxsize=10)
-def get_ultra_short_forecast(cache_key, region=DEFAULT_REGION):
+def _collect_results(region, futures):
     """
-    초단기 예보 (향후 6시간)
-    매시간 30분에 생성, 45분 이후 호출
+    완료된 future는 결과를, 끝나지 않았거나 실패한 것은 {"error": ...}로 채움
+    (concurrent.futures / asyncio future 모두 같은 방식으로 처리)
     """
-    try:
-        coords = SHORT_FORECAST_COORDS.get(region, DEFAULT_SHORT_COORDS)
-        now = datetime.now()
-        
-        # 발표시각: 매 30분 (00:30, 01:30, ...)
-        base_time = now.strftime("%H30")
-        base_date = now.strftime("%Y%m%d")
-        
-        params = {
-            "serviceKey": KMA_API_KEY,
-            "numOfRows": 60,
-            "pageNo": 1,
-            "dataType": "JSON",
-            "base_date": base_date,
-            "base_time": base_time,
-            "nx": coords["nx"],
-            "ny": coords["ny"]
-        }
-        
-        response = requests.get(ENDPOINTS["ultra_short_fcst"], params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get("response", {}).get("header", {}).get("resultCode") == "00":
-            items = data.get("response", {}).get("body", {}).get("items", {}).get("item", [])
-            
-            # 시간대별로 정리
-            forecast_by_time = {}
-            for item in items:
-                fcst_time = item.get("fcstTime")
-                category = item.get("category")
-                value = item.get("fcstValue")
-                
-                if fcst_time not in forecast_by_time:
-                    forecast_by_time[fcst_time] = {}
-                
-                if category == "T1H":
-                    forecast_by_time[fcst_time]["temp"] = f"{value}°C"
-                elif category == "SKY":
-                    sky_map = {"1": "맑음", "3": "구름많음", "4": "흐림"}
-                    forecast_by_time[fcst_time]["sky"] = sky_map.get(value, "알 수 없음")
-                elif category == "PTY":
-                    pty_map = {"0": "없음", "1": "비", "2": "비/눈", "3": "눈", "5": "빗방울", "6": "빗방울눈날림", "7": "눈날림"}
-                    forecast_by_time[fcst_time]["pty"] = pty_map.get(value, "없음")
-            
-            return {
-                "region": region,
-                "forecast": forecast_by_time
-            }
+    results = {}
+    for name, future in futures.items():
+        if not future.done():
+            print(f"Weather fetch timeout: {name} ({region})")
+            results[name] = {"error": "기상청 응답 시간이 초과되었습니다."}
+        elif future.exception() is not None:
+            print(f"Weather fetch error: {name} ({region}): {future.exception()}")
+            results[name] = {"error": "날씨 정보를 불러올 수 없습니다."}
         else:
-            return {"error": "데이터를 가져올 수 없습니다"}
-            
-    except Exception as e:
-        print(f"Ultra Short Forecast API Error: {e}")
-        return {"error": "초단기 예보를 불러올 수 없습니다."}
-
+            results[name] = future.result()
+    return results
 
-# ============================================
-# 3. 단기예보 (3일 예보)
-# ============================================
 
-@lru_cache(maxsize=10)
-def get_short_forecast(cache_key, region=DEFAULT_REGION):
+def fetch_weather_products(region=DEFAULT_REGION, products=None, deadline=None):
     """
-    단기예보 (3일)
-    하루 8회 발표: 02, 05, 08, 11, 14, 17, 20, 23시
+    여러 기상 상품을 동시에 조회
+    모든 요청을 한 번에 보내고 전체 제한 시간(deadline)까지만 기다림
+    시간 안에 끝나지 않은 상품은 {"error": ...} 로 채워서 반환 (부분 결과 허용)
     """
-    try:
-        coords = SHORT_FORECAST_COORDS.get(region, DEFAULT_SHORT_COORDS)
-        now = datetime.now()
-        
-        # 가장 최근 발표 시각 계산
-        base_times = ["0200", "0500", "0800", "1100", "1400", "1700", "2000", "2300"]
-        current_hour = now.hour
-        
-        # 적절한 base_time 찾기
-        if current_hour < 2:
-            base_time = "2300"
-            base_date = (now - timedelta(days=1)).strftime("%Y%m%d")
-        else:
-            for i, bt in enumerate(["02", "05", "08", "11", "14", "17", "20", "23"]):
-                if current_hour >= int(bt):
-                    base_time = bt + "00"
-                    base_date = now.strftime("%Y%m%d")
-        
-        params = {
-            "serviceKey": KMA_API_KEY,
-            "numOfRows": 100,
-            "pageNo": 1,
-            "dataType": "JSON",
-            "base_date": base_date,
-            "base_time": base_time,
-            "nx": coords["nx"],
-            "ny": coords["ny"]
-        }
-        
-        response = requests.get(ENDPOINTS["short_forecast"], params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get("response", {}).get("header", {}).get("resultCode") == "00":
-            items = data.get("response", {}).get("body", {}).get("items", {}).get("item", [])
-            
-            # 날짜별로 정리
-            daily_forecast = {}
-            for item in items:
-                fcst_date = item.get("fcstDate")
-                fcst_time = item.get("fcstTime")
-                category = item.get("category")
-                value = item.get("fcstValue")
-                
-                if fcst_date not in daily_forecast:
-                    daily_forecast[fcst_date] = {}
-                
-                if category == "TMN":  # 최저기온
-                    daily_forecast[fcst_date]["min_temp"] = f"{value}°C"
-                elif category == "TMX":  # 최고기온
-                    daily_forecast[fcst_date]["max_temp"] = f"{value}°C"
-                elif category == "POP" and "rain_prob" not in daily_forecast[fcst_date]:  # 강수확률
-                    daily_forecast[fcst_date]["rain_prob"] = f"{value}%"
-                elif category == "SKY" and "sky" not in daily_forecast[fcst_date]:
-                    sky_map = {"1": "맑음", "3": "구름많음", "4": "흐림"}
-                    daily_forecast[fcst_date]["sky"] = sky_map.get(value, "알 수 없음")
-            
-            return {
-                "region": region,
-                "daily": daily_forecast
-            }
+    if products is None:
+        products = tuple(PRODUCT_FETCHERS)
+    if deadline is None:
+        deadline = FETCH_DEADLINE
+
+    # 캐시 hit / 이전 예보는 풀에 넣지 않고 바로 (풀이 밀려 있어도 제한 시간에 걸리지 않음)
+    results, futures = {}, {}
+    for name in products:
+        req = PRODUCT_REQUESTS[name](region)
+        ready = _ready_value(_cache_key(req), req)
+        if ready is not None:
+            results[name] = ready
         else:
-            return {"error": "데이터를 가져올 수 없습니다"}
-            
-    except Exception as e:
-        print(f"Short Forecast API Error: {e}")
-        return {"error": "단기예보를 불러올 수 없습니다."}
+            futures[name] = _fetch_executor.submit(_cached_fetch, req)
+
+    # 늦게 끝난 요청도 백그라운드에서 계속 진행되어 캐시를 채움
+    if futures:
+        wait(futures.values(), timeout=deadline)
+        results.update(_collect_results(region, futures))
+    return {name: results[name] for name in products}
+
+
+# 상품 이름 -> 요청 생성 함수 (여러 지역 조회 시 캐시 키 계산용)
+PRODUCT_REQUESTS = {
+    "ultra_short_now": _current_weather_request,
+    "ultra_short_fcst": _ultra_short_forecast_request,
+    "short_forecast": _short_forecast_request,
+    "mid_temp": _mid_forecast_request,
+    "mid_land": _mid_land_forecast_request,
+}
+
+
+def fetch_weather_batch(regions, products=None, deadline=None):
+    """
+    여러 지역 x 여러 상품을 한 번에 조회 (대시보드용)
+    캐시 키(상품, 지역코드, 발표시각)가 같은 조회는 하나로 합침
+    -> 격자나 중기 구역코드를 공유하는 지역은 기상청 요청도 한 번
+    반환: ({지역: {상품: 결과}}, 실제로 조회한 고유 키 수)
+    """
+    if products is None:
+        products = tuple(PRODUCT_REQUESTS)
+    if deadline is None:
+        deadline = FETCH_DEADLINE
+
+    keys = {}  # (지역, 상품) -> 캐시 키
+    ready = {}  # 캐시 키 -> 바로 줄 수 있는 값
+    futures = {}  # 캐시 키 -> future
+    for region in regions:
+        for product in products:
+            req = PRODUCT_REQUESTS[product](region)
+            key = _cache_key(req)
+            keys[region, product] = key
+            if key in ready or key in futures:
+                continue
+            value = _ready_value(key, req)
+            if value is not None:
+                ready[key] = value
+            else:
+                futures[key] = _fetch_executor.submit(_cached_fetch, req)
+
+    if futures:
+        wait(futures.values(), timeout=deadline)
+    collected = dict(ready)
+    collected.update(_collect_results("batch", futures))
+
+    results = {region: {} for region in regions}
+    for (region, product), key in keys.items():
+        results[region][product] = collected[key]
+    return results, len(ready) + len(futures)
+
+
+async def fetch_weather_products_async(region=DEFAULT_REGION, products=None, deadline=None):
+    """
+    fetch_weather_products의 asyncio 버전
+    스레드 없이 이벤트 루프 하나에서 모든 요청을 동시에 처리
+    """
+    if products is None:
+        products = tuple(PRODUCT_FETCHERS_ASYNC)
+    if deadline is None:
+        deadline = FETCH_DEADLINE
+
+    futures = {
+        name: asyncio.ensure_future(PRODUCT_FETCHERS_ASYNC[name](region))
+        for name in products
+    }
+
+    # 제한 시간이 지나도 취소하지 않음 -> 끝나면 캐시를 채움
+    await asyncio.wait(futures.values(), timeout=deadline)
+    return _collect_results(region, futures)
 
 
 # ============================================
-# 4. 중기예보 (4-10일 예보)
+# 통합 함수
 # ============================================
 
-@lru_cache(maxsize=10)
-def get_mid_forecast(cache_key, region=DEFAULT_REGION):
+def stale_note(data):
     """
-    중기 기온 예보
-    하루 2회 발표: 06시, 18시
+    이전 발표분을 대신 보여주는 경우 붙일 안내 문구
+    발표 시각으로 적음 -> 같은 이전 발표분이면 문구가 같아서 답변 캐시 키가 매분 바뀌지 않음
     """
-    try:
-        region_code = MID_TEMP_REGIONS.get(region, DEFAULT_MID_TEMP)
-        now = datetime.now()
-        
-        # 발표시각 계산
-        if now.hour >= 18:
-            base_time = "1800"
-            base_date = now.strftime("%Y%m%d")
-        elif now.hour >= 6:
-            base_time = "0600"
-            base_date = now.strftime("%Y%m%d")
-        else:
-            base_time = "1800"
-            base_date = (now - timedelta(days=1)).strftime("%Y%m%d")
-        
-        tm_fc = f"{base_date}{base_time}"
-        
-        params = {
-            "serviceKey": KMA_API_KEY,
-            "numOfRows": 10,
-            "pageNo": 1,
-            "dataType": "JSON",
-            "regId": region_code,
-            "tmFc": tm_fc
-        }
-        
-        response = requests.get(ENDPOINTS["mid_temp"], params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get("response", {}).get("header", {}).get("resultCode") == "00":
-            items = data.get("response", {}).get("body", {}).get("items", {}).get("item", [])
-            
-            if items:
-                item = items[0]
-                forecast = {}
-                
-                for day in range(4, 11):  # 4일~10일
-                    forecast[f"day_{day}"] = {
-                        "min_temp": item.get(f"taMin{day}", "N/A"),
-                        "max_temp": item.get(f"taMax{day}", "N/A")
-                    }
-                
-                return {
-                    "region": region,
-                    "forecast": forecast
-                }
-        
-        return {"error": "중기예보 데이터를 가져올 수 없습니다"}
-            
-    except Exception as e:
-        print(f"Mid Forecast API Error: {e}")
-        return {"error": "중기예보를 불러올 수 없습니다."}
+    if not getattr(data, "stale", False):
+        return ""
+    issued = datetime.strptime(data.stale_issuance, "%Y%m%d%H%M")
+    return f" (기상청 지연으로 {issued.month}월 {issued.day}일 {issued.hour}시 {issued.minute:02d}분 발표 자료)"
 
 
-# ============================================
-# 5. 중기 육상예보 (날씨 예보)
-# ============================================
+def _region_prefix(region):
+    # 섹션을 따로 보낼 때 제목 앞에 붙일 지역 이름
+    return f"{region_label(region)} " if region is not None else ""
+
 
-@lru_cache(maxsize=10)
-def get_mid_land_forecast(cache_key, region=DEFAULT_REGION):
+def format_ultra_short_context(forecast, region=None):
     """
-    중기 육상 예보 (날씨, 강수확률)
-    하루 2회 발표: 06시, 18시
+    초단기 예보(향후 6시간)를 LLM 컨텍스트 문자열로 변환
+    방제/수확 작업 판단에 필요한 강수, 바람 위주
     """
-    try:
-        # 지역에 맞는 육상예보 코드 매핑
-        region_mapping = {
-            "제주": "제주",
-            "서귀포": "제주",
-            "제주시": "제주",
-            "서울": "서울_인천_경기",
-            "인천": "서울_인천_경기",
-            "경기": "서울_인천_경기",
-        }
-        
-        mapped_region = region_mapping.get(region, "제주")
-        region_code = MID_LAND_REGIONS.get(mapped_region, DEFAULT_MID_LAND)
-        
-        now = datetime.now()
-        
-        # 발표시각 계산
-        if now.hour >= 18:
-            base_time = "1800"
-            base_date = now.strftime("%Y%m%d")
-        elif now.hour >= 6:
-            base_time = "0600"
-            base_date = now.strftime("%Y%m%d")
-        else:
-            base_time = "1800"
-            base_date = (now - timedelta(days=1)).strftime("%Y%m%d")
-        
-        tm_fc = f"{base_date}{base_time}"
-        
-        params = {
-            "serviceKey": KMA_API_KEY,
-            "numOfRows": 10,
-            "pageNo": 1,
-            "dataType": "JSON",
-            "regId": region_code,
-            "tmFc": tm_fc
-        }
-        
-        response = requests.get(ENDPOINTS["mid_land"], params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if data.get("response", {}).get("header", {}).get("resultCode") == "00":
-            items = data.get("response", {}).get("body", {}).get("items", {}).get("item", [])
-            
-            if items:
-                item = items[0]
-                forecast = {}
-                
-                # 4일~10일 예보
-                for day in range(4, 11):
-                    if day <= 7:
-                        forecast[f"day_{day}"] = {
-                            "am_weather": item.get(f"wf{day}Am", "N/A"),
-                            "pm_weather": item.get(f"wf{day}Pm", "N/A"),
-                            "am_rain_prob": item.get(f"rnSt{day}Am", "N/A"),
-                            "pm_rain_prob": item.get(f"rnSt{day}Pm", "N/A")
-                        }
-                    else:
-                        forecast[f"day_{day}"] = {
-                            "weather": item.get(f"wf{day}", "N/A"),
-                            "rain_prob": item.get(f"rnSt{day}", "N/A")
-                        }
-                
-                return {
-                    "region": mapped_region,
-                    "forecast": forecast
-                }
-        
-        return {"error": "중기 육상예보 데이터를 가져올 수 없습니다"}
-            
-    except Exception as e:
-        print(f"Mid Land Forecast API Error: {e}")
-        return {"error": "중기 육상예보를 불러올 수 없습니다."}
+    if not forecast or is_error(forecast) or not len(forecast):
+        return ""
+    
+    context = f"{_region_prefix(region)}향후 6시간 예보{stale_note(forecast)}:\n"
+    for time_key, values in forecast.rows():
+        pty = values.get("PTY", 0)
+        weather = pty_label(pty) if pty > 0 else sky_label(values.get("SKY"))
+        rain = values.get("RN1")
+        rain = precipitation_label(rain) if rain == 0 else f"강수 {precipitation_label(rain)}"
+        context += f"  {time_key % 100:02d}시: {format_number(values.get('T1H'), '°C')}, {weather}, "
+        context += f"{rain}, 습도 {format_number(values.get('REH'), '%')}, "
+        context += f"풍속 {format_number(values.get('WSD'), 'm/s')}\n"
+    return context
+
+
+def format_current_context(region, current):
+    """
+    현재 날씨(초단기실황)를 LLM 컨텍스트 문자열로 변환
+    """
+    if not current:
+        return ""
+    region = region_label(region)
+    if is_error(current):
+        return f"현재 {region} 날씨: {current['error']}"
+    return f"""현재 {region} 날씨{stale_note(current)}:
+- 기온: {format_number(current.get("T1H"), "°C")}
+- 습도: {format_number(current.get("REH"), "%")}
+- 강수: {precipitation_label(current.get("RN1"))}
+- 하늘상태: {pty_label(current.get("PTY"))}"""
+
+
+def format_short_context(short, region=None):
+    """
+    단기예보 3일치(날짜별 최저/최고/강수확률/하늘)를 LLM 컨텍스트 문자열로 변환
+    """
+    daily = {} if not short or is_error(short) else short.daily()
+    if not daily:
+        return ""
+    context = f"{_region_prefix(region)}3일 예보{stale_note(short)}:\n"
+    for date, info in list(daily.items())[:3]:
+        context += f"  {date}: 최저 {format_number(info.get('min_temp'), '°C')}, "
+        context += f"최고 {format_number(info.get('max_temp'), '°C')}, "
+        context += f"강수확률 {format_number(info.get('rain_prob'), '%')}, {sky_label(info.get('sky'))}\n"
+    return context
+
+
+def format_weather_context(region, current, short, ultra_short=None):
+    """
+    현재 날씨 + 6시간 예보 + 3일 예보를 LLM 컨텍스트 문자열로 변환
+    (숫자 -> 문자열 변환은 여기서만)
+    """
+    parts = (
+        format_current_context(region, current),
+        format_ultra_short_context(ultra_short),
+        format_short_context(short),
+    )
+    return "\n\n".join(part.strip() for part in parts if part)
 
 
-# ============================================
-# 통합 함수
-# ============================================
+def format_mid_context(mid_temp, mid_land, region=None):
+    """
+    중기 기온 + 육상예보(4-10일)를 LLM 컨텍스트 문자열로 변환
+    기온 예보가 없으면 빈 문자열
+    """
+    if not mid_temp or is_error(mid_temp):
+        return ""
+    
+    context = f"\n=== {_region_prefix(region)}중기예보 (4-10일 후){stale_note(mid_temp)} ===\n"
+    for day, low, high in mid_temp.days():
+        context += f"{day}일 후: 최저 {format_number(low, '°C')}, 최고 {format_number(high, '°C')}\n"
+    
+    # 중기 육상예보 추가
+    if mid_land and not is_error(mid_land):
+        labels = {"Am": " 오전", "Pm": " 오후", "": ""}
+        for day, periods in mid_land.by_day():
+            for half, weather, prob in periods:
+                context += f"  - {day}일 후{labels[half]}: {weather or 'N/A'} (강수확률 {format_number(prob, '%')})\n"
+    
+    return context
+
 
 def get_weather_for_context(region=DEFAULT_REGION):
     """
     농민 챗봇용 날씨 정보 통합
+    현재 날씨와 단기예보를 동시에 조회
     """
-    cache_key = datetime.now().strftime("%Y%m%d%H")
-    
     try:
-        current = get_current_weather(cache_key, region)
-        short = get_short_forecast(cache_key, region)
-        
-        context = f"""
-현재 {region} 날씨:
-- 기온: {current.get('temperature', 'N/A')}
-- 습도: {current.get('humidity', 'N/A')}
-- 강수: {current.get('rainfall', 'N/A')}
-- 하늘상태: {current.get('precipitation_type', 'N/A')}
-
-"""
-        
-        if short.get("daily"):
-            context += "3일 예보:\n"
-            for date, info in list(short["daily"].items())[:3]:
-                context += f"  {date}: 최저 {info.get('min_temp', 'N/A')}, 최고 {info.get('max_temp', 'N/A')}, "
-                context += f"강수확률 {info.get('rain_prob', 'N/A')}, {info.get('sky', 'N/A')}\n"
-        
-        return context.strip()
+        weather = fetch_weather_products(region, ("ultra_short_now", "ultra_short_fcst", "short_forecast"))
+        return format_weather_context(
+            region, weather["ultra_short_now"], weather["short_forecast"], weather["ultra_short_fcst"]
+        )
     
     except Exception as e:
         print(f"Weather Context Error: {e}")
@@ -847,19 +923,25 @@ def get_weather_for_context(region=DEFAULT_REGION):
 
 if __name__ == "__main__":
     print("=== 기상청 API 테스트 ===\n")
+    print(KMA_API_KEY)
     
     test_region = "제주"
     
-    print("1. 현재 날씨:")
-    current = get_current_weather(datetime.now().strftime("%Y%m%d%H"), test_region)
-    print(current)
+    print("1. 현재 날씨 (단기예보 API):")
+    current = get_current_weather(test_region)
+    print(current if is_error(current) else current.to_dict())
+    print()
+    
+    print("2. 단기예보 (단기예보 API):")
+    short = get_short_forecast(test_region)
+    print(short if is_error(short) else short.to_dict())
     print()
     
-    print("2. 단기예보:")
-    short = get_short_forecast(datetime.now().strftime("%Y%m%d%H"), test_region)
-    print(short)
+    print("3. 중기기온 (중기예보 API):")
+    mid = get_mid_forecast(test_region)
+    print(mid if is_error(mid) else mid.to_dict())
     print()
     
-    print("3. 통합 컨텍스트:")
+    print("4. 통합 컨텍스트:")
     context = get_weather_for_context(test_region)
-    print(context)
\ No newline at end of file
+    print(context)
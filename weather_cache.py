@@ -0,0 +1,407 @@
+"""
+기상 데이터 캐시
+(상품, 지역코드, 발표시각) 키로 저장하고 다음 발표 시각에 만료
+
+- WeatherCache: 프로세스 내부 메모리 캐시 (기본)
+- SQLiteWeatherCache: 같은 서버의 gunicorn 워커들이 공유하는 파일 캐시
+  (WEATHER_CACHE_DB 환경변수로 경로 지정 시 사용)
+- SingleFlight: 같은 키의 동시 조회를 기상청 요청 하나로 합침
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class WeatherCache:
+    """
+    발표시각 기반 TTL 캐시
+    - 항목마다 만료 시각(expires_at, epoch 초)을 따로 가짐
+    - 최대 개수를 넘으면 가장 오래 안 쓴 항목부터 제거 (LRU)
+    - hit/miss/eviction 통계 제공
+    - (상품, 지역코드)별 마지막 성공 응답은 만료와 상관없이 따로 보관
+      (기상청 장애/지연 시 이전 예보를 대신 제공하기 위함)
+    """
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._last_good = {}  # (상품, 지역코드) -> 마지막 성공 응답 정보
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, count=True):
+        """
+        count=False: hit/miss 통계에 넣지 않음 (peek)
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                self.expirations += 1
+                if count:
+                    self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            if count:
+                self.hits += 1
+            return value
+
+    def peek(self, key):
+        """
+        통계를 세지 않는 조회
+        이미 get()으로 miss를 센 요청이 single-flight/lease 안에서 다시 확인할 때 사용
+        (한 번의 조회가 miss 여러 번으로 잡히지 않도록)
+        """
+        return self.get(key, count=False)
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+            self._remember(key, value, expires_at, time.time())
+
+    def _remember(self, key, value, expires_at, fetched_at):
+        # key = (상품, 지역코드, 발표시각) -> 같은 상품/지역의 최신 발표분만 보관
+        base_key, issuance = key[:-1], key[-1]
+        previous = self._last_good.get(base_key)
+        if previous is None or previous["issuance"] <= issuance:
+            self._last_good[base_key] = {
+                "value": value,
+                "issuance": issuance,
+                "fetched_at": fetched_at,
+                "expires_at": expires_at,
+            }
+
+    def last_good(self, base_key):
+        """
+        (상품, 지역코드)의 마지막 성공 응답 (만료된 것 포함)
+        """
+        with self._lock:
+            return self._last_good.get(base_key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._last_good.clear()
+
+    # 프로세스 하나만 쓰는 캐시이므로 워커 간 조율은 필요 없음
+    def acquire_lease(self, key, ttl):
+        return True
+
+    def release_lease(self, key):
+        pass
+
+    def wait_for(self, key, timeout):
+        return self.peek(key)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+class SQLiteWeatherCache:
+    """
+    워커 간 공유 캐시 (SQLite WAL 모드)
+    - 파싱된 예보 레코드를 pickle로 저장 -> 워커가 재시작돼도 바로 사용 가능
+      (이 서버의 워커들만 쓰는 파일이므로 pickle 사용)
+    - 앞단에 메모리 캐시를 두어 같은 워커의 반복 조회는 디스크를 안 거침
+    - lease 테이블로 "발표 회차당 한 워커만 기상청 호출" 보장
+    """
+
+    # 만료된 행 정리 주기 (set 횟수 기준)
+    PURGE_EVERY = 100
+
+    def __init__(self, path, maxsize=512):
+        self.path = path
+        self._memory = WeatherCache(maxsize=maxsize)
+        self._local = threading.local()
+        self._sets = 0
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.purged = 0
+        self._init_db()
+
+    def _connect(self):
+        # sqlite 연결은 스레드/프로세스 사이에 공유하면 안 되므로 (pid, 스레드)별로 생성
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS weather_cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS last_good (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                issuance TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS fetch_leases (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+
+    @staticmethod
+    def _key(key):
+        return "|".join(str(part) for part in key)
+
+    @staticmethod
+    def _encode(value):
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(blob):
+        # 예전 형식(JSON)이나 깨진 행은 캐시에 없는 것으로 처리
+        try:
+            return pickle.loads(blob)
+        except Exception:
+            return None
+
+    def _owner(self):
+        return f"{os.getpid()}:{threading.get_ident()}"
+
+    def get(self, key, count=True):
+        value = self._memory.get(key, count)
+        if value is not None:
+            return value
+
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM weather_cache WHERE key = ? AND expires_at > ?",
+            (self._key(key), time.time())
+        ).fetchone()
+        value = None if row is None else self._decode(row[0])
+        if value is None:
+            if count:
+                self.disk_misses += 1
+            return None
+
+        if count:
+            self.disk_hits += 1
+        self._memory.set(key, value, row[1])
+        return value
+
+    def peek(self, key):
+        """
+        통계를 세지 않는 조회 (WeatherCache.peek 참고)
+        """
+        return self.get(key, count=False)
+
+    def set(self, key, value, expires_at):
+        self._memory.set(key, value, expires_at)
+        encoded = self._encode(value)
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO weather_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (self._key(key), encoded, expires_at)
+        )
+        # 더 최신 발표분이 이미 저장돼 있으면 덮어쓰지 않음
+        conn.execute(
+            """
+            INSERT INTO last_good (key, value, issuance, fetched_at, expires_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                value = excluded.value,
+                issuance = excluded.issuance,
+                fetched_at = excluded.fetched_at,
+                expires_at = excluded.expires_at
+            WHERE excluded.issuance >= last_good.issuance
+            """,
+            (self._key(key[:-1]), encoded, key[-1], time.time(), expires_at)
+        )
+
+        self._sets += 1
+        if self._sets % self.PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def purge_expired(self):
+        now = time.time()
+        conn = self._connect()
+        cur = conn.execute("DELETE FROM weather_cache WHERE expires_at <= ?", (now,))
+        conn.execute("DELETE FROM fetch_leases WHERE expires_at <= ?", (now,))
+        self.purged += cur.rowcount
+
+    def last_good(self, base_key):
+        """
+        (상품, 지역코드)의 마지막 성공 응답 (다른 워커가 저장한 것 포함)
+        """
+        row = self._connect().execute(
+            "SELECT value, issuance, fetched_at, expires_at FROM last_good WHERE key = ?",
+            (self._key(base_key),)
+        ).fetchone()
+        value = None if row is None else self._decode(row[0])
+        if value is None:
+            return self._memory.last_good(base_key)
+        return {
+            "value": value,
+            "issuance": row[1],
+            "fetched_at": row[2],
+            "expires_at": row[3],
+        }
+
+    def clear(self):
+        self._memory.clear()
+        conn = self._connect()
+        conn.execute("DELETE FROM weather_cache")
+        conn.execute("DELETE FROM last_good")
+        conn.execute("DELETE FROM fetch_leases")
+
+    def acquire_lease(self, key, ttl):
+        """
+        key에 대한 조회 권한 획득 시도
+        다른 워커가 이미 조회 중이면 False (만료된 lease는 가로챔)
+        """
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM fetch_leases WHERE key = ? AND expires_at <= ?",
+                (self._key(key), now)
+            )
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO fetch_leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (self._key(key), self._owner(), now + ttl)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cur.rowcount == 1
+
+    def release_lease(self, key):
+        self._connect().execute(
+            "DELETE FROM fetch_leases WHERE key = ? AND owner = ?",
+            (self._key(key), self._owner())
+        )
+
+    def wait_for(self, key, timeout, interval=0.1):
+        """
+        다른 워커가 조회를 끝낼 때까지 대기
+        lease가 사라졌는데 값이 없으면 (조회 실패) None 반환
+        """
+        deadline = time.time() + timeout
+        conn = self._connect()
+        while time.time() < deadline:
+            value = self.peek(key)
+            if value is not None:
+                return value
+
+            leased = conn.execute(
+                "SELECT 1 FROM fetch_leases WHERE key = ? AND expires_at > ?",
+                (self._key(key), time.time())
+            ).fetchone()
+            if leased is None:
+                return None
+            time.sleep(interval)
+        return None
+
+    def stats(self):
+        stats = self._memory.stats()
+        row = self._connect().execute(
+            "SELECT COUNT(*) FROM weather_cache WHERE expires_at > ?", (time.time(),)
+        ).fetchone()
+        stats.update({
+            "backend": "sqlite",
+            "path": self.path,
+            "disk_size": row[0],
+            "disk_hits": self.disk_hits,
+            "disk_misses": self.disk_misses,
+            "purged": self.purged,
+        })
+        return stats
+
+
+class SingleFlight:
+    """
+    같은 key로 동시에 들어온 호출을 하나로 합침 (single-flight)
+    먼저 들어온 호출(leader)만 fn()을 실행하고
+    나머지는 그 결과(또는 예외)를 함께 받음
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is None:
+                future = Future()
+                self._calls[key] = future
+                self.leaders += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+            }
@@ -87,10 +87,128 @@ SHORT_FORECAST_COORDS = {
     "광주": {"nx": 58, "ny": 74},
     "대전": {"nx": 67, "ny": 100},
     "울산": {"nx": 102, "ny": 84},
+    # 중기기온 예보 도시
+    "수원": {"nx": 60, "ny": 121},
+    "파주": {"nx": 56, "ny": 131},
+    "춘천": {"nx": 73, "ny": 134},
+    "원주": {"nx": 76, "ny": 122},
+    "강릉": {"nx": 92, "ny": 131},
+    "서산": {"nx": 51, "ny": 110},
+    "세종": {"nx": 66, "ny": 103},
+    "청주": {"nx": 69, "ny": 106},
+    "목포": {"nx": 50, "ny": 67},
+    "여수": {"nx": 73, "ny": 66},
+    "전주": {"nx": 63, "ny": 89},
+    "군산": {"nx": 56, "ny": 92},
+    "창원": {"nx": 90, "ny": 77},
+    "안동": {"nx": 91, "ny": 106},
+    "포항": {"nx": 102, "ny": 94},
     # 여기에 더 많은 지역 좌표를 추가하세요
     # 실제 좌표는 기상청 제공 엑셀 파일에서 확인
 }
 
+# 지역 -> 중기 예보구역 (중기기온 구역, 중기육상 구역, 중기예보 지점 구역)
+# 키는 SHORT_FORECAST_COORDS의 지역 이름
+MID_REGION_BY_CITY = {
+    "제주시": ("제주", "제주", "제주도"),
+    "서귀포시": ("서귀포", "제주", "제주도"),
+    "서울": ("서울", "서울_인천_경기", "서울_인천_경기"),
+    "인천": ("인천", "서울_인천_경기", "서울_인천_경기"),
+    "수원": ("수원", "서울_인천_경기", "서울_인천_경기"),
+    "파주": ("파주", "서울_인천_경기", "서울_인천_경기"),
+    "춘천": ("춘천", "강원영서", "강원도"),
+    "원주": ("원주", "강원영서", "강원도"),
+    "강릉": ("강릉", "강원영동", "강원도"),
+    "대전": ("대전", "대전_세종_충남", "대전_세종_충청남도"),
+    "서산": ("서산", "대전_세종_충남", "대전_세종_충청남도"),
+    "세종": ("세종", "대전_세종_충남", "대전_세종_충청남도"),
+    "청주": ("청주", "충북", "충청북도"),
+    "광주": ("광주", "광주_전남", "광주_전남"),
+    "목포": ("목포", "광주_전남", "광주_전남"),
+    "여수": ("여수", "광주_전남", "광주_전남"),
+    "전주": ("전주", "전북", "전북"),
+    "군산": ("군산", "전북", "전북"),
+    "부산": ("부산", "부산_울산_경남", "부산_울산_경남"),
+    "울산": ("울산", "부산_울산_경남", "부산_울산_경남"),
+    "창원": ("창원", "부산_울산_경남", "부산_울산_경남"),
+    "대구": ("대구", "대구_경북", "대구_경북"),
+    "안동": ("안동", "대구_경북", "대구_경북"),
+    "포항": ("포항", "대구_경북", "대구_경북"),
+}
+
+# 다른 이름 -> SHORT_FORECAST_COORDS의 지역 이름
+REGION_ALIASES = {
+    "제주": "제주시",
+    "제주도": "제주시",
+    "제주특별자치도": "제주시",
+    "서귀포": "서귀포시",
+    "서울시": "서울",
+    "서울특별시": "서울",
+    "부산시": "부산",
+    "부산광역시": "부산",
+    "대구시": "대구",
+    "대구광역시": "대구",
+    "인천시": "인천",
+    "인천광역시": "인천",
+    "광주시": "광주",
+    "광주광역시": "광주",
+    "대전시": "대전",
+    "대전광역시": "대전",
+    "울산시": "울산",
+    "울산광역시": "울산",
+    "세종시": "세종",
+}
+
+# 제주 읍/면/동 위치 (행정복지센터 기준 위도, 경도)
+# 격자 좌표(nx, ny)는 kma_grid.py가 시작할 때 한 번 계산함
+JEJU_EMD_COORDS = {
+    # 제주시
+    "한림읍": ("제주시", 33.4114, 126.2694),
+    "애월읍": ("제주시", 33.4633, 126.3306),
+    "구좌읍": ("제주시", 33.5225, 126.8586),
+    "조천읍": ("제주시", 33.5389, 126.6339),
+    "한경면": ("제주시", 33.3478, 126.1792),
+    "추자면": ("제주시", 33.9561, 126.2989),
+    "우도면": ("제주시", 33.5044, 126.9531),
+    "일도1동": ("제주시", 33.5128, 126.5278),
+    "일도2동": ("제주시", 33.5089, 126.5389),
+    "이도1동": ("제주시", 33.5083, 126.5236),
+    "이도2동": ("제주시", 33.4992, 126.5358),
+    "삼도1동": ("제주시", 33.5033, 126.5161),
+    "삼도2동": ("제주시", 33.5117, 126.5203),
+    "용담1동": ("제주시", 33.5103, 126.5125),
+    "용담2동": ("제주시", 33.5067, 126.4975),
+    "건입동": ("제주시", 33.5150, 126.5347),
+    "화북동": ("제주시", 33.5211, 126.5692),
+    "삼양동": ("제주시", 33.5222, 126.5861),
+    "봉개동": ("제주시", 33.4847, 126.6033),
+    "아라동": ("제주시", 33.4794, 126.5461),
+    "오라동": ("제주시", 33.4953, 126.5086),
+    "연동": ("제주시", 33.4889, 126.4917),
+    "노형동": ("제주시", 33.4839, 126.4783),
+    "외도동": ("제주시", 33.4908, 126.4331),
+    "이호동": ("제주시", 33.4972, 126.4553),
+    "도두동": ("제주시", 33.5061, 126.4656),
+    # 서귀포시
+    "대정읍": ("서귀포시", 33.2256, 126.2511),
+    "남원읍": ("서귀포시", 33.2800, 126.7189),
+    "성산읍": ("서귀포시", 33.3861, 126.8800),
+    "안덕면": ("서귀포시", 33.2497, 126.3233),
+    "표선면": ("서귀포시", 33.3261, 126.8300),
+    "송산동": ("서귀포시", 33.2472, 126.5669),
+    "정방동": ("서귀포시", 33.2453, 126.5661),
+    "중앙동": ("서귀포시", 33.2500, 126.5628),
+    "천지동": ("서귀포시", 33.2461, 126.5592),
+    "효돈동": ("서귀포시", 33.2631, 126.6142),
+    "영천동": ("서귀포시", 33.2644, 126.5836),
+    "동홍동": ("서귀포시", 33.2589, 126.5719),
+    "서홍동": ("서귀포시", 33.2558, 126.5517),
+    "대륜동": ("서귀포시", 33.2467, 126.5311),
+    "대천동": ("서귀포시", 33.2508, 126.5033),
+    "중문동": ("서귀포시", 33.2506, 126.4297),
+    "예래동": ("서귀포시", 33.2406, 126.3969),
+}
+
 # 기본 지역 설정 (제주도)
 DEFAULT_REGION = "제주"
 DEFAULT_MID_FORECAST = "184"
@@ -0,0 +1,207 @@
+"""
+기상 데이터 미리 가져오기 (prefetch)
+기상청 발표 직후에 모든 지역의 예보를 캐시에 채워서
+사용자 요청이 기상청 응답을 기다리지 않도록 함
+
+사용 방법:
+1. 앱 프로세스 안에서 실행: export WEATHER_PREFETCH=1
+   (import할 때가 아니라 시작 지점에서 켬: gunicorn은 gunicorn.conf.py의 post_fork,
+    asgi.py는 lifespan startup, 개발 서버는 python app.py)
+2. 별도 프로세스로 실행:  python weather_prefetch.py
+   (gunicorn 워커가 여러 개라면 WEATHER_CACHE_DB 공유 캐시와 함께 2번 권장)
+어느 쪽이든 잠금 파일(WEATHER_PREFETCH_LOCK)을 잡은 프로세스 하나만 prefetch 함
+"""
+
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from kma_schedule import get_issuance, next_refresh
+from weather_api import (
+    PRODUCT_REQUESTS,
+    DEFAULT_REGION,
+    _cache_key,
+    _fetch_and_store,
+    _inflight
+)
+from region_registry import REGIONS
+from weather_records import is_error
+
+# 조회 가능 시각 이후 몇 초 뒤에 가져올지
+# 상품별 반영 지연은 kma_schedule에 이미 들어 있으므로 시계 오차 정도만
+PREFETCH_DELAY = int(os.getenv("WEATHER_PREFETCH_DELAY", "15"))
+
+# 앱 프로세스 안에서 prefetch 스레드를 켤지
+WEATHER_PREFETCH_ENABLED = os.getenv("WEATHER_PREFETCH") == "1"
+
+# 여러 워커/프로세스 중 하나만 prefetch 하도록 잡는 잠금 파일
+PREFETCH_LOCK_PATH = os.getenv(
+    "WEATHER_PREFETCH_LOCK",
+    os.path.join(tempfile.gettempdir(), "jeju_weather_prefetch.lock"),
+)
+
+# 미리 가져올 상품
+PREFETCH_PRODUCTS = ("ultra_short_now", "ultra_short_fcst", "short_forecast", "mid_temp", "mid_land")
+
+# prefetch 전용 풀 (기상청이 느려서 prefetch가 밀려도 사용자 요청용 풀은 그대로)
+_prefetch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="kma-prefetch")
+
+
+def get_prefetch_regions():
+    """
+    미리 가져올 지역 목록
+    PREFETCH_REGIONS 환경변수(쉼표 구분)가 있으면 그 목록 사용
+    """
+    configured = os.getenv("PREFETCH_REGIONS")
+    if configured:
+        return [r.strip() for r in configured.split(",") if r.strip()]
+
+    # "제주"와 "제주시"처럼 코드가 같은 지역은 한 번만
+    regions, seen = [], set()
+    for region in [DEFAULT_REGION, *REGIONS.cities]:
+        codes = REGIONS.resolve(region)
+        key = (codes.nx, codes.ny, codes.mid_temp, codes.mid_land)
+        if key not in seen:
+            seen.add(key)
+            regions.append(region)
+    return regions
+
+
+def _prefetch_one(product, region):
+    # 이전 예보로 대신하지 않음 -> 기상청 조회가 실패하면 그대로 실패로 보고 (RETRY_INTERVAL 후 재시도)
+    req = PRODUCT_REQUESTS[product](region)
+    key = _cache_key(req)
+    return _inflight.do(key, lambda: _fetch_and_store(key, req))
+
+
+def prefetch_product(product, regions):
+    """
+    한 상품을 모든 지역에 대해 동시에 조회해서 캐시에 저장
+    이미 캐시에 있는 (지역코드, 발표시각)은 기상청을 호출하지 않음
+    """
+    futures = {region: _prefetch_executor.submit(_prefetch_one, product, region) for region in regions}
+
+    failed = []
+    for region, future in futures.items():
+        try:
+            result = future.result()
+            if is_error(result):
+                failed.append(region)
+        except Exception as e:
+            print(f"Prefetch Error: {product} ({region}): {e}")
+            failed.append(region)
+
+    if failed:
+        print(f"Prefetch {product}: 실패 {len(failed)}/{len(regions)} ({', '.join(failed)})")
+    return failed
+
+
+def next_prefetch_time(product, now=None):
+    """
+    다음 발표가 조회 가능해지는 시각 + 지연 시간
+    (초단기 예보처럼 새로고침 주기가 더 짧은 상품은 그 주기에 맞춰서)
+    """
+    now = now or datetime.now()
+    _, next_release = get_issuance(product, now)
+    return next_refresh(product, next_release + timedelta(seconds=PREFETCH_DELAY), now)
+
+
+class WeatherPrefetcher:
+    """
+    상품별 발표 일정에 맞춰 예보를 미리 가져오는 백그라운드 스레드
+    """
+
+    # 실패한 상품을 다시 시도하기까지 대기 시간 (초)
+    RETRY_INTERVAL = 120
+
+    def __init__(self, products=PREFETCH_PRODUCTS, regions=None):
+        self.products = products
+        self.regions = regions or get_prefetch_regions()
+        self._stop = threading.Event()
+        self._thread = None
+        self._due = {}
+
+    def run_once(self, product):
+        failed = prefetch_product(product, self.regions)
+        now = datetime.now()
+        if failed:
+            self._due[product] = now + timedelta(seconds=self.RETRY_INTERVAL)
+        else:
+            self._due[product] = next_prefetch_time(product, now)
+
+    def run_forever(self):
+        # 시작하자마자 현재 발표분을 모두 채움
+        for product in self.products:
+            self.run_once(product)
+
+        while not self._stop.is_set():
+            product = min(self._due, key=self._due.get)
+            wait_seconds = (self._due[product] - datetime.now()).total_seconds()
+            if wait_seconds > 0 and self._stop.wait(wait_seconds):
+                break
+            self.run_once(product)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self.run_forever, name="weather-prefetch", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+_prefetcher = None
+_lock_file = None
+
+
+def acquire_prefetch_lock(path=PREFETCH_LOCK_PATH):
+    """
+    prefetch 담당 프로세스 잠금 (다른 프로세스가 잡고 있으면 False)
+    프로세스가 끝나면 잠금도 풀리므로 그다음 시작하는 프로세스가 이어 받음
+    """
+    global _lock_file
+    if _lock_file is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:  # fcntl이 없는 OS(Windows 개발 환경)에서는 잠금 없이
+        return True
+
+    lock_file = open(path, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _lock_file = lock_file
+    return True
+
+
+def start_prefetcher():
+    """
+    앱 프로세스 안에서 prefetch 스레드 시작
+    프로세스당 1개, 잠금을 못 잡으면 (다른 워커가 prefetch 중) 시작하지 않고 None
+    """
+    global _prefetcher
+    if _prefetcher is None:
+        if not acquire_prefetch_lock():
+            return None
+        _prefetcher = WeatherPrefetcher().start()
+        print(f"Weather prefetcher 시작 (pid {os.getpid()}): {', '.join(_prefetcher.regions)}")
+    return _prefetcher
+
+
+if __name__ == "__main__":
+    if not acquire_prefetch_lock():
+        raise SystemExit(f"다른 프로세스가 이미 prefetch 중입니다 ({PREFETCH_LOCK_PATH})")
+    prefetcher = WeatherPrefetcher()
+    print(f"Weather prefetcher 시작: {', '.join(prefetcher.regions)}")
+    try:
+        prefetcher.run_forever()
+    except KeyboardInterrupt:
+        print("Weather prefetcher 종료")
@@ -0,0 +1,341 @@
+"""
+기상 예보 레코드
+숫자는 숫자 그대로 배열(array)에 저장하고,
+"15°C" 같은 문자열은 LLM 컨텍스트나 API 응답을 만들 때만 생성
+
+- Observation: 초단기 실황 (현재 날씨)
+- ForecastSeries: 시간별 예보 (초단기예보, 단기예보) - 항목(category)별 숫자 열
+- MidTemp: 중기 기온 (4-10일 최저/최고)
+- MidLand: 중기 육상 (4-10일 날씨, 강수확률)
+"""
+
+import math
+import sys
+from array import array
+
+from kma_categories import CATEGORIES, DECODED, NAN, TRACE, decode, decode_float, missing_value
+
+# 하늘상태(SKY), 강수형태(PTY) 코드
+SKY_LABELS = {1: "맑음", 3: "구름많음", 4: "흐림"}
+PTY_LABELS = {
+    0: "없음",
+    1: "비",
+    2: "비/눈",
+    3: "눈",
+    4: "소나기",
+    5: "빗방울",
+    6: "빗방울눈날림",
+    7: "눈날림",
+}
+
+
+# 기상청 자료의 소수 자릿수 (float32 배열에서 꺼낸 15.199999809265137 -> 15.2)
+KMA_DECIMALS = 1
+
+
+def is_missing(value):
+    return value is None or value != value  # None 또는 NaN
+
+
+def to_float(value):
+    """
+    기상청 값(문자열/숫자)을 float로, 변환할 수 없으면 NaN
+    """
+    return decode_float(value)
+
+
+def is_error(result):
+    """
+    조회 결과가 에러 응답({"error": ...})인지 확인
+    """
+    return isinstance(result, dict) and "error" in result
+
+
+class WeatherRecord:
+    """
+    모든 예보 레코드의 공통 정보
+    stale: 새 발표분 대신 이전 발표분을 제공하는 경우 True
+    """
+
+    __slots__ = ("product", "region", "issued", "stale", "stale_issuance", "age_seconds")
+
+    def __init__(self, product, region, issued):
+        self.product = product
+        self.region = region
+        self.issued = issued  # "YYYYMMDDHHMM"
+        self.stale = False
+        self.stale_issuance = None
+        self.age_seconds = 0
+
+    def _base_dict(self):
+        data = {"product": self.product, "region": self.region, "issued": self.issued}
+        if self.stale:
+            data["stale"] = True
+            data["age_seconds"] = self.age_seconds
+        return data
+
+
+class Observation(WeatherRecord):
+    """
+    초단기 실황 - 항목별 관측값 1개씩 (항목 순서대로 float 배열)
+    """
+
+    __slots__ = ("categories", "values")
+
+    def __init__(self, product, region, issued, categories):
+        super().__init__(product, region, issued)
+        self.categories = tuple(categories)
+        self.values = array("f", [NAN] * len(self.categories))
+
+    def extend(self, items):
+        """
+        기상청 응답 items를 한 번 훑어서 값 채우기
+        정수 항목(습도, 하늘상태 등)의 결측값 -1은 float 배열에 그대로 넣지 않고 NaN으로
+        """
+        slots = {c: i for i, c in enumerate(self.categories)}
+        missing = {c: missing_value(CATEGORIES[c].typecode) if c in CATEGORIES else NAN
+                   for c in self.categories}
+        values = self.values
+        for item in items:
+            category = item["category"]
+            index = slots.get(category)
+            if index is not None:
+                value = decode(category, item["obsrValue"])
+                values[index] = NAN if value == missing[category] else value
+        return self
+
+    def get(self, category):
+        try:
+            value = self.values[self.categories.index(category)]
+        except ValueError:
+            return None
+        return None if math.isnan(value) else round(value, KMA_DECIMALS)
+
+    def to_dict(self):
+        data = self._base_dict()
+        data["values"] = {c: self.get(c) for c in self.categories}
+        return data
+
+
+class ForecastSeries(WeatherRecord):
+    """
+    시간별 예보 - 시각(times) 1열 + 항목별 배열(columns)
+    times: YYYYMMDDHH 정수
+    열 타입과 결측값은 kma_categories.CATEGORIES를 따름 (float는 NaN, 정수는 -1)
+    """
+
+    __slots__ = ("times", "columns", "_row_index")
+
+    def __init__(self, product, region, issued, categories):
+        super().__init__(product, region, issued)
+        self.times = array("I")
+        self.columns = {c: array(CATEGORIES[c].typecode) for c in categories}
+        self._row_index = {}
+
+    def extend(self, items):
+        """
+        기상청 응답 items를 한 번 훑어서 열에 채움
+        응답은 예보 시각 순으로 정렬돼 있어 같은 시각의 항목이 연달아 오므로
+        시각이 바뀔 때만 행을 찾고, 항목마다 새 객체를 만들지 않음
+        값 해석은 kma_categories.DECODED에 기억된 결과를 먼저 찾음
+        """
+        targets = {c: (column, DECODED[c]) for c, column in self.columns.items()}
+        fills = [(column, missing_value(column.typecode)) for column in self.columns.values()]
+        times = self.times
+        row_index = self._row_index
+        last_date = last_time = None
+        row = -1
+
+        for item in items:
+            target = targets.get(item["category"])
+            if target is None:
+                continue
+
+            fcst_date = item["fcstDate"]
+            fcst_time = item["fcstTime"]
+            if fcst_time != last_time or fcst_date != last_date:
+                last_date, last_time = fcst_date, fcst_time
+                time_key = int(fcst_date + fcst_time[:2])
+                row = row_index.get(time_key)
+                if row is None:
+                    row = row_index[time_key] = len(times)
+                    times.append(time_key)
+                    for column, missing in fills:
+                        column.append(missing)
+
+            column, known = target
+            raw = item["fcstValue"]
+            value = known.get(raw)
+            if value is None:
+                value = decode(item["category"], raw)
+            column[row] = value
+        return self
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getstate__(self):
+        # 행 찾기용 인덱스는 파싱할 때만 필요하므로 저장하지 않음
+        state = {slot: getattr(self, slot) for cls in type(self).__mro__
+                 for slot in getattr(cls, "__slots__", ()) if slot != "_row_index"}
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self._row_index = {}
+
+    def rows(self):
+        """
+        (YYYYMMDDHH, {항목: 값}) 순서대로 반환 (값 없는 항목은 제외, float 열은 KMA_DECIMALS 자리로 반올림)
+        """
+        columns = [(name, column, missing_value(column.typecode), column.typecode == "f")
+                   for name, column in self.columns.items()]
+        for row, time_key in enumerate(self.times):
+            values = {}
+            for name, column, missing, is_float in columns:
+                value = column[row]
+                if value == value and value != missing:
+                    values[name] = round(value, KMA_DECIMALS) if is_float else value
+            yield time_key, values
+
+    def daily(self, temp_category="TMP"):
+        """
+        날짜별 요약 (숫자)
+        - min_temp/max_temp: TMN/TMX, 없으면 그날 시간별 기온 범위
+        - rain_prob: 그날 가장 높은 강수확률
+        - sky: 정오 값, 없으면 그날 첫 값
+        """
+        days = {}
+        for time_key, values in self.rows():
+            date, hour = str(time_key // 100), time_key % 100
+            day = days.get(date)
+            if day is None:
+                day = days[date] = {"temps": []}
+
+            if "TMN" in values:
+                day["min_temp"] = values["TMN"]
+            if "TMX" in values:
+                day["max_temp"] = values["TMX"]
+            if temp_category in values:
+                day["temps"].append(values[temp_category])
+            if "POP" in values and values["POP"] > day.get("rain_prob", -1):
+                day["rain_prob"] = values["POP"]
+            if "SKY" in values and (hour == 12 or "sky" not in day):
+                day["sky"] = values["SKY"]
+
+        for day in days.values():
+            temps = day.pop("temps")
+            if temps:
+                day.setdefault("min_temp", min(temps))
+                day.setdefault("max_temp", max(temps))
+        return days
+
+    def to_dict(self):
+        data = self._base_dict()
+        data["hourly"] = [
+            {"time": str(time_key), **values} for time_key, values in self.rows()
+        ]
+        if "TMN" in self.columns or "TMP" in self.columns:
+            data["daily"] = self.daily()
+        return data
+
+
+class MidTemp(WeatherRecord):
+    """
+    중기 기온 - 4일~10일 후 최저/최고
+    """
+
+    DAYS = tuple(range(4, 11))
+
+    __slots__ = ("min_temps", "max_temps")
+
+    def __init__(self, product, region, issued):
+        super().__init__(product, region, issued)
+        self.min_temps = array("f", [NAN] * len(self.DAYS))
+        self.max_temps = array("f", [NAN] * len(self.DAYS))
+
+    def days(self):
+        for i, day in enumerate(self.DAYS):
+            yield day, self.min_temps[i], self.max_temps[i]
+
+    def to_dict(self):
+        data = self._base_dict()
+        data["forecast"] = [
+            {"day": day,
+             "min_temp": None if math.isnan(low) else round(low, KMA_DECIMALS),
+             "max_temp": None if math.isnan(high) else round(high, KMA_DECIMALS)}
+            for day, low, high in self.days()
+        ]
+        return data
+
+
+class MidLand(WeatherRecord):
+    """
+    중기 육상 - 4일~7일은 오전/오후, 8일~10일은 하루 단위
+    SLOTS 순서대로 날씨 문구(weather)와 강수확률(rain_probs, 없으면 -1)
+    """
+
+    SLOTS = (
+        (4, "Am"), (4, "Pm"), (5, "Am"), (5, "Pm"),
+        (6, "Am"), (6, "Pm"), (7, "Am"), (7, "Pm"),
+        (8, ""), (9, ""), (10, ""),
+    )
+
+    __slots__ = ("weather", "rain_probs")
+
+    def __init__(self, product, region, issued, weather, rain_probs):
+        super().__init__(product, region, issued)
+        # "맑음", "구름많음" 같은 반복 문구는 intern 해서 한 번만 저장
+        self.weather = tuple(sys.intern(w) if w else "" for w in weather)
+        self.rain_probs = array("b", rain_probs)
+
+    def by_day(self):
+        """
+        (일, [(오전/오후/"", 날씨, 강수확률)]) 순서대로 반환
+        """
+        days = {}
+        for (day, half), weather, prob in zip(self.SLOTS, self.weather, self.rain_probs):
+            days.setdefault(day, []).append((half, weather, None if prob < 0 else prob))
+        return days.items()
+
+    def to_dict(self):
+        data = self._base_dict()
+        data["forecast"] = [
+            {"day": day, "periods": [
+                {"period": half.lower() or "day", "weather": weather or None, "rain_prob": prob}
+                for half, weather, prob in periods
+            ]}
+            for day, periods in self.by_day()
+        ]
+        return data
+
+
+def format_number(value, unit=""):
+    """
+    숫자 -> 출력용 문자열 (15.0 -> "15", 값 없으면 "N/A")
+    """
+    if is_missing(value):
+        return "N/A"
+    return f"{value:g}{unit}"
+
+
+def sky_label(value):
+    return "N/A" if is_missing(value) else SKY_LABELS.get(int(value), "알 수 없음")
+
+
+def pty_label(value):
+    return "N/A" if is_missing(value) else PTY_LABELS.get(int(value), "없음")
+
+
+def precipitation_label(value, unit="mm", none_text="강수없음"):
+    """
+    강수량/적설 숫자 -> 기상청 표기 ("강수없음", "1mm 미만", "6.2mm")
+    """
+    if is_missing(value):
+        return "N/A"
+    if value == 0:
+        return none_text
+    if value <= TRACE:
+        return f"1{unit} 미만"
+    return f"{value:g}{unit}"